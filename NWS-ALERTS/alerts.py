@@ -1,13 +1,18 @@
-import requests
+import os
+import sys
 import pandas as pd
 
+# Add chatbot_forecast to path to import the shared NWS client
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'chatbot_forecast'))
+from services.nws_client import get_client, BASE_URL
+
 def get_nws_alerts_csv(state, filename):
     """
     Downloads all active NWS alerts for the specified US state (use two-letter code, e.g., 'TX', 'NY')
     and saves the full parsed data as a CSV.
     """
-    url = f"https://api.weather.gov/alerts/active?area={state.upper()}"
-    resp = requests.get(url, headers={"User-Agent": "weather-app"})
+    url = f"{BASE_URL}/alerts/active?area={state.upper()}"
+    resp = get_client().get(url)
     data = resp.json()
     alerts = []
     for alert in data.get("features", []):
@@ -1,6 +1,13 @@
 
+import os
+import sys
+import threading
+import time
 import requests
 import json
+import csv
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import partial
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
@@ -8,9 +15,15 @@ from geopy.geocoders import Nominatim
 from geopy.exc import GeocoderTimedOut, GeocoderUnavailable
 from urllib.error import HTTPError
 
-# CRITICAL: The NWS API requires a User-Agent header for all requests.
-NWS_USER_AGENT = "NextWeatherStreamlitApp/1.0 (contact@example.com)"
-BASE_URL = "https://api.weather.gov"
+# Add chatbot_forecast to path to import the shared NWS client
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'chatbot_forecast'))
+from services.nws_client import get_client, fan_out
+from services.weather_service import WeatherService
+from services.prefetch import Prefetcher, parse_watch_list, NWS_WATCH_LIST
+from services.figure_cache import FigureCache, content_hash
+from services.points_cache import point_key, point_zones
+from services.forecast_archive import default_archive
+from services.alert_feed import get_alert_feed
 
 # ==============================================================================
 # IMPORTANT: USAGE POLICY FOR NOMINATIM (GEOCODING SERVICE)
@@ -21,6 +34,27 @@ BASE_URL = "https://api.weather.gov"
 # ==============================================================================
 NOMINATIM_USER_AGENT = "NextWeatherGeocoder/1.0 (Neeraj.Pokala@minfytech.com)"
 
+# Serialized forecast charts, keyed by the content of the periods they plot
+_figure_cache = FigureCache(maxsize=64)
+
+# Product/alert cache shared with the background prefetcher (see start_prefetcher).
+# Fetched grids are also archived to Parquet when NWS_FORECAST_ARCHIVE is set.
+_forecast_archive = default_archive()
+_weather_service = WeatherService(archive=_forecast_archive)
+_prefetcher = None
+
+# Bulk forecasts: worker threads per batch (every request still goes through the
+# shared client's rate limiter), and Nominatim's limit of 1 geocode per second
+BULK_MAX_WORKERS = 8
+GEOCODE_INTERVAL = 1.0
+_geocode_lock = threading.Lock()
+_last_geocode = 0.0
+
+# Alert search: NWS caps a page at 500 alerts and links the next one by cursor
+SEARCH_PAGE_SIZE = 500
+EXPORT_COLUMNS = ['id', 'event', 'severity', 'urgency', 'certainty', 'areaDesc',
+                  'sent', 'effective', 'expires', 'headline']
+
 
 def get_lat_lon(location_name: str):
     """
@@ -55,100 +89,435 @@ def get_lat_lon(location_name: str):
 
 def get_grid_coordinates(latitude, longitude):
     """Gets NWS grid coordinates for a given lat/lon."""
-    point_url = f"{BASE_URL}/points/{latitude},{longitude}"
-    headers = {"User-Agent": NWS_USER_AGENT}
     try:
-        response = requests.get(point_url, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-        properties = data.get("properties", {})
+        # Resolved through the shared on-disk points cache
+        properties = get_client().get_point(latitude, longitude)
         grid_id, grid_x, grid_y = properties.get("gridId"), properties.get("gridX"), properties.get("gridY")
         if not all([grid_id, grid_x, grid_y]):
-            return None, None, None, json.dumps(data, indent=2) # Return raw data for debugging
+            return None, None, None, json.dumps(properties, indent=2) # Return raw data for debugging
         return grid_id, grid_x, grid_y, None
     except requests.exceptions.RequestException as e:
         return None, None, None, str(e) # Return error string
     except json.JSONDecodeError:
         return None, None, None, "JSONDecodeError"
 
-def get_all_forecasts_for_grid(grid_id, grid_x, grid_y):
-    """Fetches daily, hourly, and raw forecasts for a given grid."""
+def get_all_forecasts_for_grid(grid_id, grid_x, grid_y, layers=None):
+    """
+    Fetches daily, hourly, and raw forecasts for a given grid.
+
+    Args:
+        layers (list, optional): Raw gridpoint properties to keep (e.g. ['temperature', 'hazards']).
+            When given, the raw payload is stream-parsed and everything else is skipped.
+            Defaults to None, which returns the full raw payload.
+    """
     if not all([grid_id, grid_x, grid_y]):
         return None
-    grid_url_base = f"{BASE_URL}/gridpoints/{grid_id}/{grid_x},{grid_y}"
-    headers = {"User-Agent": NWS_USER_AGENT}
-    forecast_data = {}
-    urls_to_fetch = {
-        "daily": f"{grid_url_base}/forecast",
-        "hourly": f"{grid_url_base}/forecast/hourly",
-        "raw": grid_url_base
+    # The three products are independent, so fetch them concurrently. Fresh
+    # cached copies (e.g. kept warm by the prefetcher) are served without a request.
+    forecast_data, errors = fan_out(grid_product_calls(grid_id, grid_x, grid_y, layers))
+    report_forecast_errors(errors)
+    return forecast_data
+
+def grid_product_calls(grid_id, grid_x, grid_y, layers=None):
+    """Zero-argument calls fetching a grid's daily, hourly and raw products through the shared cache."""
+    grid_url_base = f"{_weather_service.client.base_url}/gridpoints/{grid_id}/{grid_x},{grid_y}"
+    get_product = _weather_service.get_product
+    return {
+        "daily": partial(get_product, "forecast", f"{grid_url_base}/forecast"),
+        "hourly": partial(get_product, "hourly", f"{grid_url_base}/forecast/hourly"),
+        "raw": partial(get_product, "grid", grid_url_base, layers)
     }
-    for forecast_type, url in urls_to_fetch.items():
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            forecast_data[forecast_type] = response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Warning: Could not fetch {forecast_type} forecast: {e}")
-        except json.JSONDecodeError:
+
+def report_forecast_errors(errors):
+    """Prints a warning per forecast product that failed."""
+    for forecast_type, e in errors.items():
+        if isinstance(e, json.JSONDecodeError):
             print(f"Warning: Could not decode JSON for {forecast_type} forecast.")
-    return forecast_data
+        else:
+            print(f"Warning: Could not fetch {forecast_type} forecast: {e}")
 
 def get_active_alerts_for_point(latitude, longitude):
-    """Fetches active alerts for a specific lat/lon point."""
-    alerts_url = f"{BASE_URL}/alerts/active?point={latitude},{longitude}"
-    headers = {"User-Agent": NWS_USER_AGENT}
+    """Fetches active alerts for a specific lat/lon point.
+
+    While the national alert feed is being polled (see get_active_alerts_for_points),
+    the answer comes from its local index instead of a request per point. A feed
+    whose polls have stopped succeeding is bypassed until it catches up.
+    """
     try:
-        response = requests.get(alerts_url, headers=headers)
-        response.raise_for_status()
-        return response.json(), None
+        feed = get_alert_feed(start=False)
+        if feed.is_fresh():
+            return feed.alerts_for_points([(latitude, longitude)], [_zones_for_point(latitude, longitude)])[0], None
+        return _weather_service.get_active_alerts(latitude, longitude), None
     except requests.exceptions.RequestException as e:
         return None, f"Error fetching alerts: {e}"
     except json.JSONDecodeError:
         return None, "Failed to decode JSON response from the alerts endpoint."
 
-def search_all_alerts(status=None, area=None, severity=None, event=None, limit=50):
+def _geocode_throttled(location_name):
+    """get_lat_lon, spaced GEOCODE_INTERVAL apart across threads to respect the Nominatim usage policy."""
+    global _last_geocode
+    with _geocode_lock:
+        wait_s = _last_geocode + GEOCODE_INTERVAL - time.monotonic()
+        if wait_s > 0:
+            time.sleep(wait_s)
+        try:
+            return get_lat_lon(location_name)
+        finally:
+            _last_geocode = time.monotonic()
+
+class _SharedCalls:
+    """Runs `func` once per key; concurrent and later callers with the same key get the first call's result."""
+
+    def __init__(self, func):
+        self.func = func
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, key, *args):
+        with self._lock:
+            future = self._futures.get(key)
+            owner = future is None
+            if owner:
+                future = self._futures[key] = Future()
+        if owner:
+            try:
+                future.set_result(self.func(*args))
+            except Exception as e:
+                future.set_exception(e)
+        return future.result()
+
+def _resolve_location(location, geocode, grid_lookup):
+    """Returns (latitude, longitude, (grid_id, grid_x, grid_y), error) for a (lat, lon) pair or a place name."""
+    if isinstance(location, str):
+        latitude, longitude, error = geocode(location, location)
+        if error:
+            return None, None, None, error
+    else:
+        latitude, longitude = location
+    # Only points /points would treat as identical (same 4-decimal key) share a lookup; nearby
+    # points can fall in different grid cells. Same-cell locations are merged once resolved.
+    grid_id, grid_x, grid_y, error = grid_lookup(point_key(latitude, longitude), latitude, longitude)
+    if error or not all([grid_id, grid_x, grid_y]):
+        return latitude, longitude, None, error or "Could not resolve grid coordinates."
+    return latitude, longitude, (grid_id, grid_x, grid_y), None
+
+def iter_forecasts_for_locations(locations, layers=None, max_workers=BULK_MAX_WORKERS, on_progress=None):
     """
-    Searches for alerts using various filter criteria.
-    
+    Fetches forecasts for many locations, yielding each result as soon as it is ready.
+
+    Locations are resolved to grid cells concurrently, and each distinct cell is
+    fetched once however many locations fall in it. Place names are geocoded
+    once per distinct name, one per second. A location that fails is yielded
+    with its error; the rest of the batch carries on.
+
     Args:
-        status (str, optional): Alert status (e.g., 'actual').
-        area (str, optional): State/area abbreviation (e.g., 'TX', 'CA').
-        severity (str, optional): Severity level (e.g., 'Extreme', 'Severe').
-        event (str, optional): Event type (e.g., 'Tornado Warning').
-        limit (int, optional): Maximum number of alerts to return. Defaults to 50.
-        
+        locations (list): (latitude, longitude) pairs and/or place names.
+        layers (list, optional): Raw gridpoint properties to keep (see get_all_forecasts_for_grid).
+        max_workers (int, optional): Concurrent lookups. Defaults to BULK_MAX_WORKERS.
+        on_progress (callable, optional): Called as on_progress(completed, total) after each result.
+
+    Yields:
+        dict: "index" (position in `locations`), "location", "latitude", "longitude",
+              "grid" ((grid_id, grid_x, grid_y) or None), "forecasts" (as returned by
+              get_all_forecasts_for_grid, or None) and "error" (str or None).
+    """
+    locations = list(locations)
+    total = len(locations)
+    completed = 0
+    # Repeated names and nearby points within the batch are looked up once
+    geocode = _SharedCalls(_geocode_throttled)
+    grid_lookup = _SharedCalls(get_grid_coordinates)
+
+    def result(index, latitude=None, longitude=None, grid=None, forecasts=None, error=None):
+        nonlocal completed
+        completed += 1
+        if on_progress is not None:
+            on_progress(completed, total)
+        return {"index": index, "location": locations[index], "latitude": latitude, "longitude": longitude,
+                "grid": grid, "forecasts": forecasts, "error": error}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {executor.submit(_resolve_location, location, geocode, grid_lookup): ('point', index)
+                   for index, location in enumerate(locations)}
+        cells = {}  # (grid_id, grid_x, grid_y) -> [(index, latitude, longitude), ...] awaiting that cell
+        fetched = {}  # (grid_id, grid_x, grid_y) -> (forecasts, error) once the cell is done
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                kind, key = pending.pop(future)
+                if kind == 'point':
+                    try:
+                        latitude, longitude, grid, error = future.result()
+                    except Exception as e:
+                        yield result(key, error=str(e))
+                        continue
+                    if error:
+                        yield result(key, latitude, longitude, error=error)
+                        continue
+                    if grid in fetched:
+                        yield result(key, latitude, longitude, grid, *fetched[grid])
+                        continue
+                    if grid not in cells:
+                        cells[grid] = []
+                        pending[executor.submit(get_all_forecasts_for_grid, *grid, layers)] = ('cell', grid)
+                    cells[grid].append((key, latitude, longitude))
+                    continue
+
+                try:
+                    forecasts, error = future.result(), None
+                    missing = [name for name in ("daily", "hourly", "raw") if name not in forecasts]
+                    if missing:
+                        error = f"Could not fetch {', '.join(missing)} forecast."
+                except Exception as e:
+                    forecasts, error = None, str(e)
+                fetched[key] = (forecasts, error)
+                for index, latitude, longitude in cells.pop(key):
+                    yield result(index, latitude, longitude, key, forecasts, error)
+
+def get_forecasts_for_locations(locations, layers=None, max_workers=BULK_MAX_WORKERS, on_progress=None):
+    """Like iter_forecasts_for_locations, but returns every result in input order."""
+    results = list(iter_forecasts_for_locations(locations, layers, max_workers, on_progress))
+    return sorted(results, key=lambda item: item["index"])
+
+def get_archived_forecasts(grid_id, grid_x, grid_y, start=None, end=None, layers=None):
+    """
+    Reads previously fetched raw forecasts for a grid cell from the local archive (no network).
+
+    Args:
+        start, end (datetime/str, optional): Valid-time range to keep.
+        layers (list, optional): Layer names to keep (e.g. ['temperature']).
+
     Returns:
-        dict: The JSON response from the API.
+        pd.DataFrame: Long-format rows (office, x, y, layer, start, end, value, issued), one
+                      set per archived issuance, or None if archiving is off.
         str: An error message if something went wrong, otherwise None.
     """
+    if _forecast_archive is None:
+        return None, "Forecast archive is off. Set NWS_FORECAST_ARCHIVE to a directory to enable it."
+    try:
+        return _forecast_archive.query(grid_id, grid_x, grid_y, start, end, layers), None
+    except Exception as e:
+        return None, f"Error reading forecast archive: {e}"
+
+def _zones_for_point(latitude, longitude):
+    # Resolved through the shared on-disk points cache, so only the first lookup per cell hits /points
+    return point_zones(_weather_service.client.get_point(latitude, longitude))
+
+def get_active_alerts_for_points(points):
+    """
+    Active alerts for many sites from one national alert download.
+
+    Starts the shared alert feed if needed. Each site is matched locally
+    against the alert polygons, and alerts without a polygon are matched by
+    the site's forecast zone and county.
+
+    Args:
+        points (list): (latitude, longitude) pairs.
+
+    Returns:
+        list: Per point, a GeoJSON FeatureCollection of its alerts (same shape as
+              get_active_alerts_for_point), or None if the feed is unavailable.
+        str: An error message if something went wrong, otherwise None.
+    """
+    feed = get_alert_feed()
+    if not feed.wait_ready():
+        return None, f"Error fetching alerts: {feed.last_error or 'no response from the alert feed'}"
+    try:
+        zones = [_zones_for_point(latitude, longitude) for latitude, longitude in points]
+    except requests.exceptions.RequestException as e:
+        return None, f"Error resolving zones: {e}"
+    return feed.alerts_for_points(points, zones), None
+
+def start_prefetcher(locations=None):
+    """
+    Starts the background refresher for a watch list (once per process).
+
+    Args:
+        locations (list, optional): (lat, lon) pairs. Defaults to the NWS_WATCH_LIST setting.
+
+    Returns:
+        Prefetcher: The running prefetcher.
+    """
+    global _prefetcher
+    if _prefetcher is None:
+        if locations is None:
+            locations = parse_watch_list(NWS_WATCH_LIST)
+        _prefetcher = Prefetcher(_weather_service, locations).start()
+    return _prefetcher
+
+def _alert_search_params(status, area, severity, event, start, end, limit):
     params = {
         "status": status,
         "area": area,
         "severity": severity,
         "event": event,
+        "start": start,
+        "end": end,
         "limit": limit
     }
     # Filter out None values so they aren't included in the query
-    active_params = {key: value for key, value in params.items() if value}
-    
-    alerts_url = f"{BASE_URL}/alerts"
-    headers = {"User-Agent": NWS_USER_AGENT}
+    return {key: value for key, value in params.items() if value}
+
+def _fetch_alert_page(client, url, params=None):
+    # Pages bypass the client's revalidation cache, which would otherwise keep every page of a long search
+    response = client.get(url, params=params)
+    response.raise_for_status()
+    return response.json()
+
+def _alert_pages(params, max_alerts=None):
+    """Yields /alerts result pages in order, fetching the next one while the caller handles the current one."""
+    client = get_client()
+    url = f"{client.base_url}/alerts"
+    fetched = 0
+    executor = ThreadPoolExecutor(max_workers=1)
+    page = executor.submit(_fetch_alert_page, client, url, params)
+    try:
+        while page is not None:
+            body = page.result()
+            features = body.get('features', [])
+            fetched += len(features)
+            next_url = (body.get('pagination') or {}).get('next')
+            page = None
+            # NWS keeps handing out a cursor; an empty page (or a repeated link) is the end
+            if features and next_url and next_url != url and (max_alerts is None or fetched < max_alerts):
+                url = next_url
+                page = executor.submit(_fetch_alert_page, client, next_url)
+            yield body
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def iter_alerts(status=None, area=None, severity=None, event=None, start=None, end=None,
+                page_size=SEARCH_PAGE_SIZE, max_alerts=None):
+    """
+    Searches for alerts, yielding them one at a time across every result page.
+
+    The `pagination.next` cursor is only followed as the caller consumes
+    alerts. The next page is fetched in the background while the current one
+    is being yielded, so at most two pages are held in memory however large
+    the result is.
+
+    Args:
+        status, area, severity, event: Filters as in search_all_alerts.
+        start (str, optional): Only alerts sent at or after this ISO 8601 time.
+        end (str, optional): Only alerts sent at or before this ISO 8601 time.
+        page_size (int, optional): Alerts per request (NWS allows up to 500). Defaults to SEARCH_PAGE_SIZE.
+        max_alerts (int, optional): Stop after this many alerts. Defaults to all of them.
+
+    Yields:
+        dict: One alert (a GeoJSON feature).
+
+    Raises:
+        requests.exceptions.RequestException: If a page can't be fetched; alerts already yielded stand.
+    """
+    params = _alert_search_params(status, area, severity, event, start, end, page_size)
+    yielded = 0
+    for body in _alert_pages(params, max_alerts):
+        for feature in body.get('features', []):
+            if max_alerts is not None and yielded >= max_alerts:
+                return
+            yield feature
+            yielded += 1
+
+def search_all_alerts(status=None, area=None, severity=None, event=None, limit=50):
+    """
+    Searches for alerts using various filter criteria.
     
+    Args:
+        status (str, optional): Alert status (e.g., 'actual').
+        area (str, optional): State/area abbreviation (e.g., 'TX', 'CA').
+        severity (str, optional): Severity level (e.g., 'Extreme', 'Severe').
+        event (str, optional): Event type (e.g., 'Tornado Warning').
+        limit (int, optional): Maximum number of alerts to return, gathered across as many
+                               result pages as needed. Defaults to 50. Required: the result
+                               is held in memory, so use iter_alerts or export_alerts to
+                               walk a search of unknown size.
+        
+    Returns:
+        dict: The JSON response from the API (title, updated, ...) with the features of
+              every page read, up to `limit`. `pagination` is dropped, as the cursor has
+              already been followed.
+        str: An error message if something went wrong, otherwise None.
+    """
+    if not limit:
+        return None, "Error searching alerts: a limit is required; use iter_alerts or export_alerts for a full search."
+    params = _alert_search_params(status, area, severity, event, None, None, min(limit, SEARCH_PAGE_SIZE))
     try:
-        response = requests.get(alerts_url, headers=headers, params=active_params)
-        response.raise_for_status()
-        return response.json(), None
+        response, features = None, []
+        for body in _alert_pages(params, max_alerts=limit):
+            if response is None:
+                response = {key: value for key, value in body.items() if key != 'pagination'}
+            features.extend(body.get('features', [])[:limit - len(features)])
+        response['features'] = features
+        return response, None
     except requests.exceptions.RequestException as e:
         return None, f"Error searching alerts: {e}"
     except json.JSONDecodeError:
         return None, "Failed to decode JSON response from the alerts endpoint."
 
+def export_alerts(path, status=None, area=None, severity=None, event=None, start=None, end=None,
+                  max_alerts=None):
+    """
+    Streams an alert search straight to a file, one alert at a time.
+
+    The format follows the extension: ".csv" writes EXPORT_COLUMNS, ".jsonl"
+    one GeoJSON feature per line, and anything else a GeoJSON
+    FeatureCollection. The file is written under a temporary name and only
+    moved into place once the search is complete.
+
+    Args:
+        path (str): Output file.
+        status, area, severity, event, start, end, max_alerts: As in iter_alerts.
+
+    Returns:
+        int: The number of alerts written, or None on failure.
+        str: An error message if something went wrong, otherwise None.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    tmp_path = f"{path}.tmp"
+    count = 0
+    try:
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            alerts = iter_alerts(status, area, severity, event, start, end, max_alerts=max_alerts)
+            if extension == '.csv':
+                writer = csv.DictWriter(f, fieldnames=EXPORT_COLUMNS, extrasaction='ignore')
+                writer.writeheader()
+                for alert in alerts:
+                    writer.writerow(alert.get('properties', {}))
+                    count += 1
+            elif extension == '.jsonl':
+                for alert in alerts:
+                    f.write(json.dumps(alert) + "\n")
+                    count += 1
+            else:
+                f.write('{"type": "FeatureCollection", "features": [\n')
+                for alert in alerts:
+                    f.write((",\n" if count else "") + json.dumps(alert))
+                    count += 1
+                f.write('\n]}\n')
+        os.replace(tmp_path, path)
+        return count, None
+    except (requests.exceptions.RequestException, ValueError, OSError) as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None, f"Error exporting alerts after {count} alert(s): {e}"
+
 def create_24hr_forecast_plot(hourly_periods):
-    """Creates a multi-axis Plotly chart for the next 24 hours."""
+    """Creates a multi-axis Plotly chart for the next 24 hours.
+
+    Figures are cached by the content of the 24 periods, so a rerun or reload
+    with the same forecast skips the Plotly build.
+    """
     if not hourly_periods:
         return None
-    df = pd.DataFrame(hourly_periods[:24])
+    periods = hourly_periods[:24]
+    fig_json = _figure_cache.get_or_build(
+        content_hash(periods), '24hr-forecast', partial(_build_24hr_forecast_plot, periods)
+    )
+    # The cached JSON came from a validated figure, so skip re-validating it
+    return go.Figure(fig_json, _validate=False)
+
+def _build_24hr_forecast_plot(hourly_periods):
+    df = pd.DataFrame(hourly_periods)
     df['temperature'] = pd.to_numeric(df['temperature'])
     df['windSpeed_val'] = pd.to_numeric(df['windSpeed'].str.extract('(\\d+)', expand=False), errors='coerce').fillna(0)
     df['precip_val'] = df['probabilityOfPrecipitation'].apply(lambda x: x.get('value', 0) if isinstance(x, dict) else 0)
@@ -0,0 +1,87 @@
+"""
+Async twins of the NWS API service calls, for fanning out across many points
+(e.g. refreshing a whole region) from a single worker.
+
+Each coroutine returns exactly what its synchronous counterpart in
+nws_api_service returns. The blocking requests run on a bounded thread pool
+over the shared NWSClient, so they reuse its keep-alive connections, caches,
+single-flight and rate limiter; at most MAX_CONCURRENCY requests are in
+flight no matter how many coroutines are awaiting.
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import requests
+
+import nws_api_service as sync_service
+from services.nws_client import POOL_MAXSIZE
+
+# Requests in flight at once; the default matches the per-host keep-alive pool
+MAX_CONCURRENCY = int(os.getenv('NWS_ASYNC_CONCURRENCY', str(POOL_MAXSIZE)))
+
+_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix='nws-async')
+
+
+async def _run(func, *args, **kwargs):
+    """Runs a blocking call on the bounded pool without blocking the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(_executor, partial(func, *args, **kwargs))
+
+
+async def get_grid_coordinates(latitude, longitude):
+    """Async `nws_api_service.get_grid_coordinates`: (grid_id, grid_x, grid_y, error)."""
+    return await _run(sync_service.get_grid_coordinates, latitude, longitude)
+
+
+async def get_all_forecasts_for_grid(grid_id, grid_x, grid_y, layers=None):
+    """
+    Async `nws_api_service.get_all_forecasts_for_grid`.
+
+    The daily, hourly and raw products are awaited concurrently, each taking
+    its own slot in the pool.
+
+    Returns:
+        dict: The products that could be fetched ("daily", "hourly", "raw"), or None
+              if the grid coordinates are incomplete.
+    """
+    if not all([grid_id, grid_x, grid_y]):
+        return None
+    calls = sync_service.grid_product_calls(grid_id, grid_x, grid_y, layers)
+    results = await asyncio.gather(*(_run(call) for call in calls.values()), return_exceptions=True)
+
+    forecast_data, errors = {}, {}
+    for name, result in zip(calls, results):
+        if isinstance(result, BaseException):
+            # Same handling as fan_out: request/decode failures are reported, anything else is a bug
+            if not isinstance(result, (requests.exceptions.RequestException, ValueError)):
+                raise result
+            errors[name] = result
+        else:
+            forecast_data[name] = result
+    sync_service.report_forecast_errors(errors)
+    return forecast_data
+
+
+async def get_active_alerts_for_point(latitude, longitude):
+    """Async `nws_api_service.get_active_alerts_for_point`: (alerts, error)."""
+    return await _run(sync_service.get_active_alerts_for_point, latitude, longitude)
+
+
+async def search_all_alerts(status=None, area=None, severity=None, event=None, limit=50):
+    """Async `nws_api_service.search_all_alerts`: (response, error)."""
+    return await _run(sync_service.search_all_alerts, status, area, severity, event, limit)
+
+
+async def get_point_forecasts(latitude, longitude, layers=None):
+    """
+    Resolves a point to its grid and fetches the grid's forecasts.
+
+    Returns:
+        dict: The forecasts (see get_all_forecasts_for_grid), or None on error.
+        str: An error message if the point couldn't be resolved, otherwise None.
+    """
+    grid_id, grid_x, grid_y, error = await get_grid_coordinates(latitude, longitude)
+    if error or not all([grid_id, grid_x, grid_y]):
+        return None, error or "Could not resolve grid coordinates."
+    return await get_all_forecasts_for_grid(grid_id, grid_x, grid_y, layers), None
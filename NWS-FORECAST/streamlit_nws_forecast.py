@@ -75,7 +75,10 @@ def create_24hr_forecast_plot(hourly_periods):
     fig.update_yaxes(title_text="Precipitation (%)", secondary_y=True, range=[0, 100])
     return fig
 
-from nws_api_service import get_lat_lon, get_grid_coordinates, get_all_forecasts_for_grid, create_24hr_forecast_plot
+from nws_api_service import get_lat_lon, get_grid_coordinates, get_all_forecasts_for_grid, create_24hr_forecast_plot, start_prefetcher
+
+# Keep the NWS_WATCH_LIST locations warm in the background, once per server process
+st.cache_resource(start_prefetcher)()
 
 
 
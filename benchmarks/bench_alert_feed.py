@@ -0,0 +1,86 @@
+"""
+National alert feed: answering every state view and the national count.
+
+"per-state" is the old dashboard path: one /alerts/active/area/{state} request
+per state plus /alerts/active/count. "feed" polls /alerts/active once and
+answers every view from the AlertFeed index. A second poll after the stub's
+feed changes shows the delta (and a third, unchanged poll the 304 path).
+
+Usage: python benchmarks/bench_alert_feed.py [alerts] [latency_seconds]
+"""
+import copy
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'chatbot_forecast'))
+from services.alert_feed import AlertFeed
+from services.nws_client import NWSClient
+from services.points_cache import PointsCache
+from stub_server import StubServer, synthetic_alert
+
+STATES = ['AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA', 'HI', 'ID', 'IL', 'IN', 'IA', 'KS',
+          'KY', 'LA', 'ME', 'MD', 'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ', 'NM', 'NY',
+          'NC', 'ND', 'OH', 'OK', 'OR', 'PA', 'RI', 'SC', 'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV',
+          'WI', 'WY']
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    server = StubServer(latency=latency, etags=True, alerts=count).start()
+    client = NWSClient(base_url=server.base_url, points_cache=PointsCache(':memory:'), rate_limit=10_000, burst=10_000)
+    try:
+        before = server.request_count
+        start = time.perf_counter()
+        client.get_json(f"{server.base_url}/alerts/active/count")
+        for state in STATES:
+            client.get_json(f"{server.base_url}/alerts/active/area/{state}")
+        per_state_s, per_state_requests = time.perf_counter() - start, server.request_count - before
+
+        feed = AlertFeed(client=client)
+        before = server.request_count
+        start = time.perf_counter()
+        feed.poll()
+        feed.count()
+        for state in STATES:
+            feed.for_area(state)
+        feed_s, feed_requests = time.perf_counter() - start, server.request_count - before
+
+        start = time.perf_counter()
+        for state in STATES:
+            feed.for_area(state)
+        views_ms = (time.perf_counter() - start) * 1000
+
+        # Next cycle: 20 alerts re-sent, 10 expire, 10 new
+        rng = random.Random(1)
+        features = copy.deepcopy(server.alert_features)
+        later = datetime.now().astimezone() + timedelta(minutes=5)
+        for feature in features[:20]:
+            feature['properties']['sent'] = later.isoformat()
+        features = features[:-10] + [synthetic_alert(count + n, rng, later) for n in range(10)]
+        server.set_alerts(features)
+        start = time.perf_counter()
+        delta = feed.poll()
+        delta_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        feed.poll()
+        unchanged_ms = (time.perf_counter() - start) * 1000
+
+        print(f"{count} active alerts, stub latency {latency * 1000:.0f} ms\n")
+        print(f"{'mode':<12}{'seconds':>10}{'requests':>10}")
+        print(f"{'per-state':<12}{per_state_s:>10.2f}{per_state_requests:>10}")
+        print(f"{'feed':<12}{feed_s:>10.2f}{feed_requests:>10}")
+        print(f"\n50 state views from the index: {views_ms:.2f} ms")
+        print(f"Changed poll: {delta_ms:.1f} ms, +{len(delta['added'])} added, "
+              f"{len(delta['updated'])} updated, {len(delta['expired'])} expired")
+        print(f"Unchanged poll (304): {unchanged_ms:.1f} ms")
+        print(f"Feed: {feed.stats()}")
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Alert aggregation: the per-rerun filter, chart counts and severity sort on 10k alerts.
+
+"lists" is the dashboard's previous path: categorize into dicts of alert lists
+(twice: all alerts, then the filtered set), filter in a Python loop, and sort
+by a severity-priority dict. "index" builds an AlertIndex once (per feed poll)
+and then answers each rerun with vectorized lookups.
+
+Usage: python benchmarks/bench_alert_index.py [alerts] [reruns]
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'chatbot_forecast'))
+from services.alert_index import AlertIndex
+from stub_server import synthetic_alerts
+
+SEVERITY_FILTER = ["Extreme", "Severe", "Moderate", "Minor", "Unknown"]
+URGENCY_FILTER = ["Immediate", "Expected", "Unknown"]
+SEVERITY_PRIORITY = {"Extreme": 0, "Severe": 1, "Moderate": 2, "Minor": 3, "Unknown": 4}
+
+
+def categorize_lists(alerts):
+    categorized = {
+        'severity': {'Extreme': [], 'Severe': [], 'Moderate': [], 'Minor': [], 'Unknown': []},
+        'urgency': {'Immediate': [], 'Expected': [], 'Future': [], 'Past': [], 'Unknown': []},
+        'certainty': {'Observed': [], 'Likely': [], 'Possible': [], 'Unlikely': [], 'Unknown': []},
+        'event_type': {},
+    }
+    for alert in alerts:
+        props = alert.get('properties', {})
+        for name in ('severity', 'urgency', 'certainty'):
+            value = props.get(name, 'Unknown')
+            categorized[name].get(value, categorized[name]['Unknown']).append(alert)
+        categorized['event_type'].setdefault(props.get('event', 'Unknown'), []).append(alert)
+    return categorized
+
+
+def rerun_lists(alerts):
+    categorize_lists(alerts)
+    filtered = [alert for alert in alerts
+                if alert['properties'].get('severity', 'Unknown') in SEVERITY_FILTER
+                and alert['properties'].get('urgency', 'Unknown') in URGENCY_FILTER]
+    categorized = categorize_lists(filtered)
+    counts = {name: {k: len(v) for k, v in groups.items() if v} for name, groups in categorized.items()}
+    ordered = sorted(filtered, key=lambda a: SEVERITY_PRIORITY.get(a['properties'].get('severity', 'Unknown'), 4))
+    return counts, ordered
+
+
+def rerun_index(index):
+    selected = index.mask(severity=SEVERITY_FILTER, urgency=URGENCY_FILTER)
+    return index.categorize(selected), index.select(selected)
+
+
+def best_ms(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    alerts = synthetic_alerts(count)
+
+    lists_ms, (list_counts, list_order) = best_ms(lambda: rerun_lists(alerts), repeat)
+    build_ms, index = best_ms(lambda: AlertIndex(alerts), repeat)
+    index_ms, (index_counts, index_order) = best_ms(lambda: rerun_index(index), repeat)
+
+    assert list_counts == index_counts
+    assert [a['properties']['id'] for a in list_order] == [a['properties']['id'] for a in index_order]
+
+    print(f"{count:,} alerts, best of {repeat}\n")
+    print(f"lists: categorize x2 + filter + sort   {lists_ms:8.2f} ms per rerun")
+    print(f"index: build (once per feed poll)      {build_ms:8.2f} ms")
+    print(f"index: mask + counts + sorted select   {index_ms:8.2f} ms per rerun")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Alert search over a large history: one page vs following every cursor.
+
+"single page" is the old search_all_alerts: one request, truncated at the
+page limit. "sequential" follows `pagination.next` one page at a time and
+holds every alert (fetch, then process, then fetch). iter_alerts prefetches
+the next page while the caller processes the current one, and export_alerts
+streams the same search to a JSON Lines file. Per-alert processing cost is simulated so that
+prefetching has something to overlap with. Peak traced memory comes from a
+second, traced run of each mode.
+
+Usage: python benchmarks/bench_alert_search.py [alerts] [latency_seconds] [page_size]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'chatbot_forecast'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'NWS-FORECAST'))
+import services.nws_client as nws_client
+from services.nws_client import NWSClient
+from services.points_cache import PointsCache
+from stub_server import StubServer
+
+PROCESS_SECONDS = 0.0001  # Per alert, standing in for the caller's own work
+
+
+def process(alert):
+    end = time.perf_counter() + PROCESS_SECONDS
+    while time.perf_counter() < end:
+        pass
+
+
+def measure(func):
+    """(seconds, peak traced bytes, result); timed in a separate, untraced run."""
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def run_sequential(client, page_size):
+    alerts = []
+    body = client.get(f"{client.base_url}/alerts", params={'limit': page_size}).json()
+    while body.get('features'):
+        for alert in body['features']:
+            process(alert)
+        alerts.extend(body['features'])
+        body = client.get(body['pagination']['next']).json()
+    return len(alerts)
+
+
+def run_streamed(service, page_size):
+    count = 0
+    for alert in service.iter_alerts(page_size=page_size):
+        process(alert)
+        count += 1
+    return count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    page_size = int(sys.argv[3]) if len(sys.argv) > 3 else 500
+    server = StubServer(latency=latency, alerts=count).start()
+    nws_client._shared_client = NWSClient(base_url=server.base_url, points_cache=PointsCache(':memory:'),
+                                          rate_limit=10_000, burst=10_000)
+    import nws_api_service as service
+    path = os.path.join(tempfile.mkdtemp(), 'alerts.jsonl')
+    try:
+        single_s, single_peak, (single, _) = measure(lambda: service.search_all_alerts(limit=page_size))
+        sequential_s, sequential_peak, sequential = measure(
+            lambda: run_sequential(nws_client._shared_client, page_size))
+        streamed_s, streamed_peak, streamed = measure(lambda: run_streamed(service, page_size))
+        export_s, export_peak, (exported, error) = measure(lambda: service.export_alerts(path))
+        assert error is None, error
+        assert sequential == streamed == exported == count
+        with open(path, encoding='utf-8') as f:
+            assert sum(1 for _ in f) == count
+
+        print(f"{count:,} alerts in history, {page_size} per page, stub latency {latency * 1000:.0f} ms\n")
+        print(f"{'mode':<28}{'alerts':>8}{'seconds':>10}{'peak MB':>10}")
+        print(f"{'single page (old)':<28}{len(single['features']):>8,}{single_s:>10.2f}{single_peak / 1e6:>10.1f}")
+        print(f"{'sequential, all in memory':<28}{sequential:>8,}{sequential_s:>10.2f}{sequential_peak / 1e6:>10.1f}")
+        print(f"{'iter_alerts (prefetch)':<28}{streamed:>8,}{streamed_s:>10.2f}{streamed_peak / 1e6:>10.1f}")
+        print(f"{'export_alerts -> .jsonl':<28}{exported:>8,}{export_s:>10.2f}{export_peak / 1e6:>10.1f}")
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
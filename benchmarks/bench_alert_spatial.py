@@ -0,0 +1,85 @@
+"""
+Point-in-alert lookups for many monitored sites from one national alert download.
+
+"per-point" sends /alerts/active?point= for each site (timed on a sample and
+extrapolated). "index" polls /alerts/active once, builds an AlertSpatialIndex,
+and matches every site locally: polygons by bucket, bounding box and ray
+casting, and zone-only alerts by the site's zones. The local answers are
+checked against a brute-force scan of every polygon.
+
+Usage: python benchmarks/bench_alert_spatial.py [sites] [alerts] [latency_seconds]
+"""
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'chatbot_forecast'))
+from services.alert_feed import AlertFeed
+from services.alert_spatial import AlertSpatialIndex, points_in_ring
+from services.nws_client import NWSClient
+from services.points_cache import PointsCache
+from stub_server import StubServer
+
+SAMPLE = 50
+
+
+def brute_force(alerts, lat, lon, zones):
+    found = []
+    for alert in alerts:
+        geometry = alert.get('geometry')
+        if geometry:
+            ring = np.asarray(geometry['coordinates'][0], dtype=float)
+            if points_in_ring(np.array([lon]), np.array([lat]), ring)[0]:
+                found.append(alert)
+        elif set(zones) & set(alert['properties']['geocode']['UGC']):
+            found.append(alert)
+    return found
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    alerts = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.02
+    rng = random.Random(7)
+    sites = [(rng.uniform(25, 49), rng.uniform(-124, -67)) for _ in range(count)]
+    zones = [[f"{rng.choice(['TX', 'CA', 'MO', 'NY'])}Z{rng.randint(1, 300):03d}"] for _ in sites]
+
+    server = StubServer(latency=latency, etags=True, alerts=alerts).start()
+    client = NWSClient(base_url=server.base_url, points_cache=PointsCache(':memory:'), rate_limit=10_000, burst=10_000)
+    try:
+        start = time.perf_counter()
+        for lat, lon in sites[:SAMPLE]:
+            client.get_json(f"{server.base_url}/alerts/active", params={'point': f"{lat:.4f},{lon:.4f}"})
+        per_point_s = (time.perf_counter() - start) / SAMPLE * count
+
+        feed = AlertFeed(client=client)
+        start = time.perf_counter()
+        feed.poll()
+        poll_s = time.perf_counter() - start
+        start = time.perf_counter()
+        index = feed.spatial_index()
+        build_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        results = feed.alerts_for_points(sites, zones)
+        query_ms = (time.perf_counter() - start) * 1000
+
+        for (lat, lon), site_zones, result in list(zip(sites, zones, results))[:500]:
+            expected = brute_force(index.alerts, lat, lon, site_zones)
+            assert [a['properties']['id'] for a in result['features']] == [a['properties']['id'] for a in expected]
+
+        matched = sum(1 for result in results if result['features'])
+        print(f"{count:,} sites, {alerts:,} active alerts "
+              f"({sum(1 for a in index.alerts if a['geometry'])} with polygons), stub latency {latency * 1000:.0f} ms\n")
+        print(f"per-point requests (extrapolated)  {per_point_s:8.2f} s   {count:,} requests")
+        print(f"national poll                      {poll_s:8.2f} s   1 request")
+        print(f"spatial index build                {build_ms:8.2f} ms")
+        print(f"match all sites                    {query_ms:8.2f} ms   ({matched:,} sites under an alert)")
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Alert push channel: getting a feed change onto connected dashboards.
+
+"re-fetch" is the rerun path: every dashboard re-reads its state's full alert
+list after a change (timed here as the JSON each would download and parse).
+"push" runs an AlertStreamServer over an AlertFeed with one SSE client per
+dashboard; after the feed changes, only the delta for each client's state is
+sent and applied to its AlertStore in place. Time is from the end of the poll
+until every store holds the new version; the stores are then checked against
+the feed.
+
+Usage: python benchmarks/bench_alert_stream.py [alerts] [dashboards]
+"""
+import copy
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'chatbot_forecast'))
+from services.alert_feed import AlertFeed, alert_id
+from services.alert_stream import AlertStore, AlertStreamClient, AlertStreamServer
+from services.nws_client import NWSClient
+from services.points_cache import PointsCache
+from stub_server import StubServer, ALERT_STATES, synthetic_alert
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    dashboards = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    server = StubServer(latency=0.0, etags=True, alerts=count).start()
+    client = NWSClient(base_url=server.base_url, points_cache=PointsCache(':memory:'), rate_limit=10_000, burst=10_000)
+    feed = AlertFeed(client=client)
+    feed.poll()
+    stream = AlertStreamServer(feed=feed, port=0).start()
+    states = [ALERT_STATES[n % len(ALERT_STATES)] for n in range(dashboards)]
+    stores = [AlertStore(state) for state in states]
+    clients = [AlertStreamClient(stream.url, store).start() for store in stores]
+    try:
+        for store in stores:
+            store.wait_for_change(0, timeout=10)
+
+        # Next cycle: 5 alerts re-sent, 5 expire, 5 new
+        rng = random.Random(3)
+        features = copy.deepcopy(server.alert_features)
+        later = datetime.now().astimezone() + timedelta(minutes=5)
+        for feature in features[:5]:
+            feature['properties']['sent'] = later.isoformat()
+        features = features[:-5] + [synthetic_alert(count + n, rng, later) for n in range(5)]
+        server.set_alerts(features)
+
+        target = feed.poll()["version"]
+        start = time.perf_counter()
+        for store in stores:
+            store.wait_for_change(target - 1, timeout=10)
+        push_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        refetch_bytes = 0
+        for state in states:
+            body = json.dumps(feed.for_area(state)).encode()
+            refetch_bytes += len(body)
+            json.loads(body)
+        refetch_ms = (time.perf_counter() - start) * 1000
+
+        for state, store in zip(states, stores):
+            assert store.version == target
+            assert sorted(store.alerts) == sorted(alert_id(f) for f in feed.for_area(state)['features'])
+        changed = sum(len(store.changed_since(target - 1)) for store in stores)
+
+        print(f"{count:,} active alerts, {dashboards} dashboards over {len(set(states))} states\n")
+        print(f"re-fetch: full state lists after a change   {refetch_ms:8.2f} ms   {refetch_bytes / 1e6:6.2f} MB")
+        print(f"push: poll -> every store on new version    {push_ms:8.2f} ms   ({changed} alerts changed across stores)")
+        print(f"stream server: {stream.clients} connected, {stream.dropped} dropped")
+    finally:
+        for stream_client in clients:
+            stream_client.stop()
+        stream.stop()
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
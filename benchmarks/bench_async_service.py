@@ -0,0 +1,85 @@
+"""
+Async NWS API service: points/second refreshing a region, sync loop vs async fan-out.
+
+Each point is resolved to its grid (get_grid_coordinates) and the grid's
+daily, hourly and raw forecasts are fetched (get_all_forecasts_for_grid).
+The stub server gives every point its own grid cell and adds per-request
+latency. The client's rate limit is lifted so the numbers show the
+concurrency itself; against api.weather.gov the limiter caps both.
+
+Usage: python benchmarks/bench_async_service.py [points] [latency_seconds]
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'chatbot_forecast'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'NWS-FORECAST'))
+import services.nws_client as nws_client
+from services.nws_client import NWSClient
+from services.points_cache import PointsCache
+from stub_server import StubServer
+
+
+def region(count):
+    """`count` points on a 0.05° lattice around Kansas City, each in its own stub grid cell."""
+    side = int(count ** 0.5) + 1
+    return [(39.0 + 0.05 * (i // side), -94.5 + 0.05 * (i % side)) for i in range(count)]
+
+
+def reset_client(server):
+    """Points the shared client (and the service's product cache) at the stub, with cold caches."""
+    nws_client._shared_client = NWSClient(base_url=server.base_url, points_cache=PointsCache(':memory:'),
+                                          rate_limit=10_000, burst=10_000)
+    import nws_api_service
+    nws_api_service._weather_service.client = nws_client._shared_client
+    nws_api_service._weather_service.cache.clear()
+
+
+def run_sync(points):
+    import nws_api_service as service
+    for lat, lon in points:
+        grid_id, grid_x, grid_y, error = service.get_grid_coordinates(lat, lon)
+        assert error is None, error
+        data = service.get_all_forecasts_for_grid(grid_id, grid_x, grid_y)
+        assert len(data) == 3, data.keys()
+
+
+async def run_async(points):
+    import nws_api_service_async as service
+    results = await asyncio.gather(*(service.get_point_forecasts(lat, lon) for lat, lon in points))
+    for data, error in results:
+        assert error is None and len(data) == 3, error
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    points = region(count)
+    server = StubServer(latency=latency, distinct_grids=True).start()
+    try:
+        import nws_api_service_async
+        reset_client(server)
+        start = time.perf_counter()
+        run_sync(points)
+        sync_s = time.perf_counter() - start
+
+        reset_client(server)
+        requests_before = server.request_count
+        start = time.perf_counter()
+        asyncio.run(run_async(points))
+        async_s = time.perf_counter() - start
+
+        print(f"{count} points, stub latency {latency * 1000:.0f} ms, "
+              f"{server.request_count - requests_before} requests per run, "
+              f"async concurrency {nws_api_service_async.MAX_CONCURRENCY}\n")
+        print(f"{'mode':<14}{'seconds':>10}{'points/s':>12}")
+        print(f"{'sync loop':<14}{sync_s:>10.2f}{count / sync_s:>12.1f}")
+        print(f"{'async':<14}{async_s:>10.2f}{count / async_s:>12.1f}")
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Bulk forecasts: many store locations, looped one at a time vs the batch API.
+
+Locations cluster (several stores per ~2.5 km grid cell), so the batch API
+fetches each distinct cell once, concurrently, while the loop resolves and
+fetches every location in turn (its repeats hit the product cache). The
+stub server gives each cell its own grid and adds per-request latency. The
+client's rate limit is lifted so the numbers show dedup and concurrency.
+
+Usage: python benchmarks/bench_bulk_forecast.py [locations] [per_cell] [latency_seconds]
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'chatbot_forecast'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'NWS-FORECAST'))
+import services.nws_client as nws_client
+from services.nws_client import NWSClient
+from services.points_cache import PointsCache
+from stub_server import StubServer
+
+
+def stores(count, per_cell):
+    """`count` locations, `per_cell` of them within each 0.025° stub grid cell."""
+    cells = (count + per_cell - 1) // per_cell
+    return [(39.0 + 0.05 * (i % cells) + 0.001 * (i // cells), -94.5 + 0.001 * (i // cells))
+            for i in range(count)]
+
+
+def reset_client(server):
+    nws_client._shared_client = NWSClient(base_url=server.base_url, points_cache=PointsCache(':memory:'),
+                                          rate_limit=10_000, burst=10_000)
+    import nws_api_service
+    nws_api_service._weather_service.client = nws_client._shared_client
+    nws_api_service._weather_service.cache.clear()
+
+
+def run_loop(service, locations):
+    for lat, lon in locations:
+        grid_id, grid_x, grid_y, error = service.get_grid_coordinates(lat, lon)
+        assert error is None, error
+        assert len(service.get_all_forecasts_for_grid(grid_id, grid_x, grid_y)) == 3
+
+
+def run_bulk(service, locations):
+    first = None
+    start = time.perf_counter()
+    for item in service.iter_forecasts_for_locations(locations):
+        assert item["error"] is None, item["error"]
+        if first is None:
+            first = time.perf_counter() - start
+    return first
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    per_cell = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.05
+    locations = stores(count, per_cell)
+    server = StubServer(latency=latency, distinct_grids=True).start()
+    try:
+        import nws_api_service as service
+        reset_client(server)
+        before = server.request_count
+        start = time.perf_counter()
+        run_loop(service, locations)
+        loop_s, loop_requests = time.perf_counter() - start, server.request_count - before
+
+        reset_client(server)
+        before = server.request_count
+        start = time.perf_counter()
+        first = run_bulk(service, locations)
+        bulk_s, bulk_requests = time.perf_counter() - start, server.request_count - before
+
+        print(f"{count} locations, {per_cell} per grid cell, stub latency {latency * 1000:.0f} ms\n")
+        print(f"{'mode':<12}{'seconds':>10}{'locations/s':>14}{'requests':>10}{'first result s':>16}")
+        print(f"{'loop':<12}{loop_s:>10.2f}{count / loop_s:>14.1f}{loop_requests:>10}{'':>16}")
+        print(f"{'batch':<12}{bulk_s:>10.2f}{count / bulk_s:>14.1f}{bulk_requests:>10}{first:>16.2f}")
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
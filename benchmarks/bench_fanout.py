@@ -0,0 +1,46 @@
+"""
+Sequential vs concurrent fetch of the three gridpoint products.
+
+Replays the bundled NWS-FORECAST fixtures from the local stub server with a
+fixed per-request latency to stand in for api.weather.gov round-trips.
+
+Usage: python benchmarks/bench_fanout.py [latency_seconds] [rounds]
+"""
+import os
+import sys
+import time
+import statistics
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'chatbot_forecast'))
+from services.nws_client import NWSClient
+from stub_server import StubServer
+
+
+if __name__ == "__main__":
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.15
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    server = StubServer(latency=latency).start()
+    grid = f"{server.base_url}/gridpoints/EAX/44,51"
+    urls = {"forecast": f"{grid}/forecast", "hourly": f"{grid}/forecast/hourly", "grid": grid}
+    client = NWSClient()
+
+    sequential, concurrent = [], []
+    try:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for url in urls.values():
+                client.get_json(url)
+            sequential.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            results, errors = client.get_json_many(urls)
+            concurrent.append(time.perf_counter() - start)
+            assert not errors and len(results) == 3
+    finally:
+        server.stop()
+
+    seq_ms, con_ms = statistics.mean(sequential) * 1000, statistics.mean(concurrent) * 1000
+    print(f"{rounds} rounds, {latency * 1000:.0f} ms simulated latency per request")
+    print(f"sequential  mean={seq_ms:8.1f} ms")
+    print(f"concurrent  mean={con_ms:8.1f} ms")
+    print(f"speedup     {seq_ms / con_ms:.2f}x")
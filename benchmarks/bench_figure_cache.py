@@ -0,0 +1,67 @@
+"""
+Figure cache: building Plotly figures vs serving them from FigureCache.
+
+Measures a cold build and a repeat view for every dashboard tab (figures
+keyed by data token, graph id and theme) and for
+nws_api_service.create_24hr_forecast_plot (keyed by the content hash of
+its 24 periods). Uses full-size synthetic payloads; no network access is needed.
+
+Usage: python benchmarks/bench_figure_cache.py [iterations]
+"""
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'NWS-FORECAST'))
+import dashboard
+import nws_api_service
+from stub_server import load_fixture, synthetic_grid, synthetic_hourly
+
+
+def median_ms(func, iterations, before=None):
+    samples = []
+    for _ in range(iterations):
+        if before:
+            before()
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def clear_dashboard():
+    dashboard.render_cache.clear()
+    dashboard.figure_cache.clear()
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    now = datetime.now().astimezone().replace(minute=0, second=0, microsecond=0)
+    hourly = synthetic_hourly(start=now)
+    token = dashboard.result_store.put({
+        'lat': '39.0997', 'lon': '-94.5786',
+        'forecast': load_fixture('forecast.json'),
+        'hourly': hourly,
+        'grid': synthetic_grid(start=now),
+    })
+
+    print(f"{'figure(s)':<28}{'cold ms':>10}{'cached ms':>12}")
+    for tab in dashboard.TAB_GRAPHS:
+        render = lambda: dashboard.render_tab(token, tab, dashboard.DARK_THEME)
+        cold = median_ms(render, iterations, before=clear_dashboard)
+        warm = median_ms(render, iterations)
+        print(f"{'dashboard tab: ' + tab:<28}{cold:>10.2f}{warm:>12.3f}")
+
+    periods = hourly['properties']['periods']
+    plot = lambda: nws_api_service.create_24hr_forecast_plot(periods)
+    cold = median_ms(plot, iterations, before=nws_api_service._figure_cache.clear)
+    warm = median_ms(plot, iterations)
+    print(f"{'create_24hr_forecast_plot':<28}{cold:>10.2f}{warm:>12.3f}")
+    print(f"\ndashboard figure cache: {dashboard.figure_cache.stats()}")
+
+
+if __name__ == '__main__':
+    main()
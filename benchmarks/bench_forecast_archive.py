@@ -0,0 +1,69 @@
+"""
+Forecast archive: append and query cost for a Parquet archive of gridpoint forecasts.
+
+Archives `issuances` synthetic full-size gridpoint payloads (one per hourly
+update) for each of `cells` grid cells, re-appends one issuance to show the
+dedup path, then times a cell + time-range query and a forecast-vs-forecast
+comparison. Needs pyarrow.
+
+Usage: python benchmarks/bench_forecast_archive.py [cells] [issuances]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'chatbot_forecast'))
+from services.forecast_archive import ForecastArchive, grid_to_rows
+from stub_server import synthetic_grid
+
+
+def issuance(base_grid, x, issued):
+    return {'properties': dict(base_grid['properties'], gridX=x, updateTime=issued.isoformat())}
+
+
+def main():
+    cells = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    issuances = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    try:
+        archive = ForecastArchive(tempfile.mkdtemp(prefix='forecast_archive_'))
+    except ImportError as e:
+        print(f"Skipping: {e}")
+        return
+
+    base = synthetic_grid()
+    first_issued = datetime(2025, 11, 28, 5, tzinfo=timezone.utc)
+    payloads = [issuance(base, 100 + c, first_issued + timedelta(hours=i))
+                for c in range(cells) for i in range(issuances)]
+    rows_per_payload = len(grid_to_rows(payloads[0]))
+
+    start = time.perf_counter()
+    for grid in payloads:
+        archive.append(grid)
+    append_ms = (time.perf_counter() - start) * 1000 / len(payloads)
+
+    # A new process re-appending the same issuance (e.g. after a 304) writes nothing
+    start = time.perf_counter()
+    rewritten = ForecastArchive(archive.path).append(payloads[0])
+    dedup_ms = (time.perf_counter() - start) * 1000
+
+    window_start = first_issued + timedelta(hours=12)
+    start = time.perf_counter()
+    df = archive.query('EAX', 100, 51, window_start, window_start + timedelta(hours=24), layers=['temperature'])
+    query_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    table = archive.compare_issuances('EAX', 100, 51, 'temperature')
+    compare_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{cells} cells x {issuances} issuances, {rows_per_payload} rows per payload, "
+          f"{archive.rows_written:,} rows archived\n")
+    print(f"append (per payload)           {append_ms:8.2f} ms")
+    print(f"re-append archived issuance    {dedup_ms:8.2f} ms  ({rewritten} new rows)")
+    print(f"query cell, 24h, 1 layer       {query_ms:8.2f} ms  ({len(df)} rows)")
+    print(f"compare issuances, 1 layer     {compare_ms:8.2f} ms  ({table.shape[0]} x {table.shape[1]})")
+
+
+if __name__ == '__main__':
+    main()
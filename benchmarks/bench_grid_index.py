@@ -0,0 +1,74 @@
+"""
+Current-value lookup on a gridpoint payload: linear validTime scan vs GridIndex.
+
+Uses NWS-FORECAST/forecast_grid_data.json. The bundled capture is short, so
+its temperature layer is also extended to a full 7-day hourly series (the
+size of a real response) to show how both approaches scale.
+
+Usage: python benchmarks/bench_grid_index.py [iterations]
+"""
+import copy
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta, timezone
+
+import isodate
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'chatbot_forecast'))
+from services.grid_index import GridIndex, get_grid_index
+from stub_server import load_fixture
+
+
+def linear_lookup(grid_data, parameter, now):
+    """The pre-index implementation from dashboard.get_current_grid_value."""
+    values = grid_data['properties'][parameter]['values']
+    for item in values:
+        time_str, duration_str = item['validTime'].split('/')
+        start_time = datetime.fromisoformat(time_str)
+        end_time = start_time + isodate.parse_duration(duration_str)
+        if start_time <= now < end_time:
+            return item['value']
+    return None
+
+
+def extend_to_week(grid_data):
+    """Repeats the temperature layer hourly over 7 days from its first validTime."""
+    grid_data = copy.deepcopy(grid_data)
+    layer = grid_data['properties']['temperature']
+    first = datetime.fromisoformat(layer['values'][0]['validTime'].split('/')[0])
+    pattern = [v['value'] for v in layer['values']]
+    layer['values'] = [
+        {'validTime': f"{(first + timedelta(hours=h)).isoformat()}/PT1H", 'value': pattern[h % len(pattern)]}
+        for h in range(7 * 24)
+    ]
+    grid_data['properties']['updateTime'] = 'extended'
+    return grid_data
+
+
+def run(label, grid_data, iterations):
+    values = grid_data['properties']['temperature']['values']
+    # Probe the last interval: the worst case for the linear scan
+    last_start = datetime.fromisoformat(values[-1]['validTime'].split('/')[0])
+    now = last_start + timedelta(minutes=30)
+
+    index = GridIndex(grid_data)
+    assert linear_lookup(grid_data, 'temperature', now) == index.value_at('temperature', now)[0]
+
+    linear = timeit.timeit(lambda: linear_lookup(grid_data, 'temperature', now), number=iterations)
+    build = timeit.timeit(lambda: GridIndex(grid_data).layer('temperature'), number=max(iterations // 10, 1))
+    indexed = timeit.timeit(lambda: index.value_at('temperature', now), number=iterations)
+    memoized = timeit.timeit(lambda: get_grid_index(grid_data).value_at('temperature', now), number=iterations)
+
+    print(f"{label}: {len(values)} entries")
+    print(f"  linear scan        {linear / iterations * 1e6:9.2f} us/lookup")
+    print(f"  index build (once) {build / max(iterations // 10, 1) * 1e6:9.2f} us")
+    print(f"  index lookup       {indexed / iterations * 1e6:9.2f} us/lookup  ({linear / indexed:.0f}x)")
+    print(f"  memoized + lookup  {memoized / iterations * 1e6:9.2f} us/lookup  ({linear / memoized:.0f}x)")
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    grid = load_fixture('forecast_grid_data.json')
+    run("fixture", grid, iterations)
+    run("7-day hourly", extend_to_week(grid), iterations)
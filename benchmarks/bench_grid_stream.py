@@ -0,0 +1,58 @@
+"""
+Full json.loads vs streaming layer extraction for a gridpoint payload.
+
+The bundled forecast_grid_data.json capture is short, so it is inflated to
+real-response size: 60 layers of 7-day hourly values. Reports decode time
+and peak traced memory for keeping the full document vs a few layers.
+
+Usage: python benchmarks/bench_grid_stream.py [iterations]
+"""
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'chatbot_forecast'))
+from services.grid_stream import extract_layers
+from bench_grid_index import extend_to_week
+from stub_server import load_fixture
+
+N_LAYERS = 60
+WANTED = ['temperature', 'windSpeed', 'skyCover', 'hazards']
+CHUNK = 64 * 1024
+
+
+def inflate(grid_data):
+    grid_data = extend_to_week(grid_data)
+    props = grid_data['properties']
+    template = props['temperature']
+    for i in range(N_LAYERS):
+        props[f'layer{i}'] = template
+    for name in WANTED:
+        props[name] = template
+    return json.dumps(grid_data, indent=4).encode()
+
+
+def measure(fn, iterations):
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations, peak
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    body = inflate(load_fixture('forecast_grid_data.json'))
+    chunks = [body[i:i + CHUNK] for i in range(0, len(body), CHUNK)]
+
+    full_t, full_peak = measure(lambda: json.loads(b''.join(chunks)), iterations)
+    stream_t, stream_peak = measure(lambda: extract_layers(chunks, WANTED), iterations)
+
+    print(f"payload {len(body) / 1024:.0f} KB, keeping {len(WANTED)} of {N_LAYERS + len(WANTED)} layers")
+    print(f"json.loads (full)  {full_t * 1e3:8.2f} ms   peak {full_peak / 1024:8.0f} KB")
+    print(f"extract_layers     {stream_t * 1e3:8.2f} ms   peak {stream_peak / 1024:8.0f} KB")
@@ -0,0 +1,83 @@
+"""
+Hourly-period feature extraction: row-wise .apply vs normalize_hourly.
+
+The "before" path is what dashboard.py did per render (the 24-hour slice
+and the full range each derived their own columns) plus the Streamlit
+forecast path in streamlit_test.py. normalize_hourly builds every column
+once in a single vectorized pass. Uses a 156-period forecastHourly payload
+(the size NWS returns); no network access is needed.
+
+Usage: python benchmarks/bench_hourly_frame.py [iterations]
+"""
+import os
+import sys
+import timeit
+from datetime import datetime, timezone
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'chatbot_forecast'))
+from services.hourly_frame import normalize_hourly
+from stub_server import synthetic_hourly
+
+
+def rowwise_dashboard(data):
+    """The pre-normalizer dashboard path: 24h slice and full range."""
+    hourly_df = pd.DataFrame(data['properties']['periods'])
+    hourly_df['startTime'] = pd.to_datetime(hourly_df['startTime'])
+
+    now = datetime.now(timezone.utc)
+    df_24h = hourly_df[hourly_df['startTime'] >= now].head(24).copy()
+    df_24h['wind_speed_val'] = df_24h['windSpeed'].str.extract(r'(\d+)').astype(float)
+    df_24h['pop_val'] = df_24h['probabilityOfPrecipitation'].apply(lambda x: x['value'] if x else 0)
+
+    hourly_df['wind_speed_val'] = hourly_df['windSpeed'].str.extract(r'(\d+)').astype(float)
+    hourly_df['dewpoint_val'] = hourly_df['dewpoint'].apply(lambda x: x['value'] if x else None)
+    hourly_df['dewpoint_f'] = (hourly_df['dewpoint_val'] * 9/5) + 32
+    hourly_df['humidity_val'] = hourly_df['relativeHumidity'].apply(lambda x: x['value'] if x else None)
+    hourly_df['pop_val'] = hourly_df['probabilityOfPrecipitation'].apply(lambda x: x['value'] if x else 0)
+    return hourly_df, df_24h
+
+
+def rowwise_streamlit(data):
+    """The pre-normalizer streamlit_test.py forecast path."""
+    df = pd.DataFrame(data['properties']['periods'])
+    for column in ('probabilityOfPrecipitation', 'dewpoint', 'relativeHumidity'):
+        df[column + '_value'] = df[column].apply(
+            lambda x: x['value'] if isinstance(x, dict) and 'value' in x else None)
+    df['windSpeed_num'] = df['windSpeed'].str.extract(r'(\d+)').astype(float)
+    return df
+
+
+def vectorized_dashboard(data):
+    hourly_df = normalize_hourly(data)
+    now = datetime.now(timezone.utc)
+    return hourly_df, hourly_df[hourly_df['startTime'] >= now].head(24)
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    now = datetime.now().astimezone().replace(minute=0, second=0, microsecond=0)
+    data = synthetic_hourly(periods=156, start=now)
+
+    # Same numbers either way
+    old, _ = rowwise_dashboard(data)
+    new, _ = vectorized_dashboard(data)
+    for column in ('wind_speed_val', 'pop_val', 'dewpoint_f', 'humidity_val'):
+        assert ((old[column].astype(float) - new[column]).abs().fillna(0) < 1e-9).all(), column
+
+    cases = [
+        ("dashboard: row-wise (before)", lambda: rowwise_dashboard(data)),
+        ("dashboard: normalize_hourly", lambda: vectorized_dashboard(data)),
+        ("streamlit: row-wise (before)", lambda: rowwise_streamlit(data)),
+        ("streamlit: normalize_hourly", lambda: normalize_hourly(data, parse_times=False)),
+    ]
+    print(f"156 periods, {iterations} iterations\n")
+    print(f"{'path':<32}{'ms/call':>10}")
+    for name, func in cases:
+        ms = timeit.timeit(func, number=iterations) / iterations * 1000
+        print(f"{name:<32}{ms:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Pooled vs unpooled request latency against the local stub server.
+
+Usage: python benchmarks/bench_pooling.py [n_requests]
+"""
+import os
+import sys
+import time
+import statistics
+import requests
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'chatbot_forecast'))
+from services.nws_client import NWSClient
+from stub_server import StubServer
+
+
+def time_calls(fn, n):
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label, samples):
+    print(f"{label:<10} mean={statistics.mean(samples):7.3f} ms  "
+          f"p50={statistics.median(samples):7.3f} ms  max={max(samples):7.3f} ms")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    server = StubServer().start()
+    url = f"{server.base_url}/gridpoints/EAX/44,51/forecast"
+    headers = {"User-Agent": "(nextweather-bench, contact@example.com)"}
+
+    try:
+        unpooled = time_calls(lambda: requests.get(url, headers=headers).json(), n)
+        client = NWSClient(user_agent=headers["User-Agent"])
+        pooled = time_calls(lambda: client.get_json(url), n)
+    finally:
+        server.stop()
+
+    print(f"{n} GETs of {url}")
+    report("unpooled", unpooled)
+    report("pooled", pooled)
+    print(f"speedup    {statistics.mean(unpooled) / statistics.mean(pooled):.2f}x")
@@ -0,0 +1,63 @@
+"""
+Background prefetch: time-to-data for a watched location, cold vs prefetched.
+
+A Prefetcher keeps a small watch list warm against the stub server (with
+per-request latency). A "view" is the call the dashboard makes after the
+fetch button: WeatherService.get_weather_data plus the point's alerts.
+
+Usage: python benchmarks/bench_prefetch.py [latency_seconds]
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'chatbot_forecast'))
+import services.nws_client as nws_client
+from services.nws_client import NWSClient
+from services.points_cache import PointsCache
+from services.prefetch import Prefetcher
+from services.weather_service import WeatherService
+from stub_server import StubServer
+
+WATCH_LIST = [(39.0997, -94.5786), (47.6062, -122.3321), (40.7128, -74.0060)]
+
+
+def fresh_service(server):
+    nws_client._shared_client = NWSClient(base_url=server.base_url, points_cache=PointsCache(':memory:'))
+    return WeatherService()
+
+
+def view(service, lat, lon):
+    start = time.perf_counter()
+    data = service.get_weather_data(lat, lon)
+    service.get_active_alerts(lat, lon)
+    assert "error" not in data, data
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.15
+    server = StubServer(latency=latency, etags=True).start()
+    try:
+        cold = [view(fresh_service(server), lat, lon) for lat, lon in WATCH_LIST]
+
+        service = fresh_service(server)
+        prefetcher = Prefetcher(service, WATCH_LIST, min_interval=0.05).start()
+        while prefetcher.refreshes + prefetcher.alert_refreshes < 2 * len(WATCH_LIST):
+            time.sleep(0.05)
+        requests_before = server.request_count
+        warm = [view(service, lat, lon) for lat, lon in WATCH_LIST]
+        prefetcher.stop()
+
+        print(f"Stub latency {latency * 1000:.0f} ms per request\n")
+        print(f"{'location':<22}{'cold ms':>10}{'prefetched ms':>16}")
+        for (lat, lon), c, w in zip(WATCH_LIST, cold, warm):
+            print(f"{f'{lat},{lon}':<22}{c:>10.1f}{w:>16.3f}")
+        print(f"\nUpstream requests during prefetched views: {server.request_count - requests_before}")
+        print(f"Prefetcher: {prefetcher.stats()}")
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Rate limiting and retries against a fault-injecting stub.
+
+Each scenario sends the same burst of concurrent gridpoint requests through
+NWSClient and reports how many succeeded, how long the burst took, and the
+client's throttled/retried metrics:
+
+  - random 503s (30%), without and with retry/backoff
+  - a server that allows 5 req/s and answers 429 + Retry-After beyond that,
+    without and with the adaptive token bucket
+
+Usage: python benchmarks/bench_retry.py [requests]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'chatbot_forecast'))
+from services.nws_client import NWSClient
+from stub_server import StubServer
+
+SCENARIOS = [
+    # name, stub options, client options
+    ("503s, no retries", dict(fault_rate=0.3), dict(max_retries=0, rate_limit=1000, burst=1000)),
+    ("503s, retry + backoff", dict(fault_rate=0.3), dict(rate_limit=1000, burst=1000)),
+    ("5 req/s cap, no limiter", dict(max_rps=5, retry_after=1), dict(max_retries=0, rate_limit=1000, burst=1000)),
+    ("5 req/s cap, limiter + retries", dict(max_rps=5, retry_after=1), dict(rate_limit=5, burst=5)),
+]
+
+
+def run(stub_options, client_options, count):
+    server = StubServer(**stub_options).start()
+    client = NWSClient(base_url=server.base_url, coalesce=False, **client_options)
+    url = f"{server.base_url}/gridpoints/EAX/44,51/forecast"
+
+    def fetch(_):
+        try:
+            client.get_json(url)
+            return True
+        except requests.exceptions.RequestException:
+            return False
+
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            ok = sum(executor.map(fetch, range(count)))
+    finally:
+        server.stop()
+    return ok, time.perf_counter() - start, server.request_count, client.stats()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    print(f"{count} requests, 8 threads\n")
+    print(f"{'scenario':<32}{'ok':>6}{'secs':>8}{'sent':>7}{'throttled':>11}{'retried':>9}{'wait s':>8}{'rate':>7}")
+    for name, stub_options, client_options in SCENARIOS:
+        ok, secs, sent, stats = run(stub_options, client_options, count)
+        print(f"{name:<32}{ok:>6}{secs:>8.2f}{sent:>7}{stats['throttled']:>11}{stats['retried']:>9}"
+              f"{stats['limiter_wait']:>8.1f}{stats['rate_limit']:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Load test for request coalescing: upstream calls vs concurrent users.
+
+N threads ask WeatherService for the same hot location at once, starting
+from a cold cache each round. With single-flight enabled the number of
+requests reaching the stub server should stay flat as N grows.
+
+Usage: python benchmarks/bench_singleflight.py [latency_seconds]
+"""
+import os
+import sys
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'chatbot_forecast'))
+import services.nws_client as nws_client
+from services.nws_client import NWSClient
+from services.points_cache import PointsCache
+from services.weather_service import WeatherService
+from stub_server import StubServer
+
+USER_COUNTS = [1, 5, 10, 25, 50]
+
+
+def run_round(server, users, coalesce):
+    # Fresh client and caches so every round starts cold
+    nws_client._shared_client = NWSClient(base_url=server.base_url, coalesce=coalesce,
+                                          points_cache=PointsCache(':memory:'))
+    service = WeatherService()
+    start_count = server.request_count
+    barrier = threading.Barrier(users)
+    errors = []
+
+    def user():
+        barrier.wait()
+        data = service.get_weather_data(39.0997, -94.5786)
+        if "error" in data:
+            errors.append(data["error"])
+
+    threads = [threading.Thread(target=user) for _ in range(users)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors, errors
+    return server.request_count - start_count
+
+
+if __name__ == "__main__":
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.2
+    server = StubServer(latency=latency).start()
+    try:
+        print(f"{'users':>6} {'upstream (coalesced)':>22} {'upstream (no coalescing)':>26}")
+        for users in USER_COUNTS:
+            coalesced = run_round(server, users, coalesce=True)
+            uncoalesced = run_round(server, users, coalesce=False)
+            print(f"{users:>6} {coalesced:>22} {uncoalesced:>26}")
+    finally:
+        server.stop()
@@ -0,0 +1,75 @@
+"""
+Stale-while-revalidate: time-to-data for a location whose cached products just expired.
+
+With a slow upstream (the stub server's per-request latency), a blocking view
+waits for the refetch; a stale-while-revalidate view returns the last good
+payloads at once and refreshes them in the background.
+
+Usage: python benchmarks/bench_swr.py [latency_seconds]
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'chatbot_forecast'))
+import services.nws_client as nws_client
+from services.nws_client import NWSClient
+from services.points_cache import PointsCache
+from services.weather_service import WeatherService
+from stub_server import StubServer
+
+LAT, LON = 39.0997, -94.5786
+ROUNDS = 5
+
+
+def expire_all(cache):
+    """Backdates every entry so it is just past its TTL (still within the stale window)."""
+    with cache._lock:
+        for key, (_, stored_at, value) in cache._data.items():
+            cache._data[key] = (time.time() - 1, stored_at, value)
+
+
+def timed_view(service, allow_stale):
+    start = time.perf_counter()
+    data = service.get_weather_data(LAT, LON, allow_stale=allow_stale)
+    elapsed = (time.perf_counter() - start) * 1000
+    assert "error" not in data, data
+    return elapsed, data.get('stale', False)
+
+
+def run(server, allow_stale):
+    nws_client._shared_client = NWSClient(base_url=server.base_url, points_cache=PointsCache(':memory:'))
+    service = WeatherService()
+    service.get_weather_data(LAT, LON)
+    times, refresh_ms = [], []
+    for _ in range(ROUNDS):
+        expire_all(service.cache)
+        elapsed, stale = timed_view(service, allow_stale)
+        assert stale == allow_stale
+        times.append(elapsed)
+        start = time.perf_counter()
+        service.refresher.wait(service.client.get_point(LAT, LON)['forecastGridData'])
+        refresh_ms.append((time.perf_counter() - start) * 1000 + elapsed)
+    # After the background refresh the next view is fresh again
+    _, stale = timed_view(service, allow_stale)
+    assert not stale
+    return times, refresh_ms
+
+
+def main():
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.5
+    server = StubServer(latency=latency, etags=True).start()
+    try:
+        blocking, _ = run(server, allow_stale=False)
+        stale, refreshed = run(server, allow_stale=True)
+        print(f"Stub latency {latency * 1000:.0f} ms per request, {ROUNDS} expired views each\n")
+        print(f"{'mode':<26}{'mean ms':>10}{'max ms':>10}")
+        print(f"{'blocking refetch':<26}{sum(blocking) / ROUNDS:>10.1f}{max(blocking):>10.1f}")
+        print(f"{'stale-while-revalidate':<26}{sum(stale) / ROUNDS:>10.2f}{max(stale):>10.2f}")
+        print(f"{'  (fresh data landed at)':<26}{sum(refreshed) / ROUNDS:>10.1f}{max(refreshed):>10.1f}")
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Dashboard first paint: building every tab's figures vs only the active tab.
+
+After "Fetch Weather Data" the dashboard used to build the figures for all
+five tabs in main-tabs. It now builds the active tab and the others on
+first view, memoized per data token. Uses a full-size synthetic payload
+(156 hourly periods, 7 days of gridpoint layers); no network access is needed.
+
+Usage: python benchmarks/bench_tab_render.py [iterations]
+"""
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import dashboard
+from stub_server import load_fixture, synthetic_grid, synthetic_hourly
+
+
+def timed(func, iterations):
+    samples = []
+    for _ in range(iterations):
+        dashboard.render_cache.clear()
+        dashboard.figure_cache.clear()
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    now = datetime.now().astimezone().replace(minute=0, second=0, microsecond=0)
+    token = dashboard.result_store.put({
+        'lat': '39.0997', 'lon': '-94.5786',
+        'forecast': load_fixture('forecast.json'),
+        'hourly': synthetic_hourly(start=now),
+        'grid': synthetic_grid(start=now),
+    })
+
+    def all_tabs():
+        dashboard.render_kpis(token)
+        for tab in dashboard.TAB_GRAPHS:
+            dashboard.render_tab(token, tab, dashboard.LIGHT_THEME)
+
+    all_ms = timed(all_tabs, iterations)
+    print(f"{'first paint':<30}{'median ms':>12}")
+    print(f"{'all five tabs (before)':<30}{all_ms:>12.1f}")
+    for tab in dashboard.TAB_GRAPHS:
+        ms = timed(lambda: (dashboard.render_kpis(token), dashboard.render_tab(token, tab, dashboard.LIGHT_THEME)), iterations)
+        print(f"{'active tab: ' + tab:<30}{ms:>12.1f}")
+
+    dashboard.render_tab(token, '24h', dashboard.LIGHT_THEME)
+    start = time.perf_counter()
+    dashboard.render_tab(token, '24h', dashboard.LIGHT_THEME)
+    print(f"\nRevisiting a rendered tab: {(time.perf_counter() - start) * 1000:.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
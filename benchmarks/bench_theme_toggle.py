@@ -0,0 +1,81 @@
+"""
+Dashboard theme toggle: full re-render vs theme-only callbacks.
+
+Before the split, flipping the theme re-ran the whole rendering callback
+(hourly DataFrame, 12 KPIs, 14 Plotly figures). Now the figures are built
+once per fetch and a toggle only restyles containers and patches each
+figure's template. Uses a full-size synthetic payload (156 hourly periods,
+7 days of gridpoint layers); no network access is needed.
+
+Usage: python benchmarks/bench_theme_toggle.py [iterations]
+"""
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+from plotly.utils import PlotlyJSONEncoder
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import dashboard
+from stub_server import load_fixture, synthetic_grid, synthetic_hourly
+
+CARD_STYLES = [{'width': '45%'}] * len(dashboard.GRAPH_IDS)
+
+
+def unwrap(func):
+    return getattr(func, '__wrapped__', func)
+
+
+def timed(func, iterations):
+    samples, out = [], None
+    for _ in range(iterations):
+        start = time.perf_counter()
+        out = func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), len(json.dumps(out, cls=PlotlyJSONEncoder))
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    now = datetime.now().astimezone().replace(minute=0, second=0, microsecond=0)
+    token = dashboard.result_store.put({
+        'lat': '39.0997', 'lon': '-94.5786',
+        'forecast': load_fixture('forecast.json'),
+        'hourly': synthetic_hourly(start=now),
+        'grid': synthetic_grid(start=now),
+    })
+    update_theme = unwrap(dashboard.update_theme)
+    update_figure_theme = unwrap(dashboard.update_figure_theme)
+
+    def render_all(theme):
+        kpis = dashboard.render_kpis(token)
+        figures = {}
+        for tab in dashboard.TAB_GRAPHS:
+            figures.update(dashboard.render_tab(token, tab, theme))
+        return kpis, [figures[g] for g in dashboard.GRAPH_IDS]
+
+    def full_rerender():
+        # What every toggle used to cost: all data processing plus all styles
+        dashboard.render_cache.clear()
+        dashboard.figure_cache.clear()
+        return render_all(dashboard.DARK_THEME), update_theme(['dark'], CARD_STYLES)
+
+    def theme_only():
+        return update_theme(['dark'], CARD_STYLES), update_figure_theme(['dark'], token)
+
+    before_ms, before_bytes = timed(full_rerender, iterations)
+    after_ms, after_bytes = timed(theme_only, iterations)
+    refetch_ms, _ = timed(lambda: render_all(dashboard.LIGHT_THEME), iterations)
+
+    print(f"{'path':<34}{'median ms':>12}{'response KB':>14}")
+    print(f"{'full re-render (before)':<34}{before_ms:>12.2f}{before_bytes / 1024:>14.1f}")
+    print(f"{'theme-only callbacks (after)':<34}{after_ms:>12.2f}{after_bytes / 1024:>14.1f}")
+    print(f"{'render from cache (same token)':<34}{refetch_ms:>12.2f}")
+    print(f"\nToggle speedup: {before_ms / after_ms:.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+validTime parsing: datetime.fromisoformat + isodate vs services.valid_time.
+
+Parses a synthetic layer mixing the duration forms NWS emits (PT1H, PT3H,
+P1D, P1DT6H) at 168 entries (one hourly week) and 1,000 entries.
+
+Usage: python benchmarks/bench_valid_time.py [iterations]
+"""
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta, timezone
+
+import isodate
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'chatbot_forecast'))
+from services.valid_time import parse_valid_times
+
+DURATIONS = ['PT1H', 'PT1H', 'PT1H', 'PT3H', 'P1D', 'P1DT6H']
+
+
+def make_layer(n):
+    start = datetime(2025, 11, 27, 23, tzinfo=timezone.utc)
+    return [f"{(start + timedelta(hours=h)).isoformat()}/{DURATIONS[h % len(DURATIONS)]}" for h in range(n)]
+
+
+def isodate_parse(valid_times):
+    starts, ends = [], []
+    for valid_time in valid_times:
+        time_str, duration_str = valid_time.split('/')
+        start = datetime.fromisoformat(time_str)
+        starts.append(start.timestamp())
+        ends.append((start + isodate.parse_duration(duration_str)).timestamp())
+    return starts, ends
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    for n in (168, 1000):
+        layer = make_layer(n)
+        expected = isodate_parse(layer)
+        got = parse_valid_times(layer)
+        assert np.allclose(expected[0], got[0]) and np.allclose(expected[1], got[1])
+
+        slow = timeit.timeit(lambda: isodate_parse(layer), number=iterations) / iterations
+        fast = timeit.timeit(lambda: parse_valid_times(layer), number=iterations) / iterations
+        print(f"{n:>5} validTimes  isodate {slow * 1e3:8.3f} ms   valid_time {fast * 1e3:8.3f} ms   ({slow / fast:.0f}x)")
@@ -0,0 +1,334 @@
+"""
+Local stand-in for api.weather.gov used by the benchmarks in this folder.
+
+Serves the bundled NWS-FORECAST/*.json fixtures over HTTP/1.1 with keep-alive
+so pooled and unpooled clients can be compared without touching the network.
+
+The forecast fixtures in the repo are truncated captures, so they are repaired
+in memory (cut at the last complete value, open brackets closed) before use.
+"""
+import copy
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), '..', 'NWS-FORECAST')
+
+
+def repair_truncated_json(text):
+    """Returns the longest valid JSON document that is a prefix of `text` plus closers."""
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    # Record the open-bracket stack after every closing bracket outside strings.
+    stack, cut_points = [], []
+    in_string = escaped = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in '{[':
+            stack.append('}' if ch == '{' else ']')
+        elif ch in '}]':
+            stack.pop()
+            cut_points.append((i + 1, ''.join(reversed(stack))))
+
+    for end, closers in reversed(cut_points):
+        try:
+            return json.loads(text[:end] + closers)
+        except json.JSONDecodeError:
+            continue
+    raise ValueError("No recoverable JSON prefix found")
+
+
+def load_fixture(name):
+    """Loads a bundled fixture as parsed JSON, repairing truncation if needed."""
+    with open(os.path.join(FIXTURE_DIR, name), encoding='utf-8') as f:
+        return repair_truncated_json(f.read())
+
+
+# Layers a real gridpoint response carries that the dashboard reads: (name, uom, base, swing)
+SYNTHETIC_LAYERS = [
+    ('temperature', 'wmoUnit:degC', 5, 6), ('dewpoint', 'wmoUnit:degC', 0, 3),
+    ('maxTemperature', 'wmoUnit:degC', 10, 2), ('minTemperature', 'wmoUnit:degC', 0, 2),
+    ('relativeHumidity', 'wmoUnit:percent', 70, 20), ('apparentTemperature', 'wmoUnit:degC', 3, 6),
+    ('heatIndex', 'wmoUnit:degC', 5, 6), ('windChill', 'wmoUnit:degC', 1, 6),
+    ('skyCover', 'wmoUnit:percent', 50, 45), ('windDirection', 'wmoUnit:degree_(angle)', 180, 170),
+    ('windSpeed', 'wmoUnit:km_h-1', 15, 10), ('windGust', 'wmoUnit:km_h-1', 25, 15),
+    ('probabilityOfPrecipitation', 'wmoUnit:percent', 30, 30), ('quantitativePrecipitation', 'wmoUnit:mm', 1, 1),
+    ('probabilityOfThunder', 'nwsUnit:category', 1, 1),
+]
+
+
+def synthetic_grid(hours=7 * 24, start=None):
+    """A full-size gridpoint payload: the fixture's metadata with hourly series for every layer."""
+    grid = copy.deepcopy(load_fixture("forecast_grid_data.json"))
+    props = grid['properties']
+    start = start or datetime.fromisoformat(props['temperature']['values'][0]['validTime'].split('/')[0])
+    for i, (name, uom, base, swing) in enumerate(SYNTHETIC_LAYERS):
+        values = []
+        for h in range(hours):
+            value = base + swing * ((h * 7 + i * 3) % 24 - 12) / 12
+            if name == 'probabilityOfThunder':
+                value = h % 5
+            values.append({'validTime': f"{(start + timedelta(hours=h)).isoformat()}/PT1H", 'value': round(value, 2)})
+        props[name] = {'uom': uom, 'values': values}
+    props['hazards'] = {'values': [
+        {'validTime': f"{(start + timedelta(hours=6)).isoformat()}/P1DT6H",
+         'value': [{'phenomenon': 'WS', 'significance': 'A', 'event_number': 3}]},
+        {'validTime': f"{(start + timedelta(hours=40)).isoformat()}/PT12H",
+         'value': [{'phenomenon': 'WC', 'significance': 'Y', 'event_number': 7}]},
+    ]}
+    return grid
+
+
+def synthetic_hourly(periods=156, start=None):
+    """A full-size forecastHourly payload built by cycling the fixture's periods."""
+    hourly = copy.deepcopy(load_fixture("forecast_hourly.json"))
+    template = hourly['properties']['periods']
+    start = start or datetime.fromisoformat(template[0]['startTime'])
+    periods_out = []
+    for h in range(periods):
+        period = copy.deepcopy(template[h % len(template)])
+        period['number'] = h + 1
+        period['startTime'] = (start + timedelta(hours=h)).isoformat()
+        period['endTime'] = (start + timedelta(hours=h + 1)).isoformat()
+        period['temperature'] = 30 + (h * 5) % 25
+        period['windSpeed'] = f"{5 + h % 10} to {10 + h % 10} mph" if h % 3 == 0 else f"{5 + h % 15} mph"
+        period['probabilityOfPrecipitation'] = {'unitCode': 'wmoUnit:percent', 'value': (h * 7) % 100}
+        period['dewpoint'] = {'unitCode': 'wmoUnit:degC', 'value': -2 + h % 6}
+        period['relativeHumidity'] = {'unitCode': 'wmoUnit:percent', 'value': 50 + h % 40}
+        periods_out.append(period)
+    hourly['properties']['periods'] = periods_out
+    return hourly
+
+
+ALERT_EVENTS = [
+    ('Winter Storm Warning', 'Severe'), ('Wind Advisory', 'Moderate'), ('Flood Watch', 'Moderate'),
+    ('Tornado Warning', 'Extreme'), ('Special Weather Statement', 'Minor'), ('Heat Advisory', 'Moderate'),
+    ('Small Craft Advisory', 'Minor'), ('Red Flag Warning', 'Severe'), ('Dense Fog Advisory', 'Minor'),
+]
+ALERT_STATES = ['TX', 'CA', 'FL', 'NY', 'MO', 'KS', 'CO', 'WA', 'MN', 'GA', 'OK', 'AZ']
+ALERT_MARINE = ['GM', 'AN', 'PZ', 'LM']
+
+
+def synthetic_alert(n, rng, sent=None):
+    """One active-alert feature. Most carry a small polygon around a CONUS point; some are zone-only."""
+    sent = sent or datetime.now().astimezone()
+    event, severity = ALERT_EVENTS[n % len(ALERT_EVENTS)]
+    area = ALERT_MARINE[n % len(ALERT_MARINE)] if event == 'Small Craft Advisory' else ALERT_STATES[n % len(ALERT_STATES)]
+    zones = [f"{area}Z{rng.randint(1, 300):03d}" for _ in range(rng.randint(1, 4))]
+    geometry = None
+    if rng.random() < 0.7:
+        lat, lon, size = rng.uniform(25, 49), rng.uniform(-124, -67), rng.uniform(0.1, 1.0)
+        geometry = {"type": "Polygon", "coordinates": [[
+            [lon, lat], [lon + size, lat], [lon + size, lat + size], [lon, lat + size], [lon, lat]]]}
+    alert_id = f"urn:oid:2.49.0.1.840.0.synthetic.{n}"
+    return {
+        "id": f"https://api.weather.gov/alerts/{alert_id}",
+        "type": "Feature",
+        "geometry": geometry,
+        "properties": {
+            "id": alert_id,
+            "areaDesc": "; ".join(zones),
+            "geocode": {"UGC": zones, "SAME": []},
+            "affectedZones": [f"https://api.weather.gov/zones/forecast/{zone}" for zone in zones],
+            "references": [],
+            "sent": sent.isoformat(),
+            "effective": sent.isoformat(),
+            "expires": (sent + timedelta(hours=rng.randint(2, 48))).isoformat(),
+            "status": "Actual",
+            "messageType": "Alert",
+            "category": "Met",
+            "severity": severity,
+            "certainty": rng.choice(['Observed', 'Likely', 'Possible', 'Unlikely']),
+            "urgency": rng.choice(['Immediate', 'Expected', 'Future']),
+            "event": event,
+            "headline": f"{event} issued for {area}",
+            "description": f"Synthetic {event.lower()} #{n}.",
+        },
+    }
+
+
+def synthetic_alerts(count=500, seed=0, sent=None):
+    """`count` active-alert features with stable ids and a fixed seed, all sent at `sent` (default now)."""
+    rng = random.Random(seed)
+    sent = sent or datetime.now().astimezone()
+    return [synthetic_alert(n, rng, sent) for n in range(count)]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Required for keep-alive
+    disable_nagle_algorithm = True  # Headers and body go out in separate writes
+
+    def do_GET(self):
+        server = self.server
+        server.request_count += 1
+        if server.latency:
+            time.sleep(server.latency)
+
+        fault = server.pick_fault()
+        if fault:
+            server.fault_count += 1
+            self.send_response(fault)
+            if server.retry_after is not None:
+                self.send_header("Retry-After", str(server.retry_after))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        body = server.route(self.path)
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if server.etags and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/geo+json")
+        self.send_header("Content-Length", str(len(body)))
+        if server.etags:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency=0.0, port=0, etags=False, full_size=False,
+                 fault_rate=0.0, fault_status=503, retry_after=None, max_rps=None, seed=0,
+                 distinct_grids=False, alerts=0):
+        """Fault injection: `fault_rate` of requests fail with `fault_status`, and
+        requests beyond `max_rps` per second get a 429, optionally with a Retry-After.
+        With `distinct_grids`, each 0.025° of lat/lon maps to its own grid cell
+        (roughly the 2.5 km NWS grid) instead of every point sharing one.
+        `alerts` synthetic alerts are served from /alerts/active (see set_alerts),
+        and paginated from /alerts."""
+        super().__init__(("127.0.0.1", port), StubHandler)
+        self.latency = latency
+        self.etags = etags
+        self.fault_rate = fault_rate
+        self.fault_status = fault_status
+        self.retry_after = retry_after
+        self.distinct_grids = distinct_grids
+        self.max_rps = max_rps
+        self.fault_count = 0
+        self._random = random.Random(seed)
+        self._recent = deque()  # arrival times in the last second, for max_rps
+        self._fault_lock = threading.Lock()
+        self.request_count = 0
+        self.base_url = f"http://127.0.0.1:{self.server_address[1]}"
+        self.fixtures = {
+            "forecast": json.dumps(load_fixture("forecast.json")).encode(),
+            "hourly": json.dumps(load_fixture("forecast_hourly.json")).encode(),
+            "grid": json.dumps(load_fixture("forecast_grid_data.json")).encode(),
+        }
+        self.set_alerts(synthetic_alerts(alerts) if alerts else [])
+        if full_size:
+            # Start "now" so current-conditions lookups and 24h windows find data
+            now = datetime.now().astimezone().replace(minute=0, second=0, microsecond=0)
+            self.fixtures["hourly"] = json.dumps(synthetic_hourly(start=now)).encode()
+            self.fixtures["grid"] = json.dumps(synthetic_grid(start=now)).encode()
+
+    def set_alerts(self, features):
+        """Replaces the active-alert feed (e.g. to simulate added, updated or expired alerts)."""
+        self.alert_features = list(features)
+        self.alerts_body = json.dumps({"type": "FeatureCollection", "features": self.alert_features}).encode()
+
+    def alerts_page(self, query):
+        """One page of /alerts over the alert list, linked to the next by a cursor as NWS does
+        (the link is there on every non-empty page, so the end is an empty page)."""
+        params = parse_qs(query)
+        limit = int(params.get('limit', ['500'])[0])
+        cursor = int(params.get('cursor', ['0'])[0])
+        features = self.alert_features[cursor:cursor + limit]
+        body = {"type": "FeatureCollection", "features": features, "title": "All alerts",
+                "updated": datetime.now().astimezone().isoformat()}
+        if features:
+            body["pagination"] = {"next": f"{self.base_url}/alerts?cursor={cursor + limit}&limit={limit}"}
+        return json.dumps(body).encode()
+
+    def pick_fault(self):
+        """Returns the status to fail this request with, or None to serve it."""
+        with self._fault_lock:
+            if self.max_rps:
+                now = time.monotonic()
+                while self._recent and now - self._recent[0] >= 1.0:
+                    self._recent.popleft()
+                if len(self._recent) >= self.max_rps:
+                    return 429
+                self._recent.append(now)
+            if self.fault_rate and self._random.random() < self.fault_rate:
+                return self.fault_status
+        return None
+
+    def points_body(self, lat, lon):
+        grid_x, grid_y = 44, 51
+        if self.distinct_grids:
+            grid_x, grid_y = int((float(lon) + 180) / 0.025), int((float(lat) + 90) / 0.025)
+        grid = f"{self.base_url}/gridpoints/EAX/{grid_x},{grid_y}"
+        return json.dumps({"properties": {
+            "gridId": "EAX", "gridX": grid_x, "gridY": grid_y,
+            "forecast": f"{grid}/forecast",
+            "forecastHourly": f"{grid}/forecast/hourly",
+            "forecastGridData": grid,
+            "forecastZone": f"{self.base_url}/zones/forecast/MOZ028",
+            "county": f"{self.base_url}/zones/county/MOC095",
+        }}).encode()
+
+    def route(self, path):
+        path, _, query = path.partition('?')
+        if path == "/alerts/active" and query.startswith("point="):
+            # A point query's answer is a handful of alerts, not the national feed
+            return b'{"type": "FeatureCollection", "features": []}'
+
+        if path.startswith("/points/"):
+            lat, lon = path[len("/points/"):].split(',')
+            return self.points_body(lat, lon)
+        if path.startswith("/gridpoints/"):
+            if path.endswith("/forecast/hourly"):
+                return self.fixtures["hourly"]
+            if path.endswith("/forecast"):
+                return self.fixtures["forecast"]
+            return self.fixtures["grid"]
+        if path == "/alerts":
+            return self.alerts_page(query)
+        if path.startswith("/alerts"):
+            return self.alerts_body
+        return None
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
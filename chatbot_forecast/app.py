@@ -2,7 +2,7 @@ import dash
 from dash import html, dcc, Input, Output, State, callback
 import dash_bootstrap_components as dbc
 from components.chat_ui import create_chat_layout, create_message_bubble
-from services.weather_service import WeatherService
+from services.weather_service import WeatherService, CHAT_GRID_LAYERS
 from services.llm_service import LLMService
 import config
 import os
@@ -11,7 +11,7 @@ import os
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP], title="NextWeather Chatbot")
 
 # Initialize Services
-weather_service = WeatherService(config.NWS_USER_AGENT)
+weather_service = WeatherService(grid_layers=CHAT_GRID_LAYERS)
 try:
     llm_service = LLMService(config.GEMINI_API_KEY)
 except ValueError as e:
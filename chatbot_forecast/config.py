@@ -5,7 +5,6 @@ load_dotenv()
 
 # API Keys
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
-NWS_USER_AGENT = os.getenv('NWS_USER_AGENT', '(nextweather-chatbot, contact@example.com)')
 
 # App Config
 DEBUG = True
@@ -0,0 +1,312 @@
+import os
+import threading
+from datetime import datetime, timezone
+
+from services.nws_client import get_client
+from services.alert_index import AlertIndex
+from services.alert_spatial import AlertSpatialIndex
+
+# One national poll answers every state view and the national count
+ALERT_POLL_INTERVAL = float(os.getenv('NWS_ALERT_POLL_INTERVAL', '60'))
+FIRST_POLL_TIMEOUT = 30  # Seconds a reader waits for the first poll of a new feed
+STALE_AFTER_POLLS = 3  # A feed this many poll intervals behind is no longer trusted for lookups
+
+# UGC prefixes of marine areas, and the marine region each belongs to (as in /alerts/active/count)
+MARINE_REGIONS = {
+    'AM': 'AT', 'AN': 'AT', 'GM': 'GM',
+    'LC': 'GL', 'LE': 'GL', 'LH': 'GL', 'LM': 'GL', 'LO': 'GL', 'LS': 'GL', 'SL': 'GL',
+    'PZ': 'PA', 'PK': 'AL', 'PH': 'PI', 'PM': 'PI', 'PS': 'PI',
+}
+
+
+def alert_id(feature):
+    """The alert's CAP identifier (what `references` point at)."""
+    return feature.get('properties', {}).get('id') or feature.get('id')
+
+
+def alert_areas(feature):
+    """Two-letter state / marine area codes the alert covers, from its UGC zone codes."""
+    return {code[:2] for code in feature.get('properties', {}).get('geocode', {}).get('UGC', [])}
+
+
+def _parse_time(value):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _revision(feature):
+    props = feature.get('properties', {})
+    return props.get('sent'), props.get('expires'), props.get('messageType')
+
+
+def is_expired(feature, now):
+    expires = _parse_time(feature.get('properties', {}).get('expires'))
+    return expires is not None and expires <= now
+
+
+class AlertFeed:
+    """In-memory index of the national active-alert feed, kept current by one poll.
+
+    Each poll fetches /alerts/active (a conditional GET, so an unchanged feed
+    is a 304) and diffs it against the index by alert id:
+
+    - added: ids not seen before that don't supersede an indexed alert
+    - updated: a re-sent alert (new `sent`), or a new message whose
+      `references` name an indexed alert, which it replaces
+    - expired: alerts that left the feed, passed their `expires`, or were
+      cancelled (messageType "Cancel")
+
+    State views and the national count are answered from the index, and
+    subscribers are called with every non-empty delta.
+    """
+
+    def __init__(self, client=None, url=None, poll_interval=ALERT_POLL_INTERVAL):
+        self.client = client or get_client()
+        self.url = url or f"{self.client.base_url}/alerts/active"
+        self.poll_interval = poll_interval
+        self.alerts = {}  # id -> feature
+        self._by_area = {}  # area code -> set of ids
+        self._area_indexes = {}  # area code -> AlertIndex, for the current version
+        self._spatial_index = None  # AlertSpatialIndex, for the current version
+        self._payload = None
+        self._listeners = []
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._thread = None
+        self.version = 0
+        self.last_poll = None  # datetime of the last successful poll
+        self.last_error = None
+        self.polls = 0
+        self.unchanged_polls = 0
+
+    def start(self):
+        """Starts polling in a daemon thread (no-op if already running)."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='nws-alert-feed', daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Warning: Alert feed poll failed: {e}")
+            finally:
+                self._ready.set()
+            self._stop.wait(self.poll_interval)
+
+    def wait_ready(self, timeout=FIRST_POLL_TIMEOUT):
+        """Waits for the first poll to finish. Returns True if the index holds a successful poll."""
+        self._ready.wait(timeout)
+        return self.last_poll is not None
+
+    def subscribe(self, callback):
+        """Calls `callback(delta)` after every poll that changed the index. Returns an unsubscribe function."""
+        with self._lock:
+            self._listeners.append(callback)
+        return lambda: self._unsubscribe(callback)
+
+    def _unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def poll(self):
+        """Fetches the national feed once and applies it to the index.
+
+        Returns:
+            dict: The delta: "added" and "updated" (lists of features), "expired"
+                  (list of ids), "replaced" ({old id: new id}) and "version".
+        """
+        payload = self.client.get_json(self.url, headers={'Accept': 'application/geo+json'})
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            self.polls += 1
+            if payload is self._payload:
+                # 304: the feed is unchanged, only expiry can have moved
+                delta = self._apply(self.alerts.values(), now)
+                self.unchanged_polls += 1
+            else:
+                delta = self._apply(payload.get('features', []), now)
+                self._payload = payload
+            self.last_poll = now
+            self.last_error = None
+            self._ready.set()
+            listeners = list(self._listeners) if self._has_changes(delta) else []
+        for callback in listeners:
+            try:
+                callback(delta)
+            except Exception as e:
+                print(f"Warning: Alert feed subscriber failed: {e}")
+        return delta
+
+    @staticmethod
+    def _has_changes(delta):
+        return bool(delta["added"] or delta["updated"] or delta["expired"])
+
+    def _apply(self, features, now):
+        """Diffs a feed snapshot against the index and updates it. Caller holds the lock."""
+        incoming, cancelled = {}, set()
+        for feature in features:
+            props = feature.get('properties', {})
+            if props.get('messageType') == 'Cancel':
+                cancelled.update(ref.get('identifier') for ref in props.get('references', []))
+            elif not is_expired(feature, now):
+                incoming[alert_id(feature)] = feature
+
+        added, updated, replaced = [], [], {}
+        for aid, feature in incoming.items():
+            old = self.alerts.get(aid)
+            if old is None:
+                refs = [ref.get('identifier') for ref in feature['properties'].get('references', [])]
+                superseded = [ref for ref in refs if ref in self.alerts and ref not in incoming]
+                if superseded:
+                    updated.append(feature)
+                    replaced.update((ref, aid) for ref in superseded)
+                else:
+                    added.append(feature)
+            elif _revision(old) != _revision(feature):
+                updated.append(feature)
+        added = [feature for feature in added if alert_id(feature) not in cancelled]
+        updated = [feature for feature in updated if alert_id(feature) not in cancelled]
+        # An alert superseded by a cancelled message just expires
+        replaced = {old: new for old, new in replaced.items() if new not in cancelled}
+
+        expired = [aid for aid in self.alerts
+                   if (aid not in incoming or aid in cancelled) and aid not in replaced]
+        for aid in expired + list(replaced):
+            self._remove(aid)
+        for feature in added + updated:
+            self._add(feature)
+
+        if added or updated or expired:
+            self.version += 1
+            self._area_indexes.clear()
+            self._spatial_index = None
+        return {"added": added, "updated": updated, "expired": expired,
+                "replaced": replaced, "version": self.version}
+
+    def _add(self, feature):
+        aid = alert_id(feature)
+        if aid in self.alerts:
+            self._remove(aid)
+        self.alerts[aid] = feature
+        for area in alert_areas(feature):
+            self._by_area.setdefault(area, set()).add(aid)
+
+    def _remove(self, aid):
+        feature = self.alerts.pop(aid, None)
+        if feature is None:
+            return
+        for area in alert_areas(feature):
+            ids = self._by_area.get(area)
+            if ids is not None:
+                ids.discard(aid)
+                if not ids:
+                    del self._by_area[area]
+
+    def active_alerts(self):
+        """All indexed alerts."""
+        with self._lock:
+            return list(self.alerts.values())
+
+    def for_area(self, area):
+        """Active alerts for a state or marine area code, shaped like /alerts/active/area/{area}."""
+        with self._lock:
+            ids = self._by_area.get(area.upper(), ())
+            features = [self.alerts[aid] for aid in ids]
+        features.sort(key=lambda feature: feature['properties'].get('sent') or '', reverse=True)
+        return {"type": "FeatureCollection", "features": features}
+
+    def snapshot(self, area=None):
+        """(version, features) for an area or, with None, every alert, read together under the lock."""
+        with self._lock:
+            features = self.for_area(area)['features'] if area else list(self.alerts.values())
+            return self.version, features
+
+    def area_index(self, area):
+        """AlertIndex over an area's alerts (as ordered by for_area), built once per feed version."""
+        area = area.upper()
+        with self._lock:
+            index = self._area_indexes.get(area)
+            if index is None:
+                index = self._area_indexes[area] = AlertIndex(self.for_area(area)['features'])
+            return index
+
+    def spatial_index(self):
+        """AlertSpatialIndex over every indexed alert, built once per feed version."""
+        with self._lock:
+            if self._spatial_index is None:
+                self._spatial_index = AlertSpatialIndex(self.alerts.values())
+            return self._spatial_index
+
+    def alerts_for_points(self, points, zones=None):
+        """Per (lat, lon) point, the active alerts covering it, shaped like /alerts/active?point=."""
+        matches = self.spatial_index().alerts_at_many(points, zones)
+        return [{"type": "FeatureCollection", "features": features} for features in matches]
+
+    def count(self):
+        """Alert counts shaped like /alerts/active/count (total, land, marine, regions, areas)."""
+        with self._lock:
+            areas = {area: len(ids) for area, ids in self._by_area.items()}
+            # An alert counts as marine when every zone it covers is a marine area
+            marine = sum(1 for feature in self.alerts.values()
+                         if alert_areas(feature) and alert_areas(feature) <= MARINE_REGIONS.keys())
+            total = len(self.alerts)
+        regions = {}
+        for area, count in areas.items():
+            if area in MARINE_REGIONS:
+                region = MARINE_REGIONS[area]
+                regions[region] = regions.get(region, 0) + count
+        return {"total": total, "land": total - marine, "marine": marine,
+                "regions": regions, "areas": dict(sorted(areas.items()))}
+
+    def age(self):
+        """Seconds since the last successful poll, or None before the first one."""
+        if self.last_poll is None:
+            return None
+        return (datetime.now(timezone.utc) - self.last_poll).total_seconds()
+
+    def is_fresh(self):
+        """True if the last successful poll is within STALE_AFTER_POLLS poll intervals."""
+        age = self.age()
+        return age is not None and age <= self.poll_interval * STALE_AFTER_POLLS
+
+    def stats(self):
+        with self._lock:
+            return {
+                "alerts": len(self.alerts),
+                "areas": len(self._by_area),
+                "version": self.version,
+                "polls": self.polls,
+                "unchanged_polls": self.unchanged_polls,
+                "last_error": self.last_error,
+            }
+
+
+_shared_feed = None
+_shared_lock = threading.Lock()
+
+
+def get_alert_feed(start=True):
+    """Returns the process-wide AlertFeed, creating (and by default starting) it on first use."""
+    global _shared_feed
+    with _shared_lock:
+        if _shared_feed is None:
+            _shared_feed = AlertFeed()
+        if start:
+            _shared_feed.start()
+        return _shared_feed
@@ -0,0 +1,80 @@
+import numpy as np
+
+# Levels per CAP dimension, in display/priority order; anything else is "Unknown"
+SEVERITY_LEVELS = ('Extreme', 'Severe', 'Moderate', 'Minor', 'Unknown')
+URGENCY_LEVELS = ('Immediate', 'Expected', 'Future', 'Past', 'Unknown')
+CERTAINTY_LEVELS = ('Observed', 'Likely', 'Possible', 'Unlikely', 'Unknown')
+DIMENSIONS = {'severity': SEVERITY_LEVELS, 'urgency': URGENCY_LEVELS, 'certainty': CERTAINTY_LEVELS}
+
+
+class AlertIndex:
+    """Columnar aggregation index over a list of alert features.
+
+    Severity, urgency, certainty and event are each stored once as a small
+    integer code column. A filter is a per-dimension membership table indexed
+    by those codes, so any combination is one vectorized pass, and the counts
+    behind the charts are a bincount of the selected codes. Severity codes
+    double as the display priority, so sorting is an argsort.
+    """
+
+    def __init__(self, alerts):
+        self.alerts = list(alerts)
+        columns = {name: [] for name in (*DIMENSIONS, 'event')}
+        for alert in self.alerts:
+            props = alert.get('properties', {})
+            for name in columns:
+                columns[name].append(props.get(name) or 'Unknown')
+
+        self.levels = dict(DIMENSIONS)
+        self.codes = {}
+        for name, levels in DIMENSIONS.items():
+            lookup = {level: code for code, level in enumerate(levels)}
+            unknown = lookup['Unknown']
+            self.codes[name] = np.fromiter((lookup.get(value, unknown) for value in columns[name]),
+                                           dtype=np.int8, count=len(self.alerts))
+        # Events are open-ended; their levels are the distinct names, alphabetically
+        events, event_codes = np.unique(np.array(columns['event'], dtype=object), return_inverse=True)
+        self.levels['event'] = tuple(events)
+        self.codes['event'] = event_codes.astype(np.int32).reshape(-1)
+
+    def __len__(self):
+        return len(self.alerts)
+
+    def mask(self, **filters):
+        """Boolean mask of the alerts matching every given filter.
+
+        Args:
+            **filters: dimension=values, e.g. severity=['Extreme', 'Severe'], event=['Flood Watch'].
+                       Dimensions left out (or None) match everything.
+        """
+        selected = np.ones(len(self.alerts), dtype=bool)
+        for name, values in filters.items():
+            if values is None:
+                continue
+            levels = self.levels[name]
+            allowed = np.zeros(len(levels), dtype=bool)
+            wanted = set(values)
+            allowed[[code for code, level in enumerate(levels) if level in wanted]] = True
+            selected &= allowed[self.codes[name]]
+        return selected
+
+    def counts(self, name, mask=None):
+        """Non-zero alert counts per level of one dimension, in level order."""
+        codes = self.codes[name] if mask is None else self.codes[name][mask]
+        totals = np.bincount(codes, minlength=len(self.levels[name]))
+        return {level: int(total) for level, total in zip(self.levels[name], totals) if total}
+
+    def categorize(self, mask=None):
+        """The counts behind the severity, urgency, certainty and event-type charts."""
+        return {
+            'severity': self.counts('severity', mask),
+            'urgency': self.counts('urgency', mask),
+            'certainty': self.counts('certainty', mask),
+            'event_type': self.counts('event', mask),
+        }
+
+    def select(self, mask=None):
+        """The matching alerts, most severe first (input order within a severity)."""
+        rows = np.arange(len(self.alerts)) if mask is None else np.flatnonzero(mask)
+        order = rows[np.argsort(self.codes['severity'][rows], kind='stable')]
+        return [self.alerts[i] for i in order]
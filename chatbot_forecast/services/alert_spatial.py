@@ -0,0 +1,133 @@
+import numpy as np
+
+BUCKET_DEGREES = 1.0  # Side of the lat/lon grid buckets polygons are filed under
+
+
+def _rings(geometry):
+    """Yields (outer ring, holes) per polygon of a GeoJSON Polygon/MultiPolygon, as (N, 2) lon/lat arrays."""
+    if not geometry:
+        return
+    if geometry.get('type') == 'Polygon':
+        polygons = [geometry['coordinates']]
+    elif geometry.get('type') == 'MultiPolygon':
+        polygons = geometry['coordinates']
+    else:
+        return
+    for polygon in polygons:
+        if polygon:
+            yield np.asarray(polygon[0], dtype=float), [np.asarray(hole, dtype=float) for hole in polygon[1:]]
+
+
+def points_in_ring(lons, lats, ring):
+    """Even-odd ray casting of many points against one ring, vectorized over points and edges."""
+    x1, y1 = ring[:, 0], ring[:, 1]
+    x2, y2 = np.roll(x1, 1), np.roll(y1, 1)
+    lons, lats = lons[:, None], lats[:, None]
+    spans = (y1 > lats) != (y2 > lats)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        crossing_x = x1 + (lats - y1) * (x2 - x1) / (y2 - y1)
+    return np.count_nonzero(spans & (lons < crossing_x), axis=1) % 2 == 1
+
+
+class AlertSpatialIndex:
+    """Answers "which alerts cover this point?" locally from a set of active alerts.
+
+    Alert polygons are filed under every BUCKET_DEGREES lat/lon bucket their
+    bounding box touches, so a point only tests the few polygons in its bucket
+    (bounding box first, then ray casting). Alerts without geometry are
+    zone-based: they are matched by the point's UGC zones instead (its forecast
+    zone and county from /points), as the NWS point query does.
+    """
+
+    def __init__(self, alerts, bucket_degrees=BUCKET_DEGREES):
+        self.alerts = list(alerts)
+        self.bucket_degrees = bucket_degrees
+        self._shapes = []  # (alert index, outer ring, holes)
+        bboxes, entry_keys, entry_shapes = [], [], []
+        self._by_zone = {}  # UGC code -> [alert index, ...] for alerts without geometry
+
+        for i, alert in enumerate(self.alerts):
+            rings = list(_rings(alert.get('geometry')))
+            if not rings:
+                for zone in alert.get('properties', {}).get('geocode', {}).get('UGC', []):
+                    self._by_zone.setdefault(zone, []).append(i)
+                continue
+            for outer, holes in rings:
+                (min_lon, min_lat), (max_lon, max_lat) = outer.min(axis=0), outer.max(axis=0)
+                shape = len(self._shapes)
+                self._shapes.append((i, outer, holes))
+                bboxes.append((min_lon, min_lat, max_lon, max_lat))
+                for bucket_lat in range(self._bucket(min_lat), self._bucket(max_lat) + 1):
+                    for bucket_lon in range(self._bucket(min_lon), self._bucket(max_lon) + 1):
+                        entry_keys.append(self._key(bucket_lat, bucket_lon))
+                        entry_shapes.append(shape)
+
+        self._bboxes = np.array(bboxes, dtype=float).reshape(-1, 4)
+        # Bucket -> shape entries, sorted by bucket key so a point's candidates are one searchsorted range
+        order = np.argsort(entry_keys, kind='stable')
+        self._entry_keys = np.array(entry_keys, dtype=np.int64)[order]
+        self._entry_shapes = np.array(entry_shapes, dtype=np.int64)[order]
+
+    def _bucket(self, degrees):
+        return int(np.floor(degrees / self.bucket_degrees))
+
+    @staticmethod
+    def _key(bucket_lat, bucket_lon):
+        return (bucket_lat + 1000) * 10000 + (bucket_lon + 1000)
+
+    def __len__(self):
+        return len(self.alerts)
+
+    def alerts_at(self, lat, lon, zones=()):
+        """Alerts whose polygon contains the point, plus geometry-less alerts for any of `zones`."""
+        return self.alerts_at_many([(lat, lon)], [zones])[0]
+
+    def alerts_at_many(self, points, zones=None):
+        """
+        Alerts covering each of many points.
+
+        Candidate (point, polygon) pairs come from the buckets and are
+        bounding-box filtered as whole arrays; each polygon left is then ray
+        cast against all of its candidate points at once.
+
+        Args:
+            points (list): (lat, lon) pairs.
+            zones (list, optional): Per point, the UGC zone codes covering it.
+
+        Returns:
+            list: Per point, the matching alert features in feed order.
+        """
+        lats = np.array([float(lat) for lat, _ in points])
+        lons = np.array([float(lon) for _, lon in points])
+        hits = [set() for _ in points]
+
+        if len(self._entry_keys) and len(points):
+            keys = self._key(np.floor(lats / self.bucket_degrees).astype(np.int64),
+                             np.floor(lons / self.bucket_degrees).astype(np.int64))
+            first = np.searchsorted(self._entry_keys, keys, side='left')
+            counts = np.searchsorted(self._entry_keys, keys, side='right') - first
+            pair_points = np.repeat(np.arange(len(points)), counts)
+            offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            pair_shapes = self._entry_shapes[np.repeat(first, counts) + offsets]
+
+            boxes = self._bboxes[pair_shapes]
+            pair_lons, pair_lats = lons[pair_points], lats[pair_points]
+            in_box = ((pair_lons >= boxes[:, 0]) & (pair_lats >= boxes[:, 1])
+                      & (pair_lons <= boxes[:, 2]) & (pair_lats <= boxes[:, 3]))
+            pair_points, pair_shapes = pair_points[in_box], pair_shapes[in_box]
+
+            order = np.argsort(pair_shapes, kind='stable')
+            pair_points, pair_shapes = pair_points[order], pair_shapes[order]
+            shapes, starts = np.unique(pair_shapes, return_index=True)
+            for shape, members in zip(shapes, np.split(pair_points, starts[1:])):
+                i, outer, holes = self._shapes[shape]
+                inside = points_in_ring(lons[members], lats[members], outer)
+                for hole in holes:
+                    inside &= ~points_in_ring(lons[members], lats[members], hole)
+                for p in members[inside]:
+                    hits[p].add(i)
+
+        for p, point_zones in enumerate(zones or ()):
+            for zone in point_zones or ():
+                hits[p].update(self._by_zone.get(zone, ()))
+        return [[self.alerts[i] for i in sorted(found)] for found in hits]
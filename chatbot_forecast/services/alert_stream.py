@@ -0,0 +1,335 @@
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+from services.alert_feed import alert_id, alert_areas, get_alert_feed
+from services.alert_index import AlertIndex
+from services.nws_client import nws_user_agent
+
+# Server-sent events endpoint for alert deltas; dashboards connect to ALERT_STREAM_URL when it is set
+ALERT_STREAM_HOST = os.getenv('NWS_ALERT_STREAM_HOST', '127.0.0.1')
+ALERT_STREAM_PORT = int(os.getenv('NWS_ALERT_STREAM_PORT', '8765'))
+ALERT_STREAM_URL = os.getenv('NWS_ALERT_STREAM_URL', '')  # e.g. http://127.0.0.1:8765/alerts/stream
+KEEPALIVE_INTERVAL = 15  # Seconds between comment lines on an idle stream (keeps proxies from closing it)
+CLIENT_QUEUE_SIZE = 100  # Deltas buffered per connection; a client that falls further behind is dropped
+RECONNECT_DELAY = 5
+
+
+def delta_for_area(delta, area=None):
+    """Narrows a feed delta to one state/marine area (None keeps everything).
+
+    Alerts that left the area (an update that no longer covers it) are sent as
+    expired, so a client holding them drops them. Expired ids are not filtered:
+    clients ignore ids they don't hold.
+    """
+    if area is None:
+        added, updated, expired = delta["added"], delta["updated"], list(delta["expired"])
+    else:
+        area = area.upper()
+        added = [feature for feature in delta["added"] if area in alert_areas(feature)]
+        updated = [feature for feature in delta["updated"] if area in alert_areas(feature)]
+        expired = list(delta["expired"]) + [alert_id(feature) for feature in delta["updated"]
+                                            if area not in alert_areas(feature)]
+    return {"version": delta["version"], "added": added, "updated": updated,
+            "expired": expired + list(delta.get("replaced", {})), "replaced": dict(delta.get("replaced", {}))}
+
+
+def encode_event(event, data, event_id=None):
+    """One text/event-stream message."""
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return ("\n".join(lines) + "\n\n").encode('utf-8')
+
+
+class AlertStore:
+    """A dashboard's local copy of the active alerts (optionally one area), kept current by deltas.
+
+    Filled by a snapshot and then patched in place: added/updated alerts are
+    upserted by id and expired ids removed, so nothing is re-downloaded or
+    rebuilt wholesale. Deltas that arrive before the first snapshot are held
+    and replayed on top of it. Views read `version` to see whether anything
+    changed since they last drew, and `changed_since` for which alerts are new.
+    """
+
+    def __init__(self, area=None):
+        self.area = area.upper() if area else None
+        self.alerts = {}  # id -> feature
+        self.version = 0  # feed version of the last snapshot/delta applied
+        self.connected = False
+        self.has_snapshot = False
+        self._pending = []  # deltas received before the first snapshot
+        self._changed = {}  # id -> version it was last added/updated at
+        self._index = None  # (version, AlertIndex)
+        self._cond = threading.Condition()
+
+    def apply_snapshot(self, version, features, force=False):
+        """Replaces the contents. `force` applies it even if older (a restarted server counts versions anew)."""
+        with self._cond:
+            if version < self.version and not force:
+                return False  # An older snapshot than deltas already applied
+            self.alerts = {alert_id(feature): feature for feature in features}
+            self._changed = {aid: self._changed[aid] for aid in self.alerts if aid in self._changed}
+            self.version = version
+            self.has_snapshot = True
+            pending, self._pending = self._pending, []
+            for delta in pending:
+                self._apply_delta(delta)  # Skips those the snapshot already covers
+            self._cond.notify_all()
+            return True
+
+    def apply_delta(self, delta):
+        """Applies one delta (as from delta_for_area). Returns False for one already covered
+        or, before the first snapshot, held for it."""
+        with self._cond:
+            if not self.has_snapshot:
+                self._pending.append(delta)
+                return False
+            applied = self._apply_delta(delta)
+            if applied:
+                self._cond.notify_all()
+            return applied
+
+    def _apply_delta(self, delta):
+        # Caller holds the lock
+        if delta["version"] <= self.version:
+            return False
+        for aid in delta["expired"]:
+            self.alerts.pop(aid, None)
+            self._changed.pop(aid, None)
+        for feature in delta["added"] + delta["updated"]:
+            aid = alert_id(feature)
+            self.alerts[aid] = feature
+            self._changed[aid] = delta["version"]
+        self.version = delta["version"]
+        return True
+
+    def wait_for_change(self, version, timeout=None):
+        """Blocks until the store is past `version` (or the timeout). Returns the current version."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.version > version, timeout)
+            return self.version
+
+    def features(self):
+        """Alerts newest first, like /alerts/active/area/{area}."""
+        with self._cond:
+            features = list(self.alerts.values())
+        features.sort(key=lambda feature: feature['properties'].get('sent') or '', reverse=True)
+        return features
+
+    def index(self):
+        """AlertIndex over features(), rebuilt only when the version moves."""
+        with self._cond:
+            if self._index is None or self._index[0] != self.version:
+                self._index = (self.version, AlertIndex(self.features()))
+            return self._index[1]
+
+    def ids(self):
+        """Ids of the alerts held now."""
+        with self._cond:
+            return set(self.alerts)
+
+    def changed_since(self, version):
+        """Ids added or updated after `version`."""
+        with self._cond:
+            return {aid for aid, changed in self._changed.items() if changed > version}
+
+
+def attach_local(store, feed=None):
+    """Keeps `store` current straight from an in-process AlertFeed. Returns an unsubscribe function."""
+    feed = feed or get_alert_feed()
+
+    def on_delta(delta):
+        if not store.has_snapshot:
+            # No snapshot yet (attach's own is still on its way, or the first poll was late): take the feed as it is now
+            store.apply_snapshot(*feed.snapshot(store.area))
+        store.apply_delta(delta_for_area(delta, store.area))
+        store.connected = True
+
+    # Subscribe before the snapshot so no delta falls between them. One that lands
+    # before the snapshot is applied is held by the store and replayed on top of it
+    unsubscribe = feed.subscribe(on_delta)
+    if feed.wait_ready():
+        store.apply_snapshot(*feed.snapshot(store.area))
+        store.connected = True
+    return unsubscribe
+
+
+class _StreamHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path != '/alerts/stream':
+            self.send_error(404)
+            return
+        area = (parse_qs(url.query).get('area') or [None])[0]
+        self.server.stream.serve_client(self, area)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class AlertStreamServer:
+    """Pushes alert deltas to connected dashboards over server-sent events.
+
+    GET /alerts/stream[?area=TX] answers with a `snapshot` event (the area's
+    active alerts) and then one `delta` event per feed change that touches
+    the area, each carrying the feed version as its event id. Every
+    connection shares the one AlertFeed poll; a reconnecting client gets a
+    fresh snapshot.
+    """
+
+    def __init__(self, feed=None, host=ALERT_STREAM_HOST, port=ALERT_STREAM_PORT):
+        self.feed = feed or get_alert_feed()
+        self._server = ThreadingHTTPServer((host, port), _StreamHandler)
+        self._server.daemon_threads = True
+        self._server.stream = self
+        self._thread = None
+        self._stop = threading.Event()
+        self.clients = 0
+        self.dropped = 0
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/alerts/stream"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='nws-alert-stream', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def serve_client(self, handler, area):
+        deltas = queue.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        overflow = threading.Event()
+
+        def on_delta(delta):
+            try:
+                deltas.put_nowait(delta)
+            except queue.Full:
+                overflow.set()
+
+        def send(data):
+            # One chunk per event, so clients see each event as soon as it is written
+            handler.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            handler.wfile.flush()
+
+        unsubscribe = self.feed.subscribe(on_delta)
+        self.clients += 1
+        try:
+            self.feed.wait_ready()
+            version, features = self.feed.snapshot(area)
+            handler.send_response(200)
+            handler.send_header('Content-Type', 'text/event-stream')
+            handler.send_header('Cache-Control', 'no-cache')
+            handler.send_header('Transfer-Encoding', 'chunked')
+            handler.end_headers()
+            send(encode_event('snapshot', {"version": version, "features": features}, version))
+            while not self._stop.is_set() and not overflow.is_set():
+                try:
+                    delta = deltas.get(timeout=KEEPALIVE_INTERVAL)
+                except queue.Empty:
+                    send(b": keepalive\n\n")
+                    continue
+                if delta["version"] <= version:
+                    continue  # Already in the snapshot
+                narrowed = delta_for_area(delta, area)
+                if narrowed["added"] or narrowed["updated"] or narrowed["expired"]:
+                    send(encode_event('delta', narrowed, delta["version"]))
+            if overflow.is_set():
+                self.dropped += 1
+            send(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            unsubscribe()
+            self.clients -= 1
+            handler.close_connection = True
+
+
+def _events(response):
+    """Parses a text/event-stream response into (event, data) pairs."""
+    event, data = 'message', []
+    for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+        if line is None:
+            continue
+        if not line:
+            if data:
+                yield event, json.loads("\n".join(data))
+            event, data = 'message', []
+        elif line.startswith(':'):
+            continue
+        elif line.startswith('event:'):
+            event = line[6:].strip()
+        elif line.startswith('data:'):
+            data.append(line[5:].lstrip())
+
+
+class AlertStreamClient:
+    """Keeps an AlertStore current from a remote AlertStreamServer, reconnecting as needed."""
+
+    def __init__(self, url, store):
+        self.url = url
+        self.store = store
+        self.last_error = None
+        self.last_event = None  # datetime of the last snapshot/delta received
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='nws-alert-stream-client', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stops after the current event (or keepalive) arrives."""
+        self._stop.set()
+
+    def _run(self):
+        params = {'area': self.store.area} if self.store.area else None
+        while not self._stop.is_set():
+            try:
+                with requests.get(self.url, params=params, stream=True, timeout=(10, KEEPALIVE_INTERVAL * 3),
+                                  headers={'Accept': 'text/event-stream', 'User-Agent': nws_user_agent()}) as response:
+                    response.raise_for_status()
+                    for event, data in _events(response):
+                        if self._stop.is_set():
+                            break
+                        if event == 'snapshot':
+                            self.store.apply_snapshot(data["version"], data["features"], force=True)
+                            self.store.connected = True
+                        elif event == 'delta':
+                            self.store.apply_delta(data)
+                        self.last_event = datetime.now()
+                        self.last_error = None
+            except (requests.exceptions.RequestException, ValueError) as e:
+                if not self._stop.is_set():
+                    self.last_error = str(e)
+                    print(f"Warning: Alert stream disconnected: {e}")
+            self.store.connected = False
+            self._stop.wait(RECONNECT_DELAY)
+
+
+if __name__ == '__main__':
+    # cd chatbot_forecast && python -m services.alert_stream
+    server = AlertStreamServer().start()
+    print(f"Streaming alert deltas at {server.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
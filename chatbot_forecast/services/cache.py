@@ -0,0 +1,189 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+MIN_TTL = 60                  # Never cache for less than a minute
+GRID_UPDATE_INTERVAL = 3600   # NWS refreshes gridpoint data roughly hourly
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a per-entry TTL.
+
+    Keeps hit/miss/eviction/expiration counters so callers can see how well
+    the cache is doing. With `max_stale`, expired entries are kept that much
+    longer so `get_entry` can still serve them (stale-while-revalidate);
+    `get` always treats them as misses.
+    """
+
+    def __init__(self, maxsize=256, default_ttl=600, max_stale=0):
+        self.maxsize = maxsize
+        self.default_ttl = default_ttl
+        self.max_stale = max_stale
+        self._data = OrderedDict()  # key -> (expires_at, stored_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _lookup(self, key, now):
+        """Returns the entry for `key` (dropping it once past the stale window), or None. Caller holds the lock."""
+        entry = self._data.get(key)
+        if entry is not None and entry[0] + self.max_stale <= now:
+            del self._data[key]
+            self.expirations += 1
+            return None
+        return entry
+
+    def get(self, key, default=None):
+        """Returns the cached value, or `default` if missing or expired."""
+        with self._lock:
+            now = time.time()
+            entry = self._lookup(key, now)
+            if entry is None or entry[0] <= now:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def get_entry(self, key):
+        """Returns (value, age_seconds, is_fresh) even for an expired entry within the stale window, else None."""
+        with self._lock:
+            now = time.time()
+            entry = self._lookup(key, now)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, stored_at, value = entry
+            self._data.move_to_end(key)
+            fresh = expires_at > now
+            if fresh:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+            return value, now - stored_at, fresh
+
+    def set(self, key, value, ttl=None):
+        """Stores a value for `ttl` seconds, evicting the least recently used entry if full."""
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            now = time.time()
+            self._data[key] = (now + ttl, now, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def ttl_remaining(self, key):
+        """Returns seconds until `key` expires (0 if already expired), or None if absent.
+
+        Doesn't touch the LRU order or the hit/miss counters.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            return max(entry[0] - time.time(), 0)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """Returns the cache counters as a dict."""
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale_hits": self.stale_hits,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class BackgroundRefresher:
+    """Runs cache refreshes on a small thread pool, at most one in flight per key."""
+
+    def __init__(self, max_workers=2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='refresh')
+        self._pending = {}  # key -> Future
+        self._lock = threading.Lock()
+
+    def submit(self, key, func, *args, **kwargs):
+        """Schedules `func(*args, **kwargs)` unless a refresh for `key` is already running. Returns its Future."""
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = self._pending[key] = self._executor.submit(self._run, key, func, args, kwargs)
+            return future
+
+    def _run(self, key, func, args, kwargs):
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            print(f"Warning: Background refresh of {key!r} failed: {e}")
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def is_pending(self, key):
+        with self._lock:
+            return key in self._pending
+
+    def wait(self, key, timeout=None):
+        """Waits for the in-flight refresh of `key`, if any. Returns False on timeout."""
+        with self._lock:
+            future = self._pending.get(key)
+        if future is None:
+            return True
+        return not wait([future], timeout).not_done
+
+
+def ttl_from_headers(headers, default):
+    """Derives a TTL in seconds from Cache-Control max-age or Expires, else `default`."""
+    cache_control = headers.get("Cache-Control", "")
+    for directive in cache_control.split(","):
+        name, _, value = directive.strip().partition("=")
+        if name in ("s-maxage", "max-age") and value.isdigit():
+            return max(int(value), MIN_TTL)
+        if name in ("no-store", "no-cache"):
+            return MIN_TTL
+
+    expires = headers.get("Expires")
+    if expires:
+        try:
+            expires_at = parsedate_to_datetime(expires)
+            return max((expires_at - datetime.now(timezone.utc)).total_seconds(), MIN_TTL)
+        except (TypeError, ValueError):
+            pass
+    return default
+
+
+def grid_ttl(grid_data, ttl):
+    """Caps a gridpoint TTL at the next expected update after the payload's `updateTime`.
+
+    Offices often skip an hourly update, so an update slot that has already
+    passed is rolled forward by whole intervals rather than treated as due now.
+    """
+    update_time = grid_data.get("properties", {}).get("updateTime")
+    if not update_time:
+        return ttl
+    try:
+        updated = datetime.fromisoformat(update_time)
+    except ValueError:
+        return ttl
+    now = time.time()
+    next_update = updated.timestamp() + GRID_UPDATE_INTERVAL
+    if next_update <= now:
+        next_update += ((now - next_update) // GRID_UPDATE_INTERVAL + 1) * GRID_UPDATE_INTERVAL
+    return max(min(ttl, next_update - now), MIN_TTL)
@@ -0,0 +1,45 @@
+import hashlib
+import json
+from services.cache import TTLCache
+
+
+def content_hash(data):
+    """Short, stable hash of JSON-like data (e.g. the periods a figure is drawn from)."""
+    return hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+class FigureCache:
+    """Bounded cache of serialized Plotly figures keyed by (content key, figure id, theme).
+
+    Building a figure with Plotly Express/graph_objects is the expensive part
+    of rendering; serving a repeat view from here is a dictionary lookup.
+    Figures are stored as their plotly JSON (`fig.to_plotly_json()`), which
+    Dash and Streamlit accept directly. `theme` may be None for theme-neutral
+    figures.
+    """
+
+    def __init__(self, maxsize=256, ttl=3600):
+        self._cache = TTLCache(maxsize=maxsize, default_ttl=ttl)
+
+    def get(self, content_key, figure_id, theme=None):
+        """Returns the cached figure JSON, or None."""
+        return self._cache.get((content_key, figure_id, theme))
+
+    def set(self, content_key, figure_id, theme, figure):
+        """Stores a figure (a plotly Figure or its JSON dict) and returns the JSON."""
+        fig_json = figure.to_plotly_json() if hasattr(figure, 'to_plotly_json') else figure
+        self._cache.set((content_key, figure_id, theme), fig_json)
+        return fig_json
+
+    def get_or_build(self, content_key, figure_id, build, theme=None):
+        """Returns the cached figure JSON, calling `build()` to create it on a miss."""
+        fig_json = self.get(content_key, figure_id, theme)
+        if fig_json is None:
+            fig_json = self.set(content_key, figure_id, theme, build())
+        return fig_json
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        return self._cache.stats()
@@ -0,0 +1,191 @@
+import glob
+import importlib.util
+import os
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from services.valid_time import parse_valid_times
+
+# Root of the archive; archiving is off unless this is set (e.g. ~/.nextweather/forecast_archive)
+FORECAST_ARCHIVE_PATH = os.getenv('NWS_FORECAST_ARCHIVE', '')
+
+ARCHIVE_COLUMNS = ['office', 'x', 'y', 'layer', 'start', 'end', 'value', 'issued']
+# A forecast value is identified by its cell, layer, valid start and the issuance it came from
+KEY_COLUMNS = ['office', 'x', 'y', 'layer', 'start', 'issued']
+ISSUED_FORMAT = '%Y%m%dT%H%M%SZ'
+
+
+def grid_to_rows(grid_data, layers=None):
+    """Flattens a gridpoint payload's numeric layers into long-format archive rows.
+
+    Args:
+        grid_data (dict): The gridpoint JSON (full or stream-parsed).
+        layers (iterable, optional): Layers to keep. Defaults to every numeric layer.
+
+    Returns:
+        pd.DataFrame: One row per (layer, validTime) with ARCHIVE_COLUMNS; start,
+                      end and issued are UTC timestamps. Empty if the payload
+                      has no cell or updateTime.
+    """
+    props = grid_data.get('properties', {})
+    office, x, y, update_time = (props.get(key) for key in ('gridId', 'gridX', 'gridY', 'updateTime'))
+    if not all([office, x is not None, y is not None, update_time]):
+        return pd.DataFrame(columns=ARCHIVE_COLUMNS)
+
+    names, valid_times, values = [], [], []
+    for name, layer in props.items():
+        if layers is not None and name not in layers:
+            continue
+        if not isinstance(layer, dict) or not isinstance(layer.get('values'), list):
+            continue
+        for item in layer['values']:
+            value = item.get('value')
+            # Hazards and weather carry lists/dicts, not numbers
+            if value is None or isinstance(value, (int, float)):
+                names.append(name)
+                valid_times.append(item['validTime'])
+                values.append(value)
+
+    starts, ends = parse_valid_times(valid_times)
+    return pd.DataFrame({
+        'office': office,
+        'x': np.int32(x),
+        'y': np.int32(y),
+        'layer': pd.Categorical(names),
+        'start': pd.to_datetime(starts, unit='s', utc=True),
+        'end': pd.to_datetime(ends, unit='s', utc=True),
+        'value': np.array(values, dtype=float),
+        'issued': pd.Timestamp(update_time).tz_convert('UTC'),
+    }, columns=ARCHIVE_COLUMNS)
+
+
+class ForecastArchive:
+    """Append-only Parquet archive of gridpoint forecasts, one file per cell and issuance.
+
+    Layout: <root>/office=<gridId>/cell=<x>_<y>/<issued>.parquet. A query for a
+    cell only opens that cell's directory, and issuance filters are applied to
+    file names before anything is read. Rows are deduplicated on KEY_COLUMNS:
+    re-appending an issuance that is already archived (e.g. a refetch before
+    the office updates, or a 304) only adds rows it didn't have. Needs pyarrow.
+    """
+
+    def __init__(self, path=FORECAST_ARCHIVE_PATH):
+        if importlib.util.find_spec('pyarrow') is None:
+            raise ImportError("The forecast archive needs pyarrow (pip install pyarrow)")
+        self.path = path
+        self._lock = threading.Lock()
+        self._archived = set()  # (office, x, y, issued, layers) appended by this process
+        self.rows_written = 0
+        self.appends_skipped = 0
+
+    def _cell_dir(self, office, x, y):
+        return os.path.join(self.path, f"office={office}", f"cell={int(x)}_{int(y)}")
+
+    def append(self, grid_data, layers=None):
+        """Archives a gridpoint payload's layers. Returns the number of new rows written."""
+        props = grid_data.get('properties', {})
+        key = (props.get('gridId'), props.get('gridX'), props.get('gridY'), props.get('updateTime'),
+               frozenset(layers) if layers is not None else None)
+        if key in self._archived:
+            self.appends_skipped += 1
+            return 0
+
+        rows = grid_to_rows(grid_data, layers)
+        if rows.empty:
+            return 0
+        issued = rows['issued'].iloc[0]
+        cell_dir = self._cell_dir(*key[:3])
+        file_path = os.path.join(cell_dir, f"{issued.strftime(ISSUED_FORMAT)}.parquet")
+
+        with self._lock:
+            rows = rows.drop_duplicates(KEY_COLUMNS)
+            if os.path.exists(file_path):
+                existing = pd.read_parquet(file_path)
+                new_rows = len(rows) - len(rows.merge(existing[KEY_COLUMNS], on=KEY_COLUMNS))
+                if new_rows:
+                    rows = pd.concat([existing, rows]).drop_duplicates(KEY_COLUMNS)
+            else:
+                os.makedirs(cell_dir, exist_ok=True)
+                new_rows = len(rows)
+
+            if new_rows:
+                # Write then rename, so a reader never sees a half-written file
+                tmp_path = f"{file_path}.{threading.get_ident()}.tmp"
+                rows.sort_values(['layer', 'start']).to_parquet(tmp_path, index=False)
+                os.replace(tmp_path, file_path)
+                self.rows_written += new_rows
+            self._archived.add(key)
+        return new_rows
+
+    def issuances(self, office, x, y):
+        """Returns the archived issuance times for a cell, oldest first."""
+        files = glob.glob(os.path.join(self._cell_dir(office, x, y), '*.parquet'))
+        stamps = sorted(os.path.basename(f)[:-len('.parquet')] for f in files)
+        return [pd.Timestamp(datetime.strptime(s, ISSUED_FORMAT).replace(tzinfo=timezone.utc)) for s in stamps]
+
+    def query(self, office, x, y, start=None, end=None, layers=None, issued_after=None, issued_before=None):
+        """
+        Reads archived rows for one cell, optionally limited by valid time, layer and issuance.
+
+        Args:
+            start, end (datetime/str, optional): Keep rows valid at any point in [start, end).
+            layers (list, optional): Layer names to keep.
+            issued_after, issued_before (datetime/str, optional): Inclusive issuance bounds.
+
+        Returns:
+            pd.DataFrame: ARCHIVE_COLUMNS, sorted by issued, layer, start.
+        """
+        issued_after = _utc(issued_after)
+        issued_before = _utc(issued_before)
+        files = [
+            os.path.join(self._cell_dir(office, x, y), f"{issued.strftime(ISSUED_FORMAT)}.parquet")
+            for issued in self.issuances(office, x, y)
+            if (issued_after is None or issued >= issued_after) and (issued_before is None or issued <= issued_before)
+        ]
+        # Pushed down to the Parquet reader, which skips row groups outside the range
+        filters = []
+        if start is not None:
+            filters.append(('end', '>', _utc(start)))
+        if end is not None:
+            filters.append(('start', '<', _utc(end)))
+        if layers is not None:
+            filters.append(('layer', 'in', list(layers)))
+
+        frames = [pd.read_parquet(f, filters=filters or None) for f in files]
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame(columns=ARCHIVE_COLUMNS)
+        df = pd.concat(frames, ignore_index=True)
+        df['layer'] = df['layer'].astype(str)
+        return df.sort_values(['issued', 'layer', 'start'], ignore_index=True)
+
+    def compare_issuances(self, office, x, y, layer, start=None, end=None):
+        """One layer's archived forecasts side by side: a row per valid start, a column per issuance."""
+        df = self.query(office, x, y, start, end, layers=[layer])
+        if df.empty:
+            return pd.DataFrame()
+        return df.pivot_table(index='start', columns='issued', values='value', aggfunc='last')
+
+    def stats(self):
+        return {"rows_written": self.rows_written, "appends_skipped": self.appends_skipped}
+
+
+def _utc(value):
+    if value is None:
+        return None
+    stamp = pd.Timestamp(value)
+    return stamp.tz_localize('UTC') if stamp.tzinfo is None else stamp.tz_convert('UTC')
+
+
+def default_archive():
+    """The archive at NWS_FORECAST_ARCHIVE, or None when archiving is off or pyarrow is missing."""
+    if not FORECAST_ARCHIVE_PATH:
+        return None
+    try:
+        return ForecastArchive(FORECAST_ARCHIVE_PATH)
+    except ImportError as e:
+        print(f"Warning: Forecast archiving disabled: {e}")
+        return None
@@ -0,0 +1,91 @@
+import numpy as np
+from datetime import datetime, timezone
+from services.cache import TTLCache
+from services.valid_time import parse_valid_times
+
+
+class GridLayer:
+    """One gridpoint layer (e.g. temperature) as sorted start/end epoch arrays plus values.
+
+    A lookup at time T is a binary search over `starts` instead of a linear
+    scan that re-parses every validTime.
+    """
+
+    def __init__(self, layer):
+        self.uom = layer.get('uom', '')
+        entries = layer.get('values', [])
+        starts, ends = parse_valid_times([item['validTime'] for item in entries])
+        raw_values = [item['value'] for item in entries]
+
+        order = np.argsort(starts, kind='stable')
+        self.starts = starts[order]
+        self.ends = ends[order]
+        # Numeric layers get a float array (None -> NaN); hazards/weather keep their objects.
+        if all(v is None or isinstance(v, (int, float)) for v in raw_values):
+            self.values = np.array([np.nan if v is None else v for v in raw_values], dtype=np.float64)[order]
+            self.numeric = True
+        else:
+            values = np.empty(len(raw_values), dtype=object)
+            for i, v in enumerate(raw_values):
+                values[i] = v  # Element-wise so list values aren't broadcast into a 2-D array
+            self.values = values[order]
+            self.numeric = False
+
+    def __len__(self):
+        return len(self.starts)
+
+    def value_at(self, when):
+        """Returns the value valid at epoch seconds `when`, or None."""
+        i = np.searchsorted(self.starts, when, side='right') - 1
+        if i < 0 or when >= self.ends[i]:
+            return None
+        value = self.values[i]
+        if self.numeric:
+            return None if np.isnan(value) else float(value)
+        return value
+
+
+class GridIndex:
+    """Compiled view of a /gridpoints payload; layers are built on first use and reused."""
+
+    def __init__(self, grid_data):
+        self.properties = grid_data.get('properties', {})
+        self._layers = {}
+
+    def layer(self, parameter):
+        """Returns the GridLayer for a parameter, or None if the payload doesn't have it."""
+        if parameter not in self._layers:
+            raw = self.properties.get(parameter)
+            self._layers[parameter] = GridLayer(raw) if isinstance(raw, dict) and 'values' in raw else None
+        return self._layers[parameter]
+
+    def value_at(self, parameter, when=None):
+        """Returns (value, uom) for `parameter` at `when` (a datetime, default now), or (None, None)."""
+        layer = self.layer(parameter)
+        if layer is None:
+            return None, None
+        when = when or datetime.now(timezone.utc)
+        value = layer.value_at(when.timestamp())
+        if value is None:
+            return None, None
+        return value, layer.uom
+
+
+# Compiled indexes keyed on (gridpoint id, updateTime, properties present) so a
+# payload that was round-tripped through JSON (e.g. a dcc.Store) still finds its
+# index, while a stream-parsed layer subset of the same grid gets its own.
+_index_cache = TTLCache(maxsize=64, default_ttl=6 * 3600)
+
+
+def get_grid_index(grid_data):
+    """Returns the (memoized) GridIndex for a gridpoint payload."""
+    props = grid_data.get('properties', {})
+    grid_id, update_time = props.get('@id') or grid_data.get('id'), props.get('updateTime')
+    key = (grid_id, update_time, frozenset(props))
+    if (grid_id, update_time) == (None, None):
+        return GridIndex(grid_data)
+    index = _index_cache.get(key)
+    if index is None:
+        index = GridIndex(grid_data)
+        _index_cache.set(key, index)
+    return index
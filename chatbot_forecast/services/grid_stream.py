@@ -0,0 +1,154 @@
+import codecs
+import json
+import re
+
+# Gridpoint metadata that is always kept (small, and needed for caching/indexing)
+GRID_METADATA = ('@id', '@type', 'updateTime', 'validTimes', 'elevation',
+                 'forecastOffice', 'gridId', 'gridX', 'gridY')
+TOP_LEVEL_KEYS = ('id', 'type')
+
+_DECODER = json.JSONDecoder()
+_SPACE_RE = re.compile(r'\s*')
+# Text a skipped container can be advanced over in one C-level match: runs of
+# non-bracket characters and complete strings, optionally wrapping flat
+# (bracket-free) objects. Only nested or cut-off containers fall back to the
+# per-bracket loop in skip_value.
+_STRING = r'"[^"\\]*+(?:\\.[^"\\]*+)*+"'
+_RUN = rf'[^"\[\]{{}}]*+(?:{_STRING}[^"\[\]{{}}]*+)*+'
+_SKIP_RE = re.compile(rf'{_RUN}(?:\{{{_RUN}\}}{_RUN})*+')
+
+
+class _StreamScanner:
+    """Walks a JSON document arriving in chunks, one member value at a time.
+
+    Each kept value is decoded by the C JSON scanner as soon as it is complete;
+    skipped containers are scanned past without building any objects. Consumed
+    text is dropped, so only one value (at most one layer) is buffered at a
+    time instead of the whole document.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.bytes_read = 0
+
+    def _fill(self):
+        """Reads the next chunk, dropping the already-consumed part of the buffer."""
+        if self.eof:
+            raise ValueError("Unexpected end of JSON stream")
+        self.buf = self.buf[self.pos:]
+        self.pos = 0
+
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.eof = True
+            self.buf += self.decoder.decode(b'', final=True)
+        else:
+            self.bytes_read += len(chunk)
+            self.buf += self.decoder.decode(chunk)
+
+    def peek(self):
+        while True:
+            self.pos = _SPACE_RE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            self._fill()
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} in JSON stream")
+        self.pos += 1
+
+    def read_value(self):
+        """Decodes and returns the JSON value at the cursor."""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+                # A number at the very end of the buffer may continue in the next chunk
+                if end < len(self.buf) or self.eof or self.buf[self.pos] not in '-0123456789':
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            # Incomplete: at least double the buffered text before retrying, so
+            # values spanning many chunks are still decoded in linear time.
+            target = 2 * (len(self.buf) - self.pos)
+            while not self.eof and len(self.buf) - self.pos < target:
+                self._fill()
+
+    def skip_value(self):
+        """Advances past the JSON value at the cursor without decoding it."""
+        if self.peek() not in '{[':
+            self.read_value()
+            return
+        self.pos += 1
+        depth = 1
+        while True:
+            self.pos = _SKIP_RE.match(self.buf, self.pos).end()
+            if self.pos == len(self.buf):
+                self._fill()
+                continue
+            char = self.buf[self.pos]
+            if char in '{[':
+                depth += 1
+            elif char in '}]':
+                depth -= 1
+            else:
+                # A string cut off at the end of the buffer
+                self._fill()
+                continue
+            self.pos += 1
+            if depth == 0:
+                return
+
+    def members(self):
+        """Yields the keys of the object at the cursor; the caller must consume each value."""
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.read_value()
+            self.expect(':')
+            yield key
+            if self.peek() == ',':
+                self.pos += 1
+                continue
+            self.expect('}')
+            return
+
+
+def extract_layers(chunks, layers):
+    """Builds a slimmed gridpoint payload from a byte stream, keeping only `layers`.
+
+    Args:
+        chunks (iterable): Raw response bytes, e.g. response.iter_content(65536).
+        layers (iterable): Property names to keep (e.g. 'temperature', 'hazards').
+
+    Returns:
+        dict: {'id', 'type', 'properties': {...}} with the requested layers plus
+              the gridpoint metadata in GRID_METADATA.
+        int: Number of bytes read from the stream.
+    """
+    wanted = set(layers) | set(GRID_METADATA)
+    scanner = _StreamScanner(chunks)
+    payload = {}
+    for key in scanner.members():
+        if key == 'properties':
+            properties = {}
+            for prop in scanner.members():
+                if prop in wanted:
+                    properties[prop] = scanner.read_value()
+                else:
+                    scanner.skip_value()
+            payload['properties'] = properties
+        elif key in TOP_LEVEL_KEYS:
+            payload[key] = scanner.read_value()
+        else:
+            scanner.skip_value()
+    return payload, scanner.bytes_read
@@ -0,0 +1,71 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+KMH_PER_MPH = 1.609344
+
+# windSpeed strings look like "10 mph", "10 to 15 mph" or "20 km/h"
+_WIND_RE = re.compile(r'(\d+)(?:\s*to\s*(\d+))?')
+
+
+def _f_from_c(celsius):
+    return celsius * 9 / 5 + 32
+
+
+def normalize_hourly(data, parse_times=True):
+    """Turns a forecastHourly payload into a typed, columnar DataFrame in one pass.
+
+    The period fields, nested quantities and wind ranges are read in a single
+    loop over the periods, the numeric columns are converted as whole arrays,
+    and the DataFrame is built once, instead of one `.apply` per column per slice.
+
+    Args:
+        data (dict): The forecastHourly JSON (with properties.periods).
+        parse_times (bool): Parse startTime to datetimes. Pass False to
+                            keep the ISO strings (e.g. when records are saved as JSON).
+
+    Returns:
+        pd.DataFrame: The period fields plus numeric columns:
+            temperature_f, pop_val (%), dewpoint_val (°C), dewpoint_f,
+            humidity_val (%), wind_speed_val / wind_speed_max (mph, low/high of a range).
+    """
+    periods = data.get('properties', {}).get('periods', [])
+    # Periods share one schema; the DataFrame is built once from these columns
+    columns = {key: [] for key in (periods[0] if periods else {})}
+    pop, dewpoint, dewpoint_is_f, humidity = [], [], [], []
+    wind_low, wind_high, wind_is_kmh = [], [], []
+    for period in periods:
+        for key, values in columns.items():
+            values.append(period.get(key))
+        pop.append((period.get('probabilityOfPrecipitation') or {}).get('value'))
+        dew = period.get('dewpoint') or {}
+        dewpoint.append(dew.get('value'))
+        dewpoint_is_f.append((dew.get('unitCode') or '').endswith('degF'))
+        humidity.append((period.get('relativeHumidity') or {}).get('value'))
+
+        wind = period.get('windSpeed') or ''
+        match = _WIND_RE.search(wind)
+        wind_low.append(match.group(1) if match else None)
+        wind_high.append((match.group(2) or match.group(1)) if match else None)
+        wind_is_kmh.append('km/h' in wind)
+
+    # dtype=float turns None (and numeric strings) into floats, missing as NaN
+    dew = np.array(dewpoint, dtype=float)
+    dew_c = np.where(dewpoint_is_f, (dew - 32) * 5 / 9, dew)
+    temperature = np.array([t if isinstance(t, (int, float)) else None for t in columns.get('temperature', [])], dtype=float)
+    temperature_c = np.array([u == 'C' for u in columns.get('temperatureUnit', [None] * len(periods))], dtype=bool)
+    wind_scale = np.where(wind_is_kmh, 1 / KMH_PER_MPH, 1.0)
+
+    columns['temperature_f'] = np.where(temperature_c, _f_from_c(temperature), temperature)
+    columns['pop_val'] = np.array(pop, dtype=float)
+    columns['dewpoint_val'] = dew_c
+    columns['dewpoint_f'] = _f_from_c(dew_c)
+    columns['humidity_val'] = np.array(humidity, dtype=float)
+    columns['wind_speed_val'] = np.array(wind_low, dtype=float) * wind_scale
+    columns['wind_speed_max'] = np.array(wind_high, dtype=float) * wind_scale
+
+    df = pd.DataFrame(columns)
+    if parse_times and periods:
+        df['startTime'] = pd.to_datetime(df['startTime'], format='ISO8601')
+    return df
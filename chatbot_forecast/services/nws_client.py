@@ -0,0 +1,272 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+import requests
+from requests.adapters import HTTPAdapter
+from services.points_cache import PointsCache
+from services.cache import TTLCache
+from services.grid_stream import extract_layers
+from services.rate_limit import (TokenBucket, backoff_delay, retry_after_seconds,
+                                 RATE_LIMIT, RATE_BURST, MAX_RETRIES)
+
+BASE_URL = "https://api.weather.gov"
+
+# CRITICAL: The NWS API requires a User-Agent header for all requests.
+# Every NWS call in the process goes through one client so they all share it.
+DEFAULT_USER_AGENT = '(nextweather, contact@example.com)'
+
+# Connection pool sizing. NWS is a single host, so the per-host limit is what matters.
+POOL_CONNECTIONS = 4    # Number of distinct hosts to keep pools for
+POOL_MAXSIZE = 16       # Max keep-alive connections per host
+DEFAULT_TIMEOUT = (5, 30)  # (connect, read) seconds
+VALIDATOR_CACHE_SIZE = 256  # Bodies kept for ETag/Last-Modified revalidation
+VALIDATOR_TTL = 24 * 3600
+STREAM_CHUNK_SIZE = 64 * 1024
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+THROTTLE_STATUSES = (429, 503)  # NWS signals "slow down" with these
+
+
+class NWSClient:
+    """Keep-alive HTTP client for api.weather.gov.
+
+    Wraps a single requests.Session so that repeated calls reuse the same
+    TCP/TLS connection instead of paying for a new handshake every time.
+    Every request is paced by a shared token bucket, and throttled or failed
+    requests are retried with backoff.
+    """
+
+    def __init__(self, user_agent=None, timeout=DEFAULT_TIMEOUT,
+                 pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, points_cache=None,
+                 base_url=BASE_URL, coalesce=True, rate_limit=RATE_LIMIT, burst=RATE_BURST,
+                 max_retries=MAX_RETRIES):
+        self.base_url = base_url
+        self.coalesce = coalesce
+        self.timeout = timeout
+        self.points_cache = points_cache
+        self.limiter = TokenBucket(rate=rate_limit, burst=burst)
+        self.max_retries = max_retries
+        # url -> (etag, last_modified, data, body size) for conditional GETs
+        self.validators = TTLCache(maxsize=VALIDATOR_CACHE_SIZE, default_ttl=VALIDATOR_TTL)
+        self._stats_lock = threading.Lock()
+        self._stats = {"revalidated": 0, "not_modified": 0, "bytes_saved": 0, "coalesced": 0,
+                       "throttled": 0, "retried": 0, "limiter_wait": 0.0}
+        # Single-flight: request key -> Future shared by every caller waiting on it
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self.session = requests.Session()
+        self.session.headers.update({
+            "User-Agent": user_agent or nws_user_agent(),
+            "Accept": "application/geo+json",
+        })
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        """Issues a GET on the pooled session, paced by the rate limiter. Returns the raw Response.
+
+        429/5xx responses and connection errors are retried up to `max_retries`
+        times with jittered exponential backoff, or after the Retry-After the
+        server asked for. 429/503 also slow the limiter down for every caller.
+        The final response is returned (or the final exception raised) as-is.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        for attempt in range(self.max_retries + 1):
+            self._count("limiter_wait", self.limiter.acquire())
+            try:
+                response = self.session.get(url, params=params, headers=headers, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                delay = backoff_delay(attempt)
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    self.limiter.success()
+                    return response
+                retry_after = retry_after_seconds(response.headers.get("Retry-After"))
+                if response.status_code in THROTTLE_STATUSES:
+                    self._count("throttled")
+                    self.limiter.throttle(pause=retry_after or 0)
+                if attempt == self.max_retries:
+                    return response
+                response.close()
+                delay = retry_after if retry_after is not None else backoff_delay(attempt)
+            self._count("retried")
+            time.sleep(delay)
+
+    def fetch_json(self, url, params=None, headers=None, layers=None):
+        """GETs a URL and returns (decoded JSON body, response headers). Raises on HTTP errors.
+
+        Passing `layers` (gridpoint endpoints only) streams the body and keeps
+        just those properties, so peak memory scales with what is used. Parse
+        time stays about that of a full json.loads: skipped layers are not
+        decoded, but still have to be scanned.
+
+        Concurrent calls for the same request are coalesced: the first caller
+        performs the fetch and the others wait for and share its parsed result
+        (or its exception).
+        """
+        if not self.coalesce:
+            return self._fetch_json(url, params, headers, layers)
+
+        key = (url, _freeze(params), _freeze(headers), _layers_key(layers))
+        with self._inflight_lock:
+            call = self._inflight.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._inflight[key] = Future()
+        if not is_leader:
+            self._count("coalesced")
+            return call.result()
+
+        try:
+            result = self._fetch_json(url, params, headers, layers)
+            call.set_result(result)
+            return result
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+    def _fetch_json(self, url, params=None, headers=None, layers=None):
+        """Performs one fetch for fetch_json.
+
+        If an earlier response for the same URL carried an ETag or Last-Modified,
+        the request is sent as a conditional GET; a 304 reuses the stored body
+        instead of downloading and decoding it again.
+        """
+        key = (url, _freeze(params), _layers_key(layers))
+        stored = self.validators.get(key)
+        headers = dict(headers or {})
+        if stored:
+            etag, last_modified = stored[0], stored[1]
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+            self._count("revalidated")
+
+        # Closed on every path, so a streamed response never holds a pooled connection
+        with self.get(url, params=params, headers=headers, stream=layers is not None) as response:
+            if stored and response.status_code == 304:
+                self._count("not_modified")
+                self._count("bytes_saved", stored[3])
+                self.validators.set(key, stored)
+                return stored[2], response.headers
+
+            response.raise_for_status()
+            if layers is None:
+                data, size = response.json(), len(response.content)
+            else:
+                data, size = extract_layers(response.iter_content(STREAM_CHUNK_SIZE), layers)
+        etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+        if etag or last_modified:
+            self.validators.set(key, (etag, last_modified, data, size))
+        return data, response.headers
+
+    def get_json(self, url, params=None, headers=None, layers=None):
+        """GETs a URL and returns the decoded JSON body. Raises on HTTP errors."""
+        return self.fetch_json(url, params=params, headers=headers, layers=layers)[0]
+
+    def get_point(self, lat, lon):
+        """Resolves a lat/lon to its /points properties (gridId, gridX, gridY, forecast URLs).
+
+        Served from the on-disk points cache when possible, so the /points
+        round-trip is only paid once per grid cell. Raises on HTTP errors.
+        """
+        if self.points_cache is None:
+            self.points_cache = PointsCache()
+        cached = self.points_cache.get(lat, lon)
+        if cached:
+            return cached
+
+        properties = self.get_json(f"{self.base_url}/points/{lat},{lon}").get("properties", {})
+        if all(properties.get(key) for key in ("gridId", "gridX", "gridY")):
+            self.points_cache.put(lat, lon, properties)
+        return properties
+
+    def get_json_many(self, urls):
+        """Fetches several independent URLs concurrently.
+
+        Args:
+            urls (dict): Maps a name (e.g. "hourly") to the URL to fetch.
+
+        Returns:
+            dict: Decoded JSON bodies for the fetches that succeeded, in the order of `urls`.
+            dict: The exception raised by each fetch that failed.
+        """
+        return fan_out({name: partial(self.get_json, url) for name, url in urls.items()})
+
+    def _count(self, name, amount=1):
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def stats(self):
+        """Returns the client's request counters (revalidations, 304s, bytes saved, coalesced,
+        throttled and retried requests, seconds spent waiting on the rate limiter, current rate)."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["rate_limit"] = round(self.limiter.rate, 2)
+        return stats
+
+    def close(self):
+        self.session.close()
+
+
+def _freeze(mapping):
+    """Turns an optional params/headers dict into a hashable key."""
+    return tuple(sorted(mapping.items())) if mapping else None
+
+
+def _layers_key(layers):
+    return tuple(sorted(layers)) if layers is not None else None
+
+
+def fan_out(calls):
+    """Runs independent zero-argument callables concurrently on a small thread pool.
+
+    Args:
+        calls (dict): Maps a name to the callable to run.
+
+    Returns:
+        dict: Return values of the calls that succeeded, in the order of `calls`.
+        dict: The exception raised by each call that failed.
+    """
+    results, errors = {}, {}
+    if not calls:
+        return results, errors
+    with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+        futures = {name: executor.submit(call) for name, call in calls.items()}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            errors[name] = e
+    return results, errors
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def nws_user_agent():
+    """The User-Agent every NWS request carries: the NWS_USER_AGENT setting, else DEFAULT_USER_AGENT.
+
+    Read when the client is created, not at import, so a .env loaded after
+    this module (as the apps' config does) still applies.
+    """
+    return os.getenv('NWS_USER_AGENT', DEFAULT_USER_AGENT)
+
+
+def get_client():
+    """Returns the process-wide NWSClient (one connection pool and User-Agent), creating it on first use."""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_lock:
+            if _shared_client is None:
+                _shared_client = NWSClient()
+    return _shared_client
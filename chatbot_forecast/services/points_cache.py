@@ -0,0 +1,103 @@
+import os
+import sqlite3
+import threading
+import time
+
+# Shared on-disk location so the Dash, Streamlit and chatbot apps reuse one cache.
+POINTS_CACHE_PATH = os.getenv(
+    'NWS_POINTS_CACHE',
+    os.path.join(os.path.expanduser('~'), '.nextweather', 'nws_points.sqlite')
+)
+
+POINT_PRECISION = 4        # Decimals /points itself resolves coordinates to (~11 m)
+SCHEMA_VERSION = 2         # Bumped when the key changes; older caches are dropped and rebuilt
+MAX_AGE = 30 * 24 * 3600   # Grid assignments change rarely; re-resolve monthly
+
+# /points properties we keep, in column order
+POINT_FIELDS = ('gridId', 'gridX', 'gridY', 'forecast', 'forecastHourly', 'forecastGridData')
+# /points properties naming the zones that cover the point (their URLs end in the UGC code)
+ZONE_FIELDS = ('forecastZone', 'county', 'fireWeatherZone')
+
+
+def point_zones(properties):
+    """UGC zone codes covering a point (e.g. ['MOZ028', 'MOC095']), from /points or cached properties."""
+    if 'zones' in properties:
+        return properties['zones']
+    return [url.rstrip('/').rsplit('/', 1)[-1] for url in (properties.get(field) for field in ZONE_FIELDS) if url]
+
+
+def point_key(lat, lon):
+    """Integer key for a lat/lon: the coordinates rounded to POINT_PRECISION decimals, as /points does.
+
+    Only coordinates /points would treat as the same point share a key; two
+    points a little apart can sit in different NWS grid cells or zones.
+    """
+    scale = 10 ** POINT_PRECISION
+    return round(float(lat) * scale), round(float(lon) * scale)
+
+
+class PointsCache:
+    """Disk-backed lat/lon -> NWS grid cell mapping, taken from /points responses.
+
+    Backed by SQLite so entries survive restarts and can be shared between
+    processes. Coordinates that round to the same point_key share an entry.
+    """
+
+    def __init__(self, path=POINTS_CACHE_PATH, max_age=MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        with self._lock, self._conn:
+            if path != ':memory:':
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                # Older caches were keyed on a coarser lattice (or lack zones); drop and re-resolve
+                self._conn.execute("DROP TABLE IF EXISTS points")
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS points (
+                    lat_key INTEGER NOT NULL,
+                    lon_key INTEGER NOT NULL,
+                    grid_id TEXT NOT NULL,
+                    grid_x INTEGER NOT NULL,
+                    grid_y INTEGER NOT NULL,
+                    forecast TEXT,
+                    forecast_hourly TEXT,
+                    forecast_grid_data TEXT,
+                    fetched_at REAL NOT NULL,
+                    zones TEXT,
+                    PRIMARY KEY (lat_key, lon_key)
+                )
+            """)
+
+    def get(self, lat, lon):
+        """Returns the cached /points properties for this point (plus "zones"), or None."""
+        lat_key, lon_key = point_key(lat, lon)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT grid_id, grid_x, grid_y, forecast, forecast_hourly, forecast_grid_data, zones, fetched_at "
+                "FROM points WHERE lat_key = ? AND lon_key = ?", (lat_key, lon_key)
+            ).fetchone()
+        if row is None or time.time() - row[-1] > self.max_age:
+            return None
+        properties = dict(zip(POINT_FIELDS, row[:-2]))
+        properties['zones'] = row[-2].split(',') if row[-2] else []
+        return properties
+
+    def put(self, lat, lon, properties):
+        """Stores the grid mapping from a /points `properties` block."""
+        lat_key, lon_key = point_key(lat, lon)
+        values = [properties.get(field) for field in POINT_FIELDS]
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO points "
+                "(lat_key, lon_key, grid_id, grid_x, grid_y, forecast, forecast_hourly, forecast_grid_data, fetched_at, zones) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (lat_key, lon_key, *values, time.time(), ','.join(point_zones(properties)))
+            )
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,120 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+
+from services.cache import MIN_TTL
+
+# Locations to keep warm, as "lat,lon;lat,lon" (e.g. "39.0997,-94.5786;47.6062,-122.3321")
+NWS_WATCH_LIST = os.getenv('NWS_WATCH_LIST', '')
+
+MIN_INTERVAL = 1.0    # Seconds between refreshes, so a long watch list doesn't burst against NWS rate limits
+REFRESH_LEAD = 60     # Refresh this long before a location's cached products would expire
+RETRY_DELAY = 300     # Wait before retrying a location whose refresh failed
+ALERT_INTERVAL = 50   # Just under the minimum cache TTL, so cached alerts never go stale between refreshes
+
+
+def parse_watch_list(value):
+    """Parses "lat,lon;lat,lon" into [(lat, lon), ...], skipping malformed entries."""
+    locations = []
+    for entry in (value or '').split(';'):
+        if not entry.strip():
+            continue
+        lat, _, lon = entry.partition(',')
+        try:
+            locations.append((float(lat), float(lon)))
+        except ValueError:
+            print(f"Warning: Ignoring watch list entry {entry!r}")
+    return locations
+
+
+class Prefetcher:
+    """Keeps forecast, hourly, grid and alert data warm for a watch list of locations.
+
+    A daemon thread refreshes each location shortly before the first of its
+    cached products expires. Gridpoint TTLs are capped at the next expected
+    update after `updateTime` (see cache.grid_ttl), so grid refreshes follow
+    the NWS update cycle. Refreshes are spaced at least `min_interval` apart to
+    stay well under NWS rate limits, and they use conditional GETs, so an
+    unchanged product costs a 304. Reads through the same WeatherService then
+    find warm data and make no network call.
+    """
+
+    def __init__(self, weather_service, locations, min_interval=MIN_INTERVAL, alert_interval=ALERT_INTERVAL):
+        self.weather_service = weather_service
+        self.locations = list(locations)
+        self.min_interval = min_interval
+        self.alert_interval = alert_interval
+        self._queue = []  # heap of (due_at, seq, kind, location)
+        self._seq = itertools.count()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.refreshes = 0
+        self.alert_refreshes = 0
+        self.failures = 0
+
+    def start(self):
+        """Starts the background thread. A no-op for an empty watch list or if already running."""
+        with self._lock:
+            if self._thread is not None or not self.locations:
+                return self
+            now = time.time()
+            for location in self.locations:
+                self._schedule(now, 'forecast', location)
+                if self.alert_interval:
+                    self._schedule(now, 'alerts', location)
+            self._thread = threading.Thread(target=self._run, name='nws-prefetch', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _schedule(self, due_at, kind, location):
+        heapq.heappush(self._queue, (due_at, next(self._seq), kind, location))
+
+    def _run(self):
+        while not self._stop.is_set():
+            due_at, _, kind, location = self._queue[0]
+            if self._stop.wait(max(due_at - time.time(), 0)):
+                break
+            heapq.heappop(self._queue)
+            delay = self.refresh(kind, location)
+            self._schedule(time.time() + delay, kind, location)
+            self._stop.wait(self.min_interval)
+
+    def refresh(self, kind, location):
+        """Refreshes one location's forecast products ('forecast') or alerts ('alerts').
+
+        Returns:
+            float: Seconds until this location/kind should be refreshed again.
+        """
+        lat, lon = location
+        try:
+            if kind == 'alerts':
+                self.weather_service.get_active_alerts(lat, lon, refresh=True)
+                self.alert_refreshes += 1
+                return self.alert_interval
+
+            data = self.weather_service.get_weather_data(lat, lon, refresh=True)
+            if "error" in data:
+                raise RuntimeError(data["error"])
+            self.refreshes += 1
+            return max(self.weather_service.seconds_until_stale(lat, lon) - REFRESH_LEAD, MIN_TTL)
+        except Exception as e:
+            self.failures += 1
+            print(f"Warning: Prefetch of {kind} for {lat},{lon} failed: {e}")
+            return RETRY_DELAY
+
+    def stats(self):
+        """Returns the refresh counters and the number of watched locations."""
+        return {
+            "locations": len(self.locations),
+            "refreshes": self.refreshes,
+            "alert_refreshes": self.alert_refreshes,
+            "failures": self.failures,
+        }
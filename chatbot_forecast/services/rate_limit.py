@@ -0,0 +1,97 @@
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# NWS doesn't publish a fixed limit, but throttles bursts with 429/503s.
+RATE_LIMIT = float(os.getenv('NWS_RATE_LIMIT', '5'))   # Sustained requests per second, per process
+RATE_BURST = 10         # Requests allowed back to back before pacing kicks in
+MIN_RATE = 0.5          # Floor when adapting down after throttling
+RATE_RECOVERY = 0.1     # Requests/second regained per successful request
+THROTTLE_COOLDOWN = 1.0 # One throttle wave only halves the rate once
+
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5      # First retry waits up to this long (seconds), doubling per attempt
+BACKOFF_CAP = 8.0
+MAX_RETRY_AFTER = 60.0  # Don't let one Retry-After park a thread for longer than this
+
+
+class TokenBucket:
+    """Thread-safe token bucket that adapts its rate to upstream throttling.
+
+    Each request takes a token; tokens refill at `rate` per second up to
+    `burst`. When NWS pushes back, `throttle()` halves the rate (and can
+    pause every caller for a Retry-After); successful requests raise it back
+    additively, up to the configured rate (AIMD).
+    """
+
+    def __init__(self, rate=RATE_LIMIT, burst=RATE_BURST, min_rate=MIN_RATE):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min(min_rate, rate)
+        self.tokens = float(burst)
+        self.paused_until = 0.0
+        self._updated = time.monotonic()
+        self._last_throttle = float('-inf')
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Blocks until a request may be sent. Returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self.paused_until - now
+                if wait <= 0:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return waited
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def throttle(self, pause=0.0):
+        """Upstream throttled us: halve the rate, drop the burst, and pause all callers for `pause` seconds."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now - self._last_throttle >= THROTTLE_COOLDOWN:
+                self.rate = max(self.min_rate, self.rate / 2)
+                self._last_throttle = now
+            self.tokens = min(self.tokens, 0.0)
+            if pause:
+                self.paused_until = max(self.paused_until, now + pause)
+
+    def success(self):
+        """Regains some rate after a request that wasn't throttled."""
+        with self._lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + RATE_RECOVERY)
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    """Full-jitter exponential backoff: a random delay in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def retry_after_seconds(value):
+    """Parses a Retry-After header (delta-seconds or HTTP-date) to seconds, capped; None if absent/invalid."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        seconds = float(value)
+    else:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
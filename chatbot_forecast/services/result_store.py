@@ -0,0 +1,41 @@
+import hashlib
+import json
+from services.cache import TTLCache
+
+
+def payload_fingerprint(result):
+    """Cheap content identity for a weather result: location plus each product's id and update stamp."""
+    parts = {"lat": result.get("lat"), "lon": result.get("lon")}
+    for product in ("forecast", "hourly", "grid"):
+        data = result.get(product) or {}
+        props = data.get("properties", {})
+        parts[product] = [data.get("id") or props.get("@id"), props.get("updateTime"),
+                          props.get("generatedAt"), sorted(props)]
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+class ResultStore:
+    """Server-side home for fetched weather payloads, addressed by a short token.
+
+    Dash callbacks hand the browser only the token, so large payloads are not
+    serialized to the client and posted back on every interaction. The store
+    is per process; entries are evicted least-recently-used or after `ttl`.
+    """
+
+    def __init__(self, maxsize=64, ttl=6 * 3600):
+        self._cache = TTLCache(maxsize=maxsize, default_ttl=ttl)
+
+    def put(self, result):
+        """Stores a result dict and returns its token. Identical payloads share a token."""
+        token = payload_fingerprint(result)
+        self._cache.set(token, result)
+        return token
+
+    def get(self, token):
+        """Returns the stored result, or None if the token is unknown or was evicted."""
+        if not token:
+            return None
+        return self._cache.get(token)
+
+    def stats(self):
+        return self._cache.stats()
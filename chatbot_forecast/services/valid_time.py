@@ -0,0 +1,84 @@
+import re
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+import isodate
+import numpy as np
+
+# The duration forms NWS emits in gridpoint validTimes: PT1H, P1D, P1DT6H (minutes for safety)
+_DURATION_RE = re.compile(r'^P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?)?$')
+_OFFSET_RE = re.compile(r'^([+-])(\d{2}):?(\d{2})$')
+
+
+@lru_cache(maxsize=512)
+def parse_duration_seconds(duration_str):
+    """Converts an ISO-8601 duration such as 'PT1H' or 'P1DT6H' to seconds.
+
+    NWS reuses a handful of duration strings, so results are memoized.
+    Anything outside the NWS forms falls back to isodate.
+    """
+    match = _DURATION_RE.match(duration_str)
+    if match and duration_str not in ('P', 'PT'):
+        days, hours, minutes = (int(g) if g else 0 for g in match.groups())
+        return days * 86400 + hours * 3600 + minutes * 60
+    return isodate.parse_duration(duration_str).total_seconds()
+
+
+@lru_cache(maxsize=64)
+def _offset_seconds(offset_str):
+    """Converts a UTC offset suffix ('+00:00', '-06:00', 'Z', '') to seconds east of UTC."""
+    if offset_str in ('', 'Z', '+00:00'):
+        return 0
+    match = _OFFSET_RE.match(offset_str)
+    if not match:
+        raise ValueError(f"Unsupported UTC offset: {offset_str!r}")
+    sign, hours, minutes = match.groups()
+    seconds = int(hours) * 3600 + int(minutes) * 60
+    return -seconds if sign == '-' else seconds
+
+
+def parse_valid_times(valid_times):
+    """Parses a layer's validTime strings into start/end epoch-second arrays in one pass.
+
+    Args:
+        valid_times (list): Strings like '2025-11-27T23:00:00+00:00/PT1H'.
+
+    Returns:
+        np.ndarray: Start times as float64 epoch seconds.
+        np.ndarray: End times as float64 epoch seconds.
+    """
+    n = len(valid_times)
+    if n == 0:
+        return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.float64)
+
+    stamps, offsets, durations = [], [], []
+    for valid_time in valid_times:
+        time_str, _, duration_str = valid_time.partition('/')
+        stamps.append(time_str[:19])   # YYYY-MM-DDTHH:MM:SS
+        offsets.append(time_str[19:])
+        durations.append(duration_str)
+
+    try:
+        # numpy parses the naive timestamps in C; offsets are applied separately.
+        starts = np.array(stamps, dtype='datetime64[s]').astype(np.int64).astype(np.float64)
+        starts -= np.fromiter((_offset_seconds(o) for o in offsets), dtype=np.float64, count=n)
+    except ValueError:
+        # Fractional seconds or other unusual forms: parse element-wise.
+        starts = np.fromiter(
+            (datetime.fromisoformat(v.partition('/')[0]).timestamp() for v in valid_times),
+            dtype=np.float64, count=n
+        )
+    ends = starts + np.fromiter((parse_duration_seconds(d) for d in durations), dtype=np.float64, count=n)
+    return starts, ends
+
+
+def parse_valid_time(valid_time):
+    """Parses a single validTime into timezone-aware (start, end) datetimes."""
+    time_str, _, duration_str = valid_time.partition('/')
+    start = datetime.fromisoformat(time_str)
+    return start, start + timedelta(seconds=parse_duration_seconds(duration_str))
+
+
+def to_datetime(epoch_seconds):
+    """Converts epoch seconds back to a UTC datetime."""
+    return datetime.fromtimestamp(float(epoch_seconds), timezone.utc)
@@ -1,80 +1,177 @@
 import requests
 import pandas as pd
-import isodate
 from datetime import datetime, timezone
 import json
+from functools import partial
+from services.nws_client import get_client, fan_out
+from services.cache import TTLCache, BackgroundRefresher, ttl_from_headers, grid_ttl
+from services.grid_index import get_grid_index
+
+# Fallback TTLs (seconds) per product when NWS sends no caching headers
+PRODUCT_TTLS = {
+    "forecast": 1800,
+    "hourly": 900,
+    "grid": 900,
+    "alerts": 60,
+}
+
+# Gridpoint layers the chatbot context reads (current conditions + hazards)
+CHAT_GRID_LAYERS = (
+    'temperature', 'relativeHumidity', 'windSpeed', 'windGust',
+    'apparentTemperature', 'probabilityOfPrecipitation', 'skyCover', 'hazards',
+)
+
+# How long past expiry a product may still be served (marked stale) while it is refreshed
+STALE_WINDOW = 24 * 3600
 
 class WeatherService:
-    def __init__(self, user_agent):
-        self.headers = {"User-Agent": user_agent}
-        self.cache = {}
+    def __init__(self, cache_size=256, grid_layers=None, archive=None):
+        # Every service shares the process-wide client and its User-Agent (see nws_client.nws_user_agent)
+        self.client = get_client()
+        # Optional ForecastArchive that every fetched gridpoint payload is appended to
+        self.archive = archive
+        # When set, grid payloads are stream-parsed down to these layers
+        self.grid_layers = grid_layers
+        # Keyed on product URL (+ grid layers), so every point in the same grid cell shares entries
+        self.cache = TTLCache(maxsize=cache_size, max_stale=STALE_WINDOW)
+        self.refresher = BackgroundRefresher()
 
-    def get_weather_data(self, lat, lon):
-        """Fetches weather data from NWS API with basic caching."""
-        cache_key = f"{lat},{lon}"
-        # In a real app, check timestamp for TTL. For now, simple session cache.
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+    def get_weather_data(self, lat, lon, refresh=False, allow_stale=False):
+        """Fetches weather data from NWS API, serving each product from the TTL cache when fresh.
 
+        With `refresh=True` the cache is bypassed and repopulated (the conditional
+        GET still turns unchanged products into a 304).
+
+        With `allow_stale=True`, when some products have expired but are still
+        within STALE_WINDOW, the last good payloads are returned at once with
+        "stale": True and "age" (seconds since the oldest was fetched), and the
+        expired products are refetched in the background.
+        """
         try:
-            points_url = f"https://api.weather.gov/points/{lat},{lon}"
-            points_resp = requests.get(points_url, headers=self.headers)
-            points_resp.raise_for_status()
-            props = points_resp.json()['properties']
-            
-            data = {
-                "forecast": requests.get(props['forecast'], headers=self.headers).json(),
-                "hourly": requests.get(props['forecastHourly'], headers=self.headers).json(),
-                "grid": requests.get(props['forecastGridData'], headers=self.headers).json()
-            }
-            self.cache[cache_key] = data
+            props = self.client.get_point(lat, lon)
+            if allow_stale and not refresh:
+                stale = self._get_stale(props)
+                if stale is not None:
+                    return stale
+
+            data, errors = fan_out({
+                "forecast": partial(self.get_product, "forecast", props['forecast'], refresh=refresh),
+                "hourly": partial(self.get_product, "hourly", props['forecastHourly'], refresh=refresh),
+                "grid": partial(self.get_product, "grid", props['forecastGridData'], self.grid_layers, refresh=refresh)
+            })
+            if errors:
+                raise next(iter(errors.values()))
             return data
         except Exception as e:
             print(f"Error fetching weather data: {e}")
             return {"error": str(e)}
 
+    def get_product(self, product, url, layers=None, refresh=False):
+        """Returns one product payload, fetching it only when the cached copy has expired (or on `refresh`)."""
+        cache_key = self._cache_key(url, layers)
+        cached = None if refresh else self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        data, headers = self.client.fetch_json(url, layers=layers)
+        ttl = ttl_from_headers(headers, PRODUCT_TTLS[product])
+        if product == "grid":
+            ttl = grid_ttl(data, ttl)
+            self._archive(data, layers)
+        self.cache.set(cache_key, data, ttl)
+        return data
+
+    def _archive(self, grid_data, layers):
+        if self.archive is None:
+            return
+        try:
+            self.archive.append(grid_data, layers)
+        except Exception as e:
+            # Archiving is best-effort; the forecast is still served
+            print(f"Warning: Could not archive gridpoint forecast: {e}")
+
+    def _product_keys(self, props):
+        return {
+            "forecast": self._cache_key(props['forecast'], None),
+            "hourly": self._cache_key(props['forecastHourly'], None),
+            "grid": self._cache_key(props['forecastGridData'], self.grid_layers),
+        }
+
+    def _get_stale(self, props):
+        """Returns the cached products marked stale and schedules their refresh, or None if any is missing or all are fresh."""
+        entries = {product: self.cache.get_entry(key) for product, key in self._product_keys(props).items()}
+        if any(entry is None for entry in entries.values()) or all(entry[2] for entry in entries.values()):
+            return None
+        # One refresh per grid cell; it refetches only the expired products
+        self.refresher.submit(props['forecastGridData'], self.refresh_products, props)
+        data = {product: value for product, (value, _, _) in entries.items()}
+        data["stale"] = True
+        data["age"] = max(age for _, age, _ in entries.values())
+        return data
+
+    def refresh_products(self, props):
+        """Refetches whichever of a point's products have expired."""
+        _, errors = fan_out({
+            "forecast": partial(self.get_product, "forecast", props['forecast']),
+            "hourly": partial(self.get_product, "hourly", props['forecastHourly']),
+            "grid": partial(self.get_product, "grid", props['forecastGridData'], self.grid_layers),
+        })
+        if errors:
+            raise next(iter(errors.values()))
+
+    def is_refreshing(self, lat, lon):
+        """True while a background refresh for this point's grid cell is running."""
+        return self.refresher.is_pending(self.client.get_point(lat, lon)['forecastGridData'])
+
+    @staticmethod
+    def _cache_key(url, layers):
+        return (url, tuple(sorted(layers)) if layers is not None else None)
+
+    def seconds_until_stale(self, lat, lon):
+        """Seconds until the first of a location's cached products expires (0 if any is missing)."""
+        keys = self._product_keys(self.client.get_point(lat, lon)).values()
+        return min(self.cache.ttl_remaining(key) or 0 for key in keys)
+
+    def get_active_alerts(self, lat, lon, refresh=False):
+        """Returns the active-alerts GeoJSON for a point, cached briefly like the forecast products."""
+        # NWS accepts at most 4 decimal places for a point
+        url = f"{self.client.base_url}/alerts/active?point={float(lat):.4f},{float(lon):.4f}"
+        return self.get_product("alerts", url, refresh=refresh)
+
+    def cache_stats(self):
+        """Returns hit/miss/eviction counters for the forecast cache."""
+        return self.cache.stats()
+
     def get_current_conditions(self, grid_data):
         """Extracts current conditions from grid data."""
         if 'properties' not in grid_data:
             return "No grid data available."
             
-        props = grid_data['properties']
+        index = get_grid_index(grid_data)
         now = datetime.now(timezone.utc)
         
         conditions = []
         
         # Helper to get value for current time
         def get_val(param_name, label, unit_override=None):
-            if param_name not in props: return
-            values = props[param_name]['values']
-            uom = props[param_name].get('uom', '')
+            val, uom = index.value_at(param_name, now)
+            if val is None: return
             
-            for item in values:
-                time_str, duration_str = item['validTime'].split('/')
-                start_time = datetime.fromisoformat(time_str)
-                duration = isodate.parse_duration(duration_str)
-                end_time = start_time + duration
+            # Formatting
+            if unit_override:
+                unit = unit_override
+            elif 'degC' in uom:
+                val = (val * 9/5) + 32
+                unit = "°F"
+            elif 'percent' in uom:
+                unit = "%"
+            elif 'km_h' in uom:
+                val = val * 0.621371
+                unit = "mph"
+            else:
+                unit = uom
                 
-                if start_time <= now < end_time:
-                    val = item['value']
-                    if val is None: return
-                    
-                    # Formatting
-                    if unit_override:
-                        unit = unit_override
-                    elif 'degC' in uom:
-                        val = (val * 9/5) + 32
-                        unit = "°F"
-                    elif 'percent' in uom:
-                        unit = "%"
-                    elif 'km_h' in uom:
-                        val = val * 0.621371
-                        unit = "mph"
-                    else:
-                        unit = uom
-                        
-                    conditions.append(f"- {label}: {round(val, 1)} {unit}")
-                    return
+            conditions.append(f"- {label}: {round(val, 1)} {unit}")
 
         get_val('temperature', 'Temperature')
         get_val('relativeHumidity', 'Humidity')
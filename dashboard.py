@@ -1,17 +1,23 @@
-from dash import Dash, html, dcc, callback, Output, Input, State, ctx, ALL
+from dash import Dash, html, dcc, callback, Output, Input, State, ctx, ALL, Patch, no_update
 import plotly.express as px
+import plotly.io as pio
 import plotly.graph_objects as go
 import pandas as pd
-import requests
-import json
-import isodate
 from datetime import datetime, timedelta, timezone
 import sys
 import os
 
 # Add chatbot_forecast to path to import services
 sys.path.append(os.path.join(os.path.dirname(__file__), 'chatbot_forecast'))
-from services.weather_service import WeatherService
+from services.weather_service import WeatherService, CHAT_GRID_LAYERS
+from services.cache import TTLCache
+from services.figure_cache import FigureCache
+from services.grid_index import get_grid_index
+from services.hourly_frame import normalize_hourly
+from services.result_store import ResultStore
+from services.forecast_archive import default_archive
+from services.prefetch import Prefetcher, parse_watch_list, NWS_WATCH_LIST
+from services.valid_time import parse_valid_time
 from services.llm_service import LLMService
 from components.chat_ui import create_message_bubble
 import config
@@ -20,8 +26,28 @@ import config
 # Initialize Dash App
 app = Dash(__name__, title="NextWeather Dashboard", suppress_callback_exceptions=True)
 
+# Gridpoint layers the dashboard plots, exports, or feeds to the chatbot.
+# Grid payloads are stream-parsed down to these; everything else is skipped.
+GRID_LAYERS = sorted(set(CHAT_GRID_LAYERS) | {
+    'temperature', 'dewpoint', 'maxTemperature', 'minTemperature', 'relativeHumidity',
+    'apparentTemperature', 'heatIndex', 'windChill', 'skyCover', 'windDirection',
+    'windSpeed', 'windGust', 'quantitativePrecipitation', 'probabilityOfPrecipitation',
+    'probabilityOfThunder', 'hazards',
+})
+
 # Initialize Chatbot Services
-weather_service = WeatherService(config.NWS_USER_AGENT)
+# Fetched grids are also archived to Parquet when NWS_FORECAST_ARCHIVE is set
+weather_service = WeatherService(grid_layers=GRID_LAYERS, archive=default_archive())
+result_store = ResultStore()
+# Keeps the NWS_WATCH_LIST locations warm in weather_service's cache, so
+# fetches for them are served without a network wait
+prefetcher = Prefetcher(weather_service, parse_watch_list(NWS_WATCH_LIST))
+
+@app.server.before_request
+def start_prefetcher():
+    # Started by the first request, so it runs under any WSGI server (one per
+    # worker) but never in the debug reloader's watcher process, which serves none
+    prefetcher.start()
 try:
     llm_service = LLMService(config.GEMINI_API_KEY)
 except ValueError as e:
@@ -38,6 +64,19 @@ app.index_string = '''
         {%favicon%}
         {%css%}
         <style>
+            /* KPI Card - themed in CSS so a theme toggle doesn't re-render the cards */
+            body:not(.dark-mode) .kpi-card {
+                background-color: #ffffff;
+                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+                color: #333333;
+            }
+            
+            body.dark-mode .kpi-card {
+                background-color: #242526;
+                box-shadow: 0 2px 4px rgba(0,0,0,0.5);
+                color: #e0e0e0;
+            }
+            
             /* KPI Card Hover - Light Mode */
             body:not(.dark-mode) .kpi-card:hover {
                 background-color: #f0f8ff !important;
@@ -278,6 +317,45 @@ DARK_THEME = {
     'tab_selected': {'borderTop': '1px solid #333', 'borderBottom': '1px solid #333', 'backgroundColor': '#18191a', 'color': '#2e89ff', 'padding': '6px'}
 }
 
+# Graphs on each tab of main-tabs, in layout order; figures are built per tab
+TAB_GRAPHS = {
+    '24h': ['graph-24h-temp', 'graph-24h-wind', 'graph-24h-pop'],
+    'temp': ['graph-temp', 'graph-wind', 'graph-dew', 'graph-hum'],
+    'precip': ['graph-pop', 'graph-sky', 'graph-qpf', 'graph-thunder'],
+    'grid': ['graph-gust', 'graph-app-temp'],
+    'hazards': ['graph-hazards'],
+}
+GRAPH_IDS = [graph_id for graphs in TAB_GRAPHS.values() for graph_id in graphs]
+DEFAULT_TAB = '24h'
+
+# After serving stale data, check for the background refresh this often, for up to a minute
+REFRESH_POLL_MS = 2000
+REFRESH_POLL_LIMIT = 30
+
+KPI_PARAMS = [
+    ('Temperature', 'temperature'),
+    ('Dewpoint', 'dewpoint'),
+    ('Max Temp', 'maxTemperature'),
+    ('Min Temp', 'minTemperature'),
+    ('Humidity', 'relativeHumidity'),
+    ('Apparent Temp', 'apparentTemperature'),
+    ('Heat Index', 'heatIndex'),
+    ('Wind Chill', 'windChill'),
+    ('Sky Cover', 'skyCover'),
+    ('Wind Direction', 'windDirection'),
+    ('Wind Speed', 'windSpeed'),
+    ('Wind Gust', 'windGust')
+]
+
+# Plotly templates as JSON, so theming a cached figure is a dict swap
+PLOTLY_TEMPLATES = {name: pio.templates[name].to_plotly_json() for name in ('plotly', 'plotly_dark')}
+
+# Parsed KPIs and hourly frames keyed by (data token, part), and figures keyed by
+# (data token, graph id, theme). They depend on the current hour (24h window,
+# current conditions), so they are rebuilt after 15 minutes.
+render_cache = TTLCache(maxsize=32, default_ttl=900)
+figure_cache = FigureCache(maxsize=512, ttl=900)
+
 # --- Helper to wrap graphs in cards ---
 def graph_card(graph_id, width='45%'):
     return html.Div(
@@ -330,6 +408,8 @@ app.layout = html.Div(id='main-container', children=[
     
     # Error Message
     html.Div(id='error-message', style={'color': 'red', 'textAlign': 'center', 'marginBottom': '10px'}),
+    # Shown while stale data is on screen and a refresh is running
+    html.Div(id='data-status', style={'color': '#b8860b', 'textAlign': 'center', 'marginBottom': '10px'}),
     
     # Loading Spinner
     dcc.Loading(
@@ -349,15 +429,15 @@ app.layout = html.Div(id='main-container', children=[
             }),
             
             # Tabs
-            dcc.Tabs(id='main-tabs', children=[
-                dcc.Tab(id='tab-24h', label='Next 24 Hours', children=[
+            dcc.Tabs(id='main-tabs', value=DEFAULT_TAB, children=[
+                dcc.Tab(id='tab-24h', value='24h', label='Next 24 Hours', children=[
                     html.Div([
                         graph_card('graph-24h-temp', width='98%'),
                         graph_card('graph-24h-wind'),
                         graph_card('graph-24h-pop'),
                     ], style={'padding': '20px', 'textAlign': 'center'}),
                 ]),
-                dcc.Tab(id='tab-temp', label='Temperature & Wind (Full)', children=[
+                dcc.Tab(id='tab-temp', value='temp', label='Temperature & Wind (Full)', children=[
                     html.Div([
                         graph_card('graph-temp'),
                         graph_card('graph-wind'),
@@ -365,7 +445,7 @@ app.layout = html.Div(id='main-container', children=[
                         graph_card('graph-hum'),
                     ], style={'padding': '20px', 'textAlign': 'center'}),
                 ]),
-                dcc.Tab(id='tab-precip', label='Precipitation & Sky (Full)', children=[
+                dcc.Tab(id='tab-precip', value='precip', label='Precipitation & Sky (Full)', children=[
                     html.Div([
                         graph_card('graph-pop'),
                         graph_card('graph-sky'),
@@ -373,13 +453,13 @@ app.layout = html.Div(id='main-container', children=[
                         graph_card('graph-thunder'),
                     ], style={'padding': '20px', 'textAlign': 'center'}),
                 ]),
-                dcc.Tab(id='tab-grid', label='Grid Metrics (Full)', children=[
+                dcc.Tab(id='tab-grid', value='grid', label='Grid Metrics (Full)', children=[
                     html.Div([
                         graph_card('graph-gust'),
                         graph_card('graph-app-temp'),
                     ], style={'padding': '20px', 'textAlign': 'center'}),
                 ]),
-                dcc.Tab(id='tab-hazards', label='Hazards', children=[
+                dcc.Tab(id='tab-hazards', value='hazards', label='Hazards', children=[
                     html.Div([
                         graph_card('graph-hazards', width='98%'),
                     ], style={'padding': '20px', 'textAlign': 'center'}),
@@ -401,10 +481,10 @@ app.layout = html.Div(id='main-container', children=[
         ])
     ),
     
-    # Store for data sharing
-    dcc.Store(id='store-forecast'),
-    dcc.Store(id='store-hourly'),
-    dcc.Store(id='store-grid'),
+    # Token for the fetched payloads, which live server-side in result_store
+    dcc.Store(id='store-token'),
+    # Polls for the background refresh after stale data was served
+    dcc.Interval(id='refresh-poll', interval=REFRESH_POLL_MS, max_intervals=REFRESH_POLL_LIMIT, disabled=True),
     
     # Hidden checklist for theme compatibility
     dcc.Checklist(id='theme-toggle', options=[], value=[], style={'display': 'none'}),
@@ -509,64 +589,212 @@ app.clientside_callback(
 
 # --- Helper Functions ---
 def get_weather_data(lat, lon):
-    headers = {"User-Agent": "(nextweather-dashboard, contact@example.com)"}
-    try:
-        points_url = f"https://api.weather.gov/points/{lat},{lon}"
-        points_resp = requests.get(points_url, headers=headers)
-        points_resp.raise_for_status()
-        props = points_resp.json()['properties']
-        
-        return {
-            "forecast": requests.get(props['forecast'], headers=headers).json(),
-            "hourly": requests.get(props['forecastHourly'], headers=headers).json(),
-            "grid": requests.get(props['forecastGridData'], headers=headers).json()
-        }
-    except Exception as e:
-        return {"error": str(e)}
+    # Shares the chatbot's TTL cache, so dashboard and chat fetches reuse each other's data.
+    # Expired data is served at once (marked stale) while it is refreshed in the background.
+    return weather_service.get_weather_data(lat, lon, allow_stale=True)
+
+def stale_notice(data):
+    minutes = int(data.get('age', 0) // 60)
+    return f"Showing data from {minutes} min ago while it refreshes..."
+
+def expired_notice(token):
+    # The token outlived its stored result (evicted, a restart, or another worker's store)
+    if token and result_store.get(token) is None:
+        return "This forecast is no longer available on the server. Please search again."
+    return None
+
+def store_payload(data):
+    # Just the products; the stale/age markers aren't part of the stored result
+    return {product: data[product] for product in ('forecast', 'hourly', 'grid')}
 
 def process_hourly(data):
-    df = pd.DataFrame(data['properties']['periods'])
-    df['startTime'] = pd.to_datetime(df['startTime'])
-    return df
+    # Typed frame with pop_val, dewpoint_f, humidity_val, wind_speed_val etc. precomputed
+    return normalize_hourly(data)
 
 def get_current_grid_value(grid_data, parameter):
-    """Parses Grid Data to find the value for the current UTC time."""
-    if parameter not in grid_data['properties']:
-        return None, None
-        
-    now = datetime.now(timezone.utc)
-    values = grid_data['properties'][parameter]['values']
-    uom = grid_data['properties'][parameter].get('uom', '')
-    
-    for item in values:
-        # Parse validTime: "2025-11-28T14:00:00+00:00/PT1H"
-        time_str, duration_str = item['validTime'].split('/')
-        start_time = datetime.fromisoformat(time_str)
-        duration = isodate.parse_duration(duration_str)
-        end_time = start_time + duration
-        
-        if start_time <= now < end_time:
-            return item['value'], uom
-            
-    return None, None
+    """Looks up the value for the current UTC time via the compiled grid index (binary search)."""
+    return get_grid_index(grid_data).value_at(parameter)
 
-def create_kpi_card(label, value, unit, theme):
+def create_kpi_card(label, value, unit):
     display_val = f"{value} {unit}" if value is not None else "N/A"
     display_val = display_val.replace("wmoUnit:degC", "°C").replace("wmoUnit:percent", "%").replace("wmoUnit:degree_(angle)", "°").replace("wmoUnit:km_h-1", "km/h")
     
+    # Colors come from the .kpi-card CSS rules, so the cards don't change with the theme
     return html.Div([
-        html.H4(label, style={'margin': '0', 'fontSize': '14px', 'color': theme['text'], 'opacity': 0.7}),
-        html.H2(display_val, style={'margin': '5px 0', 'fontSize': '24px', 'color': theme['text']}),
-    ], className='kpi-card', style={'backgroundColor': theme['card_bg'], 'padding': '15px', 'borderRadius': '8px', 'boxShadow': theme['shadow'], 'transition': 'background-color 0.3s'})
+        html.H4(label, style={'margin': '0', 'fontSize': '14px', 'opacity': 0.7}),
+        html.H2(display_val, style={'margin': '5px 0', 'fontSize': '24px'}),
+    ], className='kpi-card', style={'padding': '15px', 'borderRadius': '8px', 'transition': 'background-color 0.3s'})
+
+def themed_figure(fig, theme):
+    """Returns a cached (theme-neutral) figure with the theme's Plotly template applied."""
+    if not fig:
+        return fig
+    return {**fig, 'layout': {**fig['layout'], 'template': PLOTLY_TEMPLATES[theme['plotly_template']]}}
+
+def build_kpis(grid_data):
+    """Current value of each KPI parameter as (label, value, unit)."""
+    kpis = []
+    for label, param in KPI_PARAMS:
+        val, unit = get_current_grid_value(grid_data, param)
+        if isinstance(val, (int, float)):
+            val = round(val, 1)
+        kpis.append((label, val, unit))
+    return kpis
+
+def create_fig(fig_obj):
+    """Applies the shared layout and returns theme-neutral Plotly JSON."""
+    fig_obj.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)', 
+        plot_bgcolor='rgba(0,0,0,0)',
+        margin=dict(l=40, r=20, t=40, b=40)
+    )
+    fig_json = fig_obj.to_plotly_json()
+    # The template is applied per theme by themed_figure
+    fig_json['layout'].pop('template', None)
+    return fig_json
+
+def build_24h_figures(hourly_df, grid_data):
+    now = datetime.now(timezone.utc)
+    df_24h = hourly_df[hourly_df['startTime'] >= now].head(24)
+    
+    fig_24h_temp = create_fig(px.line(df_24h, x='startTime', y='temperature', title="Temperature (Next 24h)", markers=True))
+    fig_24h_wind = create_fig(px.line(df_24h, x='startTime', y='wind_speed_val', title="Wind Speed (Next 24h)", markers=True))
+    fig_24h_pop = create_fig(px.bar(df_24h, x='startTime', y='pop_val', title="Precipitation Probability (Next 24h)"))
+    return {'graph-24h-temp': fig_24h_temp, 'graph-24h-wind': fig_24h_wind, 'graph-24h-pop': fig_24h_pop}
+
+def build_temp_figures(hourly_df, grid_data):
+    fig_temp = create_fig(px.line(hourly_df, x='startTime', y='temperature', title="Hourly Temperature (°F)"))
+    fig_wind = create_fig(px.line(hourly_df, x='startTime', y='wind_speed_val', title="Wind Speed (mph)"))
+    fig_dew = create_fig(px.line(hourly_df, x='startTime', y='dewpoint_f', title="Dewpoint (°F)"))
+    fig_hum = create_fig(px.area(hourly_df, x='startTime', y='humidity_val', title="Relative Humidity (%)"))
+    return {'graph-temp': fig_temp, 'graph-wind': fig_wind, 'graph-dew': fig_dew, 'graph-hum': fig_hum}
+
+def build_precip_figures(hourly_df, grid_data):
+    grid_props = grid_data['properties']
+    fig_pop = create_fig(px.bar(hourly_df, x='startTime', y='pop_val', title="Precipitation Probability (%)"))
+    
+    sky_data = [{'time': i['validTime'].split('/')[0], 'value': i['value']} for i in grid_props.get('skyCover', {}).get('values', [])]
+    df_sky = pd.DataFrame(sky_data)
+    fig_sky = create_fig(px.area(df_sky, x='time', y='value', title="Sky Cover (%)")) if not df_sky.empty else {}
+
+    qpf_data = [{'time': i['validTime'].split('/')[0], 'value': i['value']} for i in grid_props.get('quantitativePrecipitation', {}).get('values', [])]
+    df_qpf = pd.DataFrame(qpf_data)
+    fig_qpf = create_fig(px.bar(df_qpf, x='time', y='value', title="Quantitative Precipitation (mm)")) if not df_qpf.empty else {}
+    
+    thunder_data = [{'time': i['validTime'].split('/')[0], 'value': i['value']} for i in grid_props.get('probabilityOfThunder', {}).get('values', [])]
+    df_thunder = pd.DataFrame(thunder_data)
+    if not df_thunder.empty:
+        cat_map = {0: "None (<15%)", 1: "Slight (15-24%)", 2: "Chance (25-54%)", 3: "Likely (55-74%)", 4: "Definite (≥75%)"}
+        df_thunder['category'] = df_thunder['value'].map(cat_map)
+        fig_thunder = create_fig(px.bar(df_thunder, x='time', y='value', color='category', title="Thunderstorm Probability"))
+    else:
+        fig_thunder = {}
+    return {'graph-pop': fig_pop, 'graph-sky': fig_sky, 'graph-qpf': fig_qpf, 'graph-thunder': fig_thunder}
+
+def build_grid_figures(hourly_df, grid_data):
+    grid_props = grid_data['properties']
+    gust_data = [{'time': i['validTime'].split('/')[0], 'value': i['value']} for i in grid_props.get('windGust', {}).get('values', [])]
+    df_gust = pd.DataFrame(gust_data)
+    fig_gust = create_fig(px.line(df_gust, x='time', y='value', title="Wind Gust (Grid Data)")) if not df_gust.empty else {}
+    
+    at_data = [{'time': i['validTime'].split('/')[0], 'value': i['value']} for i in grid_props.get('apparentTemperature', {}).get('values', [])]
+    df_at = pd.DataFrame(at_data)
+    if not df_at.empty:
+        df_at['value_f'] = (df_at['value'] * 9/5) + 32
+        fig_app_temp = create_fig(px.line(df_at, x='time', y='value_f', title="Apparent Temperature (°F)"))
+    else:
+        fig_app_temp = {}
+    return {'graph-gust': fig_gust, 'graph-app-temp': fig_app_temp}
+
+def build_hazards_figures(hourly_df, grid_data):
+    hazard_data = []
+    for item in grid_data['properties'].get('hazards', {}).get('values', []):
+        start, end = parse_valid_time(item['validTime'])
+        for val in item['value']:
+            label = f"{val.get('phenomenon', 'Unknown')} ({val.get('significance', '')})"
+            hazard_data.append({
+                'Start': start,
+                'End': end,
+                'Hazard': label,
+                'Details': f"Event #{val.get('event_number')}"
+            })
+    
+    if hazard_data:
+        fig = px.timeline(pd.DataFrame(hazard_data), x_start="Start", x_end="End", y="Hazard", color="Hazard", title="Active Weather Hazards")
+        fig.update_yaxes(autorange="reversed")
+    else:
+        fig = go.Figure()
+        fig.update_layout(
+            xaxis={'visible': False}, yaxis={'visible': False},
+            annotations=[{'text': "No Active Hazards Found", 'xref': "paper", 'yref': "paper", 'showarrow': False, 'font': {'size': 20}}]
+        )
+    return {'graph-hazards': create_fig(fig)}
+
+TAB_BUILDERS = {
+    '24h': build_24h_figures,
+    'temp': build_temp_figures,
+    'precip': build_precip_figures,
+    'grid': build_grid_figures,
+    'hazards': build_hazards_figures,
+}
+
+def _load_result(token):
+    result = result_store.get(token) or {}
+    if not result.get('forecast') or not result.get('hourly') or not result.get('grid'):
+        return None
+    return result
+
+def render_kpis(token):
+    """Current-conditions KPIs for a data token, computed once and reused until they age out."""
+    kpis = render_cache.get((token, 'kpis')) if token else None
+    if kpis is None:
+        result = _load_result(token)
+        if result is None:
+            return None
+        kpis = build_kpis(result['grid'])
+        render_cache.set((token, 'kpis'), kpis)
+    return kpis
+
+def render_hourly(token, result):
+    """The normalized hourly frame for a data token, shared by every tab that plots it."""
+    hourly_df = render_cache.get((token, 'hourly'))
+    if hourly_df is None:
+        hourly_df = process_hourly(result['hourly'])
+        render_cache.set((token, 'hourly'), hourly_df)
+    return hourly_df
+
+def render_tab(token, tab, theme):
+    """Figures for one tab of a data token in `theme`, built on first view and then served from figure_cache."""
+    if not token:
+        return None
+    theme_name = theme['plotly_template']
+    graph_ids = TAB_GRAPHS[tab]
+    themed = [figure_cache.get(token, graph_id, theme_name) for graph_id in graph_ids]
+    if None not in themed:
+        return dict(zip(graph_ids, themed))
+
+    # Theme-neutral figures (theme None) are built once and themed per theme
+    neutral = [figure_cache.get(token, graph_id) for graph_id in graph_ids]
+    if None in neutral:
+        result = _load_result(token)
+        if result is None:
+            return None
+        built = TAB_BUILDERS[tab](render_hourly(token, result), result['grid'])
+        neutral = [figure_cache.set(token, graph_id, None, built[graph_id]) for graph_id in graph_ids]
+    return {
+        graph_id: figure_cache.set(token, graph_id, theme_name, themed_figure(fig, theme))
+        for graph_id, fig in zip(graph_ids, neutral)
+    }
 
 # --- Callbacks ---
 
 # 1. Data Fetching Callback
 @callback(
-    [Output('store-forecast', 'data'),
-     Output('store-hourly', 'data'),
-     Output('store-grid', 'data'),
-     Output('error-message', 'children')],
+    [Output('store-token', 'data'),
+     Output('error-message', 'children'),
+     Output('data-status', 'children'),
+     Output('refresh-poll', 'disabled'),
+     Output('refresh-poll', 'n_intervals')],
     Input('fetch-btn', 'n_clicks'),
     [State('lat-input', 'value'),
      State('lon-input', 'value')],
@@ -574,57 +802,104 @@ def create_kpi_card(label, value, unit, theme):
 )
 def fetch_data(n_clicks, lat, lon):
     if not n_clicks:
-        return None, None, None, ""
+        return None, "", "", True, 0
     
     data = get_weather_data(lat, lon)
     
     if "error" in data:
-        return None, None, None, f"Error: {data['error']}"
-        
-    return data['forecast'], data['hourly'], data['grid'], ""
+        return None, f"Error: {data['error']}", "", True, 0
+    
+    # Keep the payloads server-side; the browser only holds the token
+    token = result_store.put({'lat': lat, 'lon': lon, **store_payload(data)})
+    if data.get('stale'):
+        return token, "", stale_notice(data), False, 0
+    return token, "", "", True, 0
+
+# 1b. Swaps in the fresh data once a background refresh of stale data lands
+@callback(
+    [Output('store-token', 'data', allow_duplicate=True),
+     Output('data-status', 'children', allow_duplicate=True),
+     Output('refresh-poll', 'disabled', allow_duplicate=True)],
+    Input('refresh-poll', 'n_intervals'),
+    State('store-token', 'data'),
+    prevent_initial_call=True
+)
+def poll_refresh(n_intervals, token):
+    result = result_store.get(token) if token else None
+    if result is None:
+        return no_update, expired_notice(token) or "", True
+    lat, lon = result['lat'], result['lon']
+    if weather_service.is_refreshing(lat, lon):
+        if n_intervals >= REFRESH_POLL_LIMIT:
+            return no_update, "Refresh is taking longer than usual; showing the last good data.", True
+        return no_update, no_update, no_update
+
+    data = weather_service.get_weather_data(lat, lon, allow_stale=True)
+    if "error" in data or data.get('stale'):
+        # The refresh failed; keep what is on screen
+        return no_update, "Couldn't refresh; showing the last good data.", True
+    return result_store.put({'lat': lat, 'lon': lon, **store_payload(data)}), "", True
+
+# 2. Data Rendering Callback: only the active tab's figures are built (once per token)
+@callback(
+    [Output('dashboard-content', 'style'),
+     # Grid KPIs
+     Output('grid-kpis-container', 'children'),
+     # 24h, Full and Hazards Graphs
+     *[Output(graph_id, 'figure') for graph_id in GRAPH_IDS],
+     Output('error-message', 'children', allow_duplicate=True)],
+    [Input('store-token', 'data'),
+     Input('main-tabs', 'value')],
+    State('theme-toggle', 'value'),
+    prevent_initial_call=True
+)
+def update_display(token, active_tab, theme_value):
+    expired = expired_notice(token)
+    kpis = None if expired else render_kpis(token)
+    if kpis is None:
+        # Return empty/hidden content if no data, saying why if the data has expired
+        return [{'display': 'none'}, []] + [{}] * len(GRAPH_IDS) + [expired or no_update]
+
+    active_tab = active_tab if active_tab in TAB_GRAPHS else DEFAULT_TAB
+    theme = DARK_THEME if 'dark' in (theme_value or []) else LIGHT_THEME
+    figures = render_tab(token, active_tab, theme) or {}
+    tab_changed = ctx.triggered_id == 'main-tabs'
+
+    outputs = []
+    for graph_id in GRAPH_IDS:
+        if graph_id in figures:
+            outputs.append(figures[graph_id])
+        elif tab_changed:
+            # Hidden tabs keep what they already show for this token
+            outputs.append(no_update)
+        else:
+            # New data: clear hidden tabs; they render when selected
+            outputs.append({})
 
-# 2. Rendering & Theme Callback
+    if tab_changed:
+        return [no_update, no_update] + outputs + [no_update]
+    kpi_cards = [create_kpi_card(label, val, unit) for label, val, unit in kpis]
+    return [{'display': 'block'}, kpi_cards] + outputs + [no_update]
+
+# 3. Theme Callbacks: only styles and figure templates change, no data is re-processed
 @callback(
     [Output('main-container', 'style'),
      Output('controls-container', 'style'),
      Output('downloads-container', 'style'),
-     Output('dashboard-content', 'style'),
      # Tabs Styles
      Output('tab-24h', 'style'), Output('tab-24h', 'selected_style'),
      Output('tab-temp', 'style'), Output('tab-temp', 'selected_style'),
      Output('tab-precip', 'style'), Output('tab-precip', 'selected_style'),
      Output('tab-grid', 'style'), Output('tab-grid', 'selected_style'),
      Output('tab-hazards', 'style'), Output('tab-hazards', 'selected_style'),
-     # Grid KPIs
-     Output('grid-kpis-container', 'children'),
      # Graph Cards Style (Pattern Matching)
-     Output({'type': 'graph-card', 'index': ALL}, 'style'),
-     # 24h Graphs
-     Output('graph-24h-temp', 'figure'),
-     Output('graph-24h-wind', 'figure'),
-     Output('graph-24h-pop', 'figure'),
-     # Full Graphs
-     Output('graph-temp', 'figure'),
-     Output('graph-wind', 'figure'),
-     Output('graph-dew', 'figure'),
-     Output('graph-hum', 'figure'),
-     Output('graph-pop', 'figure'),
-     Output('graph-sky', 'figure'),
-     Output('graph-qpf', 'figure'),
-     Output('graph-thunder', 'figure'),
-     Output('graph-gust', 'figure'),
-     Output('graph-app-temp', 'figure'),
-     # Hazards
-     Output('graph-hazards', 'figure')],
-    [Input('store-forecast', 'data'),
-     Input('store-hourly', 'data'),
-     Input('store-grid', 'data'),
-     Input('theme-toggle', 'value'),
-     State({'type': 'graph-card', 'index': ALL}, 'style')]
+     Output({'type': 'graph-card', 'index': ALL}, 'style')],
+    Input('theme-toggle', 'value'),
+    State({'type': 'graph-card', 'index': ALL}, 'style')
 )
-def update_display(forecast_data, hourly_data, grid_data, theme_value, current_card_styles):
+def update_theme(theme_value, current_card_styles):
     # Determine Theme
-    is_dark = 'dark' in theme_value
+    is_dark = 'dark' in (theme_value or [])
     theme = DARK_THEME if is_dark else LIGHT_THEME
     
     # Base Styles
@@ -636,24 +911,10 @@ def update_display(forecast_data, hourly_data, grid_data, theme_value, current_c
     t_style = theme['tab']
     t_sel_style = theme['tab_selected']
     
-    # Graph Card Styles
-    # We need to return a list of styles matching the number of graph cards found by ALL
-    # If current_card_styles is None or empty, we can't know exactly how many there are yet, 
-    # but Dash will handle the length mismatch if we are careful or if we just return the right number based on our known layout.
-    # However, 'ALL' outputs expect a list of the same length as the inputs.
-    # Since we defined 14 graph cards in the layout, we should return 14 style dicts.
-    # But to be safe and dynamic, we can construct the style based on the theme.
-    
+    # Graph Card Styles: keep each card's layout properties (e.g. width) from
+    # State and only update the theme-related ones.
     base_card_style = {'display': 'inline-block', 'verticalAlign': 'top', 'margin': '10px', 'borderRadius': '8px', 'padding': '10px', 'backgroundColor': theme['card_bg'], 'boxShadow': theme['shadow'], 'transition': 'background-color 0.3s'}
     
-    # We know we have 14 graphs. But 'current_card_styles' will tell us how many exist in the DOM.
-    # If it's the first callback, they might exist.
-    num_cards = len(current_card_styles) if current_card_styles else 14
-    
-    # We need to preserve the 'width' from the original style if possible, or just re-apply the theme parts.
-    # Actually, it's safer to just update the theme-related properties and keep the layout properties.
-    # But 'current_card_styles' comes from State, so it has the current values.
-    
     new_card_styles = []
     if current_card_styles:
         for style in current_card_styles:
@@ -665,190 +926,83 @@ def update_display(forecast_data, hourly_data, grid_data, theme_value, current_c
             })
             new_card_styles.append(new_style)
     else:
-        # Fallback if state is empty (initial load might be tricky with ALL)
-        # We will just return a list of 14 default styles, but we lose the custom widths.
-        # Ideally, we should define the width in the layout and NOT overwrite it here.
-        # If we update 'style', we overwrite everything unless we merge.
-        # Since we can't easily merge with 'ALL' output without State, using State is the right way.
-        # If State is empty, we might be in trouble. 
-        # Let's assume State is populated because the components exist in the layout.
-        new_card_styles = [base_card_style] * 14
-
-    if not forecast_data or not hourly_data or not grid_data:
-        # Return empty/hidden content if no data
-        return main_style, controls_style, downloads_style, {'display': 'none'}, \
-               t_style, t_sel_style, t_style, t_sel_style, t_style, t_sel_style, t_style, t_sel_style, t_style, t_sel_style, \
-               [], new_card_styles, {}, {}, {}, {}, {}, {}, {}, {}, {}, {}, {}, {}, {}, {}
-
-    # Process Data
-    hourly_df = process_hourly(hourly_data)
-    grid_props = grid_data['properties']
-    
-    # --- 1. Grid KPIs ---
-    kpi_params = [
-        ('Temperature', 'temperature'),
-        ('Dewpoint', 'dewpoint'),
-        ('Max Temp', 'maxTemperature'),
-        ('Min Temp', 'minTemperature'),
-        ('Humidity', 'relativeHumidity'),
-        ('Apparent Temp', 'apparentTemperature'),
-        ('Heat Index', 'heatIndex'),
-        ('Wind Chill', 'windChill'),
-        ('Sky Cover', 'skyCover'),
-        ('Wind Direction', 'windDirection'),
-        ('Wind Speed', 'windSpeed'),
-        ('Wind Gust', 'windGust')
-    ]
-    
-    kpi_cards = []
-    for label, param in kpi_params:
-        val, unit = get_current_grid_value(grid_data, param)
-        if isinstance(val, (int, float)):
-            val = round(val, 1)
-        kpi_cards.append(create_kpi_card(label, val, unit, theme))
-        
-    # --- Helper for Graphs ---
-    def create_fig(fig_obj):
-        fig_obj.update_layout(
-            template=theme['plotly_template'], 
-            paper_bgcolor='rgba(0,0,0,0)', 
-            plot_bgcolor='rgba(0,0,0,0)',
-            margin=dict(l=40, r=20, t=40, b=40)
-        )
-        return fig_obj
-
-    # --- 2. 24h Graphs ---
-    now = datetime.now(timezone.utc)
-    df_24h = hourly_df[hourly_df['startTime'] >= now].head(24)
-    
-    fig_24h_temp = create_fig(px.line(df_24h, x='startTime', y='temperature', title="Temperature (Next 24h)", markers=True))
-    
-    df_24h['wind_speed_val'] = df_24h['windSpeed'].str.extract(r'(\d+)').astype(float)
-    fig_24h_wind = create_fig(px.line(df_24h, x='startTime', y='wind_speed_val', title="Wind Speed (Next 24h)", markers=True))
-    
-    df_24h['pop_val'] = df_24h['probabilityOfPrecipitation'].apply(lambda x: x['value'] if x else 0)
-    fig_24h_pop = create_fig(px.bar(df_24h, x='startTime', y='pop_val', title="Precipitation Probability (Next 24h)"))
-
-    # --- 3. Full Graphs ---
-    fig_temp = create_fig(px.line(hourly_df, x='startTime', y='temperature', title="Hourly Temperature (°F)"))
-    
-    hourly_df['wind_speed_val'] = hourly_df['windSpeed'].str.extract(r'(\d+)').astype(float)
-    fig_wind = create_fig(px.line(hourly_df, x='startTime', y='wind_speed_val', title="Wind Speed (mph)"))
-    
-    hourly_df['dewpoint_val'] = hourly_df['dewpoint'].apply(lambda x: x['value'] if x else None)
-    hourly_df['dewpoint_f'] = (hourly_df['dewpoint_val'] * 9/5) + 32
-    fig_dew = create_fig(px.line(hourly_df, x='startTime', y='dewpoint_f', title="Dewpoint (°F)"))
-    
-    hourly_df['humidity_val'] = hourly_df['relativeHumidity'].apply(lambda x: x['value'] if x else None)
-    fig_hum = create_fig(px.area(hourly_df, x='startTime', y='humidity_val', title="Relative Humidity (%)"))
-    
-    hourly_df['pop_val'] = hourly_df['probabilityOfPrecipitation'].apply(lambda x: x['value'] if x else 0)
-    fig_pop = create_fig(px.bar(hourly_df, x='startTime', y='pop_val', title="Precipitation Probability (%)"))
-    
-    sky_data = [{'time': i['validTime'].split('/')[0], 'value': i['value']} for i in grid_props.get('skyCover', {}).get('values', [])]
-    df_sky = pd.DataFrame(sky_data)
-    fig_sky = create_fig(px.area(df_sky, x='time', y='value', title="Sky Cover (%)") if not df_sky.empty else {})
+        # Fallback if state is empty; we lose the custom widths.
+        new_card_styles = [base_card_style] * len(GRAPH_IDS)
 
-    qpf_data = [{'time': i['validTime'].split('/')[0], 'value': i['value']} for i in grid_props.get('quantitativePrecipitation', {}).get('values', [])]
-    df_qpf = pd.DataFrame(qpf_data)
-    fig_qpf = create_fig(px.bar(df_qpf, x='time', y='value', title="Quantitative Precipitation (mm)") if not df_qpf.empty else {})
-    
-    thunder_data = [{'time': i['validTime'].split('/')[0], 'value': i['value']} for i in grid_props.get('probabilityOfThunder', {}).get('values', [])]
-    df_thunder = pd.DataFrame(thunder_data)
-    if not df_thunder.empty:
-        cat_map = {0: "None (<15%)", 1: "Slight (15-24%)", 2: "Chance (25-54%)", 3: "Likely (55-74%)", 4: "Definite (≥75%)"}
-        df_thunder['category'] = df_thunder['value'].map(cat_map)
-        fig_thunder = create_fig(px.bar(df_thunder, x='time', y='value', color='category', title="Thunderstorm Probability"))
-    else:
-        fig_thunder = {}
-    
-    gust_data = [{'time': i['validTime'].split('/')[0], 'value': i['value']} for i in grid_props.get('windGust', {}).get('values', [])]
-    df_gust = pd.DataFrame(gust_data)
-    fig_gust = create_fig(px.line(df_gust, x='time', y='value', title="Wind Gust (Grid Data)") if not df_gust.empty else {})
-    
-    at_data = [{'time': i['validTime'].split('/')[0], 'value': i['value']} for i in grid_props.get('apparentTemperature', {}).get('values', [])]
-    df_at = pd.DataFrame(at_data)
-    if not df_at.empty:
-        df_at['value_f'] = (df_at['value'] * 9/5) + 32
-        fig_app_temp = create_fig(px.line(df_at, x='time', y='value_f', title="Apparent Temperature (°F)"))
-    else:
-        fig_app_temp = {}
+    return main_style, controls_style, downloads_style, \
+           t_style, t_sel_style, t_style, t_sel_style, t_style, t_sel_style, t_style, t_sel_style, t_style, t_sel_style, \
+           new_card_styles
 
-    # --- 4. Hazards (Timeline) ---
-    hazards_vals = grid_props.get('hazards', {}).get('values', [])
-    if hazards_vals:
-        hazard_data = []
-        for item in hazards_vals:
-            time_str, duration_str = item['validTime'].split('/')
-            start = datetime.fromisoformat(time_str)
-            duration = isodate.parse_duration(duration_str)
-            end = start + duration
-            
-            vals_list = item['value']
-            for val in vals_list:
-                label = f"{val.get('phenomenon', 'Unknown')} ({val.get('significance', '')})"
-                hazard_data.append({
-                    'Start': start,
-                    'End': end,
-                    'Hazard': label,
-                    'Details': f"Event #{val.get('event_number')}"
-                })
-            
-        df_hazards = pd.DataFrame(hazard_data)
-        
-        if not df_hazards.empty:
-            fig_hazards = create_fig(px.timeline(df_hazards, x_start="Start", x_end="End", y="Hazard", color="Hazard", title="Active Weather Hazards"))
-            fig_hazards.update_yaxes(autorange="reversed")
-        else:
-            fig_hazards = create_fig(go.Figure())
-            fig_hazards.update_layout(
-                xaxis={'visible': False}, yaxis={'visible': False},
-                annotations=[{'text': "No Active Hazards Found", 'xref': "paper", 'yref': "paper", 'showarrow': False, 'font': {'size': 20, 'color': theme['text']}}]
-            )
-    else:
-        fig_hazards = create_fig(go.Figure())
-        fig_hazards.update_layout(
-            xaxis={'visible': False}, yaxis={'visible': False},
-            annotations=[{'text': "No Active Hazards Found", 'xref': "paper", 'yref': "paper", 'showarrow': False, 'font': {'size': 20, 'color': theme['text']}}]
-        )
+@callback(
+    [Output(graph_id, 'figure', allow_duplicate=True) for graph_id in GRAPH_IDS],
+    Input('theme-toggle', 'value'),
+    [State('store-token', 'data'),
+     State('main-tabs', 'value')],
+    prevent_initial_call=True
+)
+def update_figure_theme(theme_value, token, active_tab):
+    """Swaps the template on the active tab's figures in place; their data is never resent.
 
-    return main_style, controls_style, downloads_style, {'display': 'block'}, \
-           t_style, t_sel_style, t_style, t_sel_style, t_style, t_sel_style, t_style, t_sel_style, t_style, t_sel_style, \
-           kpi_cards, new_card_styles, \
-           fig_24h_temp, fig_24h_wind, fig_24h_pop, \
-           fig_temp, fig_wind, fig_dew, fig_hum, fig_pop, fig_sky, fig_qpf, fig_thunder, fig_gust, fig_app_temp, fig_hazards
+    Other tabs are left alone: update_display re-serves a tab's figures in the
+    current theme whenever it is selected, so unbuilt ({}) figures stay empty.
+    """
+    if not token or expired_notice(token):
+        return [no_update] * len(GRAPH_IDS)
+    active_tab = active_tab if active_tab in TAB_GRAPHS else DEFAULT_TAB
+    theme = DARK_THEME if 'dark' in (theme_value or []) else LIGHT_THEME
+    patches = []
+    for graph_id in GRAPH_IDS:
+        if graph_id not in TAB_GRAPHS[active_tab]:
+            patches.append(no_update)
+            continue
+        patch = Patch()
+        patch['layout']['template'] = PLOTLY_TEMPLATES[theme['plotly_template']]
+        patches.append(patch)
+    return patches
 
 # --- Download Callbacks ---
 @callback(
-    Output("download-daily", "data"),
+    [Output("download-daily", "data"),
+     Output('error-message', 'children', allow_duplicate=True)],
     Input("btn-download-daily", "n_clicks"),
-    State("store-forecast", "data"),
+    State("store-token", "data"),
     prevent_initial_call=True,
 )
-def download_daily(n_clicks, data):
-    if not data: return None
+def download_daily(n_clicks, token):
+    expired = expired_notice(token)
+    if expired: return None, expired
+    data = (result_store.get(token) or {}).get('forecast')
+    if not data: return None, no_update
     df = pd.DataFrame(data['properties']['periods'])
-    return dcc.send_data_frame(df.to_csv, "daily_forecast.csv")
+    return dcc.send_data_frame(df.to_csv, "daily_forecast.csv"), no_update
 
 @callback(
-    Output("download-hourly", "data"),
+    [Output("download-hourly", "data"),
+     Output('error-message', 'children', allow_duplicate=True)],
     Input("btn-download-hourly", "n_clicks"),
-    State("store-hourly", "data"),
+    State("store-token", "data"),
     prevent_initial_call=True,
 )
-def download_hourly(n_clicks, data):
-    if not data: return None
+def download_hourly(n_clicks, token):
+    expired = expired_notice(token)
+    if expired: return None, expired
+    data = (result_store.get(token) or {}).get('hourly')
+    if not data: return None, no_update
     df = pd.DataFrame(data['properties']['periods'])
-    return dcc.send_data_frame(df.to_csv, "hourly_forecast.csv")
+    return dcc.send_data_frame(df.to_csv, "hourly_forecast.csv"), no_update
 
 @callback(
-    Output("download-grid", "data"),
+    [Output("download-grid", "data"),
+     Output('error-message', 'children', allow_duplicate=True)],
     Input("btn-download-grid", "n_clicks"),
-    State("store-grid", "data"),
+    State("store-token", "data"),
     prevent_initial_call=True,
 )
-def download_grid(n_clicks, data):
-    if not data: return None
+def download_grid(n_clicks, token):
+    expired = expired_notice(token)
+    if expired: return None, expired
+    data = (result_store.get(token) or {}).get('grid')
+    if not data: return None, no_update
     props = data['properties']
     export = []
     for key in ['temperature', 'dewpoint', 'relativeHumidity', 'windSpeed', 'windGust', 'skyCover', 'probabilityOfPrecipitation', 'probabilityOfThunder']:
@@ -856,7 +1010,7 @@ def download_grid(n_clicks, data):
         for v in vals:
             export.append({"metric": key, "validTime": v['validTime'], "value": v['value']})
     df = pd.DataFrame(export)
-    return dcc.send_data_frame(df.to_csv, "detailed_grid_metrics.csv")
+    return dcc.send_data_frame(df.to_csv, "detailed_grid_metrics.csv"), no_update
 
 # --- Chatbot Callback ---
 @callback(
@@ -868,12 +1022,13 @@ def download_grid(n_clicks, data):
     [State('chat-input', 'value'),
      State('lat-input', 'value'),
      State('lon-input', 'value'),
-     State('chat-history', 'data')],
+     State('chat-history', 'data'),
+     State('store-token', 'data')],
     prevent_initial_call=True
 )
-def handle_chat(n_clicks, n_submit, message, lat_val, lon_val, history):
+def handle_chat(n_clicks, n_submit, message, lat_val, lon_val, history, token):
     if not message:
-        return dash.no_update, dash.no_update, dash.no_update
+        return no_update, no_update, no_update
     
     if history is None:
         history = []
@@ -889,8 +1044,11 @@ def handle_chat(n_clicks, n_submit, message, lat_val, lon_val, history):
             # Use current lat/lon from dashboard inputs
             lat, lon = float(lat_val), float(lon_val)
             
-            # 1. Fetch Weather Data (Using same service as standalone bot)
-            weather_data = weather_service.get_weather_data(lat, lon)
+            # 1. Reuse the dashboard's fetched data for this location, else fetch
+            #    (using same service as standalone bot)
+            weather_data = result_store.get(token)
+            if not weather_data or (float(weather_data['lat']), float(weather_data['lon'])) != (lat, lon):
+                weather_data = weather_service.get_weather_data(lat, lon)
             
             if "error" in weather_data:
                 response_text = f"Error fetching data: {weather_data['error']}"
@@ -6,6 +6,11 @@ import json
 import os
 from datetime import datetime
 import uuid
+import sys
+
+# Add chatbot_forecast to path to import services
+sys.path.append(os.path.join(os.path.dirname(__file__), 'chatbot_forecast'))
+from services.hourly_frame import normalize_hourly
 
 # -- DUMMY USERS --
 USER_DB = {
@@ -121,9 +126,19 @@ def get_forecast_hourly(lat, lon):
     points_resp = requests.get(points_url)
     forecast_hourly_url = points_resp.json()["properties"]["forecastHourly"]
     forecast_resp = requests.get(forecast_hourly_url)
-    forecast_data = forecast_resp.json()["properties"]["periods"]
-    df = pd.DataFrame(forecast_data)
-    return df
+    # Keep ISO time strings: the records are saved to the chat history JSON
+    df = normalize_hourly(forecast_resp.json(), parse_times=False)
+    # Saved chats refer to these columns by their original names (dew point now in °F, as charted)
+    return df.rename(columns={
+        "pop_val": "probabilityOfPrecipitation_value",
+        "dewpoint_f": "dewpoint_value",
+        "humidity_val": "relativeHumidity_value",
+        "wind_speed_val": "windSpeed_num",
+    })
+
+def to_records(df):
+    """DataFrame rows as JSON-safe dicts: missing values become None rather than NaN."""
+    return df.astype(object).where(df.notna(), None).to_dict('records')
 
 def create_chart_from_config(chart_config):
     """Recreate a Plotly chart from stored configuration"""
@@ -405,35 +420,16 @@ else:
                 lat, lon = get_lat_lon(city)
                 df = get_forecast_hourly(lat, lon)
                 
-                # Process the dataframe
-                if 'probabilityOfPrecipitation' in df.columns:
-                    df['probabilityOfPrecipitation_value'] = df['probabilityOfPrecipitation'].apply(
-                        lambda x: x['value'] if isinstance(x, dict) and 'value' in x else None)
-                if 'dewpoint' in df.columns:
-                    df['dewpoint_value'] = df['dewpoint'].apply(
-                        lambda x: x['value'] if isinstance(x, dict) and 'value' in x else None)
-                if 'relativeHumidity' in df.columns:
-                    df['relativeHumidity_value'] = df['relativeHumidity'].apply(
-                        lambda x: x['value'] if isinstance(x, dict) and 'value' in x else None)
-                
-                # Extract wind speed numbers
-                if pd.api.types.is_string_dtype(df['windSpeed']):
-                    df['windSpeed_num'] = df['windSpeed'].str.extract(r'(\d+)').astype(float)
-                
                 # Select relevant columns for display
                 display_columns = [
                     "number", "name", "startTime", "endTime", "isDaytime",
                     "temperature", "temperatureUnit", "temperatureTrend", 
                     "probabilityOfPrecipitation_value", "dewpoint_value", 
                     "relativeHumidity_value", "windSpeed", "windDirection", 
-                    "shortForecast", "detailedForecast"
+                    "shortForecast", "detailedForecast", "windSpeed_num"
                 ]
                 display_df = df[display_columns].copy()
                 
-                # Add wind speed numeric if available
-                if 'windSpeed_num' in df.columns:
-                    display_df['windSpeed_num'] = df['windSpeed_num']
-                
                 # Prepare chart configurations to store in JSON
                 charts = []
                 
@@ -444,7 +440,7 @@ else:
                         "x": "startTime",
                         "y": "temperature",
                         "title": "Temperature (°F) Over Time",
-                        "data": df[["startTime", "temperature"]].to_dict('records')
+                        "data": to_records(df[["startTime", "temperature"]])
                     })
                 
                 # Precipitation chart
@@ -454,7 +450,7 @@ else:
                         "x": "startTime",
                         "y": "probabilityOfPrecipitation_value",
                         "title": "Probability of Precipitation (%) Over Time",
-                        "data": df[["startTime", "probabilityOfPrecipitation_value"]].to_dict('records')
+                        "data": to_records(df[["startTime", "probabilityOfPrecipitation_value"]])
                     })
                 
                 # Dewpoint chart
@@ -464,7 +460,7 @@ else:
                         "x": "startTime",
                         "y": "dewpoint_value",
                         "title": "Dew Point (°F) Over Time",
-                        "data": df[["startTime", "dewpoint_value"]].to_dict('records')
+                        "data": to_records(df[["startTime", "dewpoint_value"]])
                     })
                 
                 # Humidity chart
@@ -474,7 +470,7 @@ else:
                         "x": "startTime",
                         "y": "relativeHumidity_value",
                         "title": "Relative Humidity (%) Over Time",
-                        "data": df[["startTime", "relativeHumidity_value"]].to_dict('records')
+                        "data": to_records(df[["startTime", "relativeHumidity_value"]])
                     })
                 
                 # Wind speed chart
@@ -484,7 +480,7 @@ else:
                         "x": "startTime",
                         "y": "windSpeed_num",
                         "title": "Wind Speed Over Time (mph)",
-                        "data": df[["startTime", "windSpeed_num"]].to_dict('records')
+                        "data": to_records(df[["startTime", "windSpeed_num"]])
                     })
                 
                 # Wind direction chart
@@ -494,7 +490,7 @@ else:
                         "x": "startTime",
                         "y": "windDirection",
                         "title": "Wind Direction Over Time",
-                        "data": df[["startTime", "windDirection"]].to_dict('records')
+                        "data": to_records(df[["startTime", "windDirection"]])
                     })
                 
                 # Short forecast chart
@@ -504,7 +500,7 @@ else:
                         "x": "startTime",
                         "y": "shortForecast",
                         "title": "Short Forecast Over Time",
-                        "data": df[["startTime", "shortForecast"]].to_dict('records')
+                        "data": to_records(df[["startTime", "shortForecast"]])
                     })
                 
                 # Add assistant message with forecast data and chart configs
@@ -512,7 +508,7 @@ else:
                     "role": "assistant",
                     "content": f"Weather forecast for **{city}**:",
                     "type": "forecast_data",
-                    "df_data": display_df.to_dict('records'),
+                    "df_data": to_records(display_df),
                     "charts": charts
                 })
                 
@@ -0,0 +1,58 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.append(os.path.join(ROOT, 'chatbot_forecast'))
+sys.path.append(os.path.join(ROOT, 'NWS-FORECAST'))
+sys.path.append(os.path.join(ROOT, 'benchmarks'))
+
+from services.nws_client import NWSClient  # noqa: E402
+from services.points_cache import PointsCache  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+
+@pytest.fixture
+def make_stub():
+    """Starts stub NWS servers (see benchmarks/stub_server.py) and stops them after the test."""
+    servers = []
+
+    def make(**options):
+        server = StubServer(**options).start()
+        servers.append(server)
+        return server
+
+    yield make
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture
+def make_client():
+    """NWSClient against a stub server, with the rate limit lifted unless a test sets one."""
+    def make(server, **options):
+        options.setdefault('rate_limit', 10_000)
+        options.setdefault('burst', 10_000)
+        return NWSClient(base_url=server.base_url, points_cache=PointsCache(':memory:'), **options)
+
+    return make
+
+
+@pytest.fixture
+def service(make_stub, make_client):
+    """nws_api_service with its shared client and weather service pointed at a fresh stub server."""
+    import services.nws_client as nws_client
+    import nws_api_service
+
+    def make(**options):
+        server = make_stub(**options)
+        client = make_client(server)
+        nws_client._shared_client = client
+        nws_api_service._weather_service.client = client
+        nws_api_service._weather_service.cache.clear()
+        return server
+
+    previous = nws_client._shared_client
+    yield make
+    nws_client._shared_client = previous
@@ -0,0 +1,96 @@
+import copy
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+import nws_api_service
+import services.alert_feed as alert_feed
+from services.alert_feed import AlertFeed, STALE_AFTER_POLLS, alert_id
+from stub_server import synthetic_alert
+
+
+@pytest.fixture
+def shared_feed(monkeypatch, make_client):
+    """Installs an AlertFeed over `server` as the process-wide feed (polled by hand, never started)."""
+    def make(server):
+        feed = AlertFeed(client=make_client(server))
+        monkeypatch.setattr(alert_feed, '_shared_feed', feed)
+        return feed
+
+    return make
+
+
+def _point_inside(feature):
+    lon, lat = feature['geometry']['coordinates'][0][0]
+    return lat + 0.05, lon + 0.05
+
+
+def test_point_alerts_come_from_a_fresh_feed(service, shared_feed):
+    server = service(alerts=50)
+    feed = shared_feed(server)
+    feed.poll()
+    alert = next(f for f in server.alert_features if f['geometry'])
+    result, error = nws_api_service.get_active_alerts_for_point(*_point_inside(alert))
+    assert error is None
+    assert alert['properties']['id'] in {f['properties']['id'] for f in result['features']}
+
+
+def test_stale_feed_falls_back_to_a_point_request(service, shared_feed):
+    server = service(alerts=50)
+    feed = shared_feed(server)
+    feed.poll()
+    feed.last_poll -= timedelta(seconds=feed.poll_interval * STALE_AFTER_POLLS + 1)
+    assert not feed.is_fresh()
+    alert = next(f for f in server.alert_features if f['geometry'])
+    result, error = nws_api_service.get_active_alerts_for_point(*_point_inside(alert))
+    # The stub answers point queries with no alerts, so the feed's match is not used
+    assert error is None
+    assert result['features'] == []
+
+
+def _resent(feature, **props):
+    feature = copy.deepcopy(feature)
+    feature['properties'].update(props)
+    return feature
+
+
+def test_poll_diffs_added_updated_expired_and_replaced(make_stub, make_client):
+    server = make_stub(etags=True, alerts=10)
+    feed = AlertFeed(client=make_client(server))
+    first = feed.poll()
+    assert len(first["added"]) == 10 and first["version"] == 1
+    alerts = server.alert_features
+
+    later = (datetime.now().astimezone() + timedelta(minutes=5)).isoformat()
+    resent = _resent(alerts[0], sent=later)
+    # A new message that references alerts[1] supersedes it
+    successor = _resent(alerts[1], id='successor', sent=later,
+                        references=[{'identifier': alerts[1]['properties']['id']}])
+    new = synthetic_alert(100, random.Random(100))
+    server.set_alerts([resent, successor, new] + alerts[2:9])  # alerts[9] leaves the feed
+
+    delta = feed.poll()
+    assert [alert_id(f) for f in delta["added"]] == [alert_id(new)]
+    assert sorted(alert_id(f) for f in delta["updated"]) == sorted([alert_id(resent), 'successor'])
+    assert delta["expired"] == [alert_id(alerts[9])]
+    assert delta["replaced"] == {alert_id(alerts[1]): 'successor'}
+    assert delta["version"] == 2
+    assert alert_id(alerts[1]) not in feed.alerts and 'successor' in feed.alerts
+
+
+def test_cancel_and_unchanged_polls(make_stub, make_client):
+    server = make_stub(etags=True, alerts=5)
+    feed = AlertFeed(client=make_client(server))
+    feed.poll()
+    unchanged = feed.poll()
+    assert not (unchanged["added"] or unchanged["updated"] or unchanged["expired"])
+    assert feed.unchanged_polls == 1 and feed.version == 1
+
+    alerts = server.alert_features
+    cancel = _resent(alerts[0], id='cancel', messageType='Cancel',
+                     references=[{'identifier': alerts[0]['properties']['id']}])
+    server.set_alerts([cancel] + alerts[1:])
+    delta = feed.poll()
+    assert delta["expired"] == [alert_id(alerts[0])]
+    assert 'cancel' not in feed.alerts and len(feed.alerts) == 4
@@ -0,0 +1,47 @@
+import json
+
+import nws_api_service
+from services.alert_feed import alert_id
+
+
+def test_iter_alerts_follows_cursors_to_the_empty_page(service):
+    server = service(alerts=23)
+    alerts = list(nws_api_service.iter_alerts(page_size=5))
+    assert [alert_id(f) for f in alerts] == [alert_id(f) for f in server.alert_features]
+    # Five full or partial pages, then the empty page that ends the cursor chain
+    assert server.request_count == 6
+
+
+def test_iter_alerts_stops_fetching_at_max_alerts(service):
+    server = service(alerts=23)
+    alerts = list(nws_api_service.iter_alerts(page_size=5, max_alerts=7))
+    assert [alert_id(f) for f in alerts] == [alert_id(f) for f in server.alert_features[:7]]
+    assert server.request_count == 2
+
+
+def test_search_all_alerts_limit_spans_pages(service):
+    service(alerts=30)
+    result, error = nws_api_service.search_all_alerts(limit=12)
+    assert error is None
+    assert len(result['features']) == 12
+    # The first page's top-level keys are kept; the cursor isn't
+    assert result['title'] == 'All alerts' and 'updated' in result
+    assert 'pagination' not in result
+
+
+def test_search_all_alerts_needs_a_limit(service):
+    server = service(alerts=30)
+    result, error = nws_api_service.search_all_alerts(limit=None)
+    assert result is None and 'iter_alerts' in error
+    assert server.request_count == 0
+
+
+def test_export_alerts_writes_every_alert(service, tmp_path):
+    service(alerts=17)
+    path = tmp_path / 'alerts.jsonl'
+    count, error = nws_api_service.export_alerts(str(path), max_alerts=10)
+    assert (count, error) == (10, None)
+    assert len(path.read_text(encoding='utf-8').splitlines()) == 10
+    count, error = nws_api_service.export_alerts(str(tmp_path / 'alerts.json'))
+    assert count == 17
+    assert len(json.loads((tmp_path / 'alerts.json').read_text(encoding='utf-8'))['features']) == 17
@@ -0,0 +1,62 @@
+import copy
+import random
+
+from services.alert_feed import AlertFeed, alert_id
+from services.alert_stream import AlertStore, attach_local, delta_for_area
+from stub_server import synthetic_alert
+
+
+def _alert(n, zones):
+    feature = synthetic_alert(n, random.Random(n))
+    feature['properties']['geocode']['UGC'] = zones
+    return feature
+
+
+def test_delta_for_area_narrows_and_expires_what_left_the_area():
+    tx, ca, moved = _alert(1, ['TXZ001']), _alert(2, ['CAZ001']), _alert(3, ['CAZ002'])
+    delta = {"version": 4, "added": [tx, ca], "updated": [moved], "expired": ["gone"],
+             "replaced": {"old": alert_id(moved)}}
+    narrowed = delta_for_area(delta, 'tx')
+    assert narrowed["added"] == [tx]
+    assert narrowed["updated"] == []
+    # An update that no longer covers TX, an expiry and a replaced id all expire
+    assert sorted(narrowed["expired"]) == sorted(["gone", alert_id(moved), "old"])
+    assert narrowed["version"] == 4
+    everything = delta_for_area(delta)
+    assert everything["added"] == [tx, ca] and everything["updated"] == [moved]
+
+
+def test_store_replays_deltas_that_arrive_before_its_snapshot():
+    store = AlertStore()
+    first, second = _alert(1, ['TXZ001']), _alert(2, ['TXZ002'])
+    assert not store.apply_delta({"version": 2, "added": [second], "updated": [], "expired": []})
+    assert store.version == 0 and not store.alerts
+    assert store.apply_snapshot(1, [first])
+    assert store.version == 2
+    assert set(store.alerts) == {alert_id(first), alert_id(second)}
+    assert store.changed_since(1) == {alert_id(second)}
+
+
+def test_attach_local_keeps_a_delta_that_beats_the_snapshot(make_stub, make_client):
+    server = make_stub(alerts=60)
+    feed = AlertFeed(client=make_client(server))
+    feed.poll()
+    snapshot = feed.snapshot
+    raced = []
+
+    def racing_snapshot(area=None):
+        # Read the snapshot, then let a poll (and its delta) land before it is applied
+        result = snapshot(area)
+        if not raced:
+            raced.append(True)
+            features = copy.deepcopy(server.alert_features)
+            server.set_alerts(features[5:] + [_alert(1000 + n, ['TXZ100']) for n in range(3)])
+            feed.poll()
+        return result
+
+    feed.snapshot = racing_snapshot
+    store = AlertStore('TX')
+    attach_local(store, feed)
+    assert raced
+    assert store.version == feed.version == 2
+    assert sorted(store.alerts) == sorted(alert_id(f) for f in feed.for_area('TX')['features'])
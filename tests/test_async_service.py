@@ -0,0 +1,24 @@
+import asyncio
+
+import nws_api_service_async as async_service
+
+
+def test_point_forecasts_gather_across_points(service):
+    server = service(distinct_grids=True)
+    points = [(39.0 + n * 0.1, -94.5) for n in range(6)]
+
+    async def fetch_all():
+        return await asyncio.gather(*(async_service.get_point_forecasts(lat, lon) for lat, lon in points))
+
+    results = asyncio.run(fetch_all())
+    assert [error for _, error in results] == [None] * 6
+    assert all(set(forecasts) == {"daily", "hourly", "raw"} for forecasts, _ in results)
+    # A /points lookup per point, then three products per (distinct) grid cell
+    assert server.request_count == 6 + 6 * 3
+
+
+def test_an_unresolvable_point_reports_its_error(service):
+    service(fault_rate=1.0, fault_status=500, retry_after=0)
+    forecasts, error = asyncio.run(async_service.get_point_forecasts(39.0, -94.5))
+    assert forecasts is None
+    assert error
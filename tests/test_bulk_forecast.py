@@ -0,0 +1,19 @@
+import nws_api_service
+
+
+def test_nearby_points_in_different_cells_get_their_own_grid(service):
+    server = service(distinct_grids=True)
+    # ~220 m apart, either side of a stub grid-cell boundary
+    results = nws_api_service.get_forecasts_for_locations([(39.024, -94.51), (39.026, -94.51)])
+    assert [r["error"] for r in results] == [None, None]
+    assert results[0]["grid"] != results[1]["grid"]
+    assert server.request_count > 0
+
+
+def test_locations_in_one_cell_fetch_it_once(service):
+    server = service(distinct_grids=True)
+    locations = [(39.0101, -94.5101), (39.0102, -94.5102), (39.0103, -94.5103)]
+    results = nws_api_service.get_forecasts_for_locations(locations, layers=['temperature'])
+    assert len({r["grid"] for r in results}) == 1
+    # Three /points lookups, then the cell's forecast, hourly and grid products once
+    assert server.request_count == 3 + 3
@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from services.cache import GRID_UPDATE_INTERVAL, MIN_TTL, grid_ttl
+
+
+def grid_updated(minutes_ago):
+    updated = datetime.now(timezone.utc) - timedelta(minutes=minutes_ago)
+    return {"properties": {"updateTime": updated.isoformat()}}
+
+
+def test_grid_ttl_caps_at_next_update():
+    assert grid_ttl(grid_updated(10), GRID_UPDATE_INTERVAL) == pytest.approx(50 * 60, abs=5)
+
+
+@pytest.mark.parametrize("minutes_ago", [61, 125, 24 * 60 + 30])
+def test_grid_ttl_rolls_missed_updates_forward(minutes_ago):
+    # An office that skipped updates is next expected at the following whole interval, not "now"
+    expected = 60 * (60 - minutes_ago % 60)
+    assert grid_ttl(grid_updated(minutes_ago), GRID_UPDATE_INTERVAL) == pytest.approx(expected, abs=5)
+    assert grid_ttl(grid_updated(minutes_ago), GRID_UPDATE_INTERVAL) > MIN_TTL
+
+
+def test_grid_ttl_keeps_shorter_header_ttl():
+    assert grid_ttl(grid_updated(61), 300) == 300
+
+
+def test_grid_ttl_without_update_time():
+    assert grid_ttl({"properties": {}}, 900) == 900
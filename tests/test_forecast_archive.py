@@ -0,0 +1,31 @@
+import pytest
+
+from services.forecast_archive import KEY_COLUMNS, ForecastArchive, grid_to_rows
+from stub_server import synthetic_grid
+
+
+def test_grid_to_rows_has_one_row_per_layer_and_valid_time():
+    rows = grid_to_rows(synthetic_grid(hours=24), layers=['temperature', 'dewpoint', 'hazards'])
+    # Hazards carry lists, not numbers, so they are left out
+    assert sorted(set(rows['layer'])) == ['dewpoint', 'temperature']
+    assert len(rows) == 48
+    assert not rows.duplicated(KEY_COLUMNS).any()
+
+
+def test_reappending_an_issuance_only_adds_missing_rows(tmp_path):
+    pytest.importorskip('pyarrow')
+    grid = synthetic_grid(hours=24)
+    archive = ForecastArchive(str(tmp_path))
+    assert archive.append(grid, layers=['temperature']) == 24
+    assert archive.append(grid, layers=['temperature']) == 0
+    assert archive.stats()["appends_skipped"] == 1
+
+    # A new process has no memory of what it appended; the rows already on disk dedup it
+    restarted = ForecastArchive(str(tmp_path))
+    assert restarted.append(grid, layers=['temperature']) == 0
+    assert restarted.append(grid, layers=['temperature', 'dewpoint']) == 24
+
+    rows = restarted.query('EAX', 44, 51)
+    assert len(rows) == 48
+    assert not rows.duplicated(KEY_COLUMNS).any()
+    assert len(restarted.issuances('EAX', 44, 51)) == 1
@@ -0,0 +1,20 @@
+from services.grid_index import get_grid_index
+
+
+def grid(**layers):
+    props = {"@id": "https://api.weather.gov/gridpoints/EAX/44,51", "updateTime": "2025-01-01T05:06:00+00:00"}
+    for name, value in layers.items():
+        props[name] = {"uom": "wmoUnit:degC", "values": [{"validTime": "2025-01-01T00:00:00+00:00/PT6H", "value": value}]}
+    return {"properties": props}
+
+
+def test_layer_subset_and_full_payload_get_separate_indexes():
+    subset = get_grid_index(grid(temperature=1.0))
+    assert subset.layer("dewpoint") is None
+    full = get_grid_index(grid(temperature=1.0, dewpoint=-2.0))
+    assert full is not subset
+    assert full.layer("dewpoint") is not None
+
+
+def test_round_tripped_payload_reuses_its_index():
+    assert get_grid_index(grid(temperature=1.0)) is get_grid_index(grid(temperature=1.0))
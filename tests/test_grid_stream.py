@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from services.grid_stream import extract_layers
+
+GRID = {
+    "id": "https://api.weather.gov/gridpoints/EAX/44,51",
+    "type": "Feature",
+    "geometry": {"type": "Polygon", "coordinates": [[[-94.5, 39.1], [-94.4, 39.1]]]},
+    "properties": {
+        "updateTime": "2025-01-01T05:06:00+00:00",
+        "gridId": "EAX",
+        "weather": {"values": [{"validTime": "2025-01-01T00:00:00+00:00/PT6H",
+                                "value": [{"coverage": "chance", "attributes": []}]}]},
+        "hazards": {"values": [{"validTime": "2025-01-01T00:00:00+00:00/PT6H",
+                                "value": [{"phenomenon": "WS", "significance": "W"}]}]},
+        "odd": {"note": "brackets ] } [ { and \"quotes\" \\ in a string", "empty": {}, "list": []},
+        "temperature": {"uom": "wmoUnit:degC",
+                        "values": [{"validTime": "2025-01-01T00:00:00+00:00/PT1H", "value": -1.5}]},
+        "dewpoint": {"uom": "wmoUnit:degC", "values": []},
+        "maxTemperature": 12,
+    },
+}
+
+
+@pytest.mark.parametrize("indent", [None, 4])
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64, 1 << 16])
+def test_extract_layers_matches_full_decode(indent, chunk_size):
+    body = json.dumps(GRID, indent=indent).encode()
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+
+    payload, bytes_read = extract_layers(chunks, ["temperature", "hazards", "maxTemperature"])
+
+    props = GRID["properties"]
+    assert payload == {
+        "id": GRID["id"],
+        "type": GRID["type"],
+        "properties": {name: props[name] for name in
+                       ("updateTime", "gridId", "hazards", "temperature", "maxTemperature")},
+    }
+    assert bytes_read == len(body)
+
+
+def test_truncated_stream_raises():
+    body = json.dumps(GRID).encode()
+    with pytest.raises(ValueError):
+        extract_layers([body[:len(body) // 2]], ["temperature"])
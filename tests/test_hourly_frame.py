@@ -0,0 +1,31 @@
+import math
+
+from services.hourly_frame import normalize_hourly
+
+
+def _period(**fields):
+    period = {'startTime': '2026-01-01T00:00:00-06:00', 'temperature': 50, 'temperatureUnit': 'F',
+              'dewpoint': {'unitCode': 'wmoUnit:degC', 'value': 10.0}, 'relativeHumidity': {'value': 40},
+              'probabilityOfPrecipitation': {'value': 20}, 'windSpeed': '5 to 10 mph'}
+    period.update(fields)
+    return period
+
+
+def test_missing_quantities_stay_missing():
+    df = normalize_hourly({'properties': {'periods': [
+        _period(), _period(probabilityOfPrecipitation=None), _period(dewpoint={'value': None})]}})
+    assert df['pop_val'][0] == 20
+    assert math.isnan(df['pop_val'][1])
+    assert df['dewpoint_f'][0] == 50
+    assert math.isnan(df['dewpoint_f'][2])
+
+
+def test_wind_ranges_and_kmh():
+    df = normalize_hourly({'properties': {'periods': [_period(), _period(windSpeed='16 km/h')]}})
+    assert (df['wind_speed_val'][0], df['wind_speed_max'][0]) == (5, 10)
+    assert abs(df['wind_speed_val'][1] - 16 / 1.609344) < 1e-9
+
+
+def test_null_dewpoint_unit_is_treated_as_celsius():
+    df = normalize_hourly({'properties': {'periods': [_period(dewpoint={'unitCode': None, 'value': 10.0})]}})
+    assert df['dewpoint_f'][0] == 50
@@ -0,0 +1,44 @@
+import pytest
+import requests
+
+from services.nws_client import DEFAULT_USER_AGENT, NWSClient
+
+
+def _capture_responses(client):
+    responses = []
+    get = client.get
+
+    def capturing_get(*args, **kwargs):
+        response = get(*args, **kwargs)
+        responses.append(response)
+        return response
+
+    client.get = capturing_get
+    return responses
+
+
+def test_streamed_304_releases_its_connection(make_stub, make_client):
+    server = make_stub(etags=True)
+    client = make_client(server)
+    url = f"{server.base_url}/gridpoints/EAX/44,51"
+    client.fetch_json(url, layers=['temperature'])
+    responses = _capture_responses(client)
+    client.fetch_json(url, layers=['temperature'])
+    assert responses[-1].status_code == 304
+    assert responses[-1].raw.closed
+
+
+def test_streamed_error_releases_its_connection(make_stub, make_client):
+    server = make_stub(fault_rate=1.0, fault_status=500, retry_after=0)
+    client = make_client(server, max_retries=0)
+    responses = _capture_responses(client)
+    with pytest.raises(requests.exceptions.HTTPError):
+        client.fetch_json(f"{server.base_url}/gridpoints/EAX/44,51", layers=['temperature'])
+    assert responses[-1].raw.closed
+
+
+def test_every_client_sends_the_one_configured_user_agent(monkeypatch):
+    monkeypatch.setenv('NWS_USER_AGENT', '(test-app, test@example.com)')
+    assert NWSClient().session.headers['User-Agent'] == '(test-app, test@example.com)'
+    monkeypatch.delenv('NWS_USER_AGENT')
+    assert NWSClient().session.headers['User-Agent'] == DEFAULT_USER_AGENT
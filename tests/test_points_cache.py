@@ -0,0 +1,36 @@
+from services.points_cache import PointsCache, point_key
+
+
+def properties(grid_x):
+    return {"gridId": "EAX", "gridX": grid_x, "gridY": 51, "forecastZone": "https://x/zones/forecast/MOZ028"}
+
+
+def test_only_the_same_rounded_point_shares_an_entry():
+    cache = PointsCache(':memory:')
+    cache.put(39.02401, -94.51, properties(44))
+    assert cache.get(39.024012, -94.510004)["gridX"] == 44
+    # ~200 m away can be another grid cell: must be resolved, not borrowed
+    assert cache.get(39.026, -94.51) is None
+
+
+def test_zones_round_trip():
+    cache = PointsCache(':memory:')
+    cache.put(39.1, -94.5, properties(44))
+    assert cache.get(39.1, -94.5)["zones"] == ["MOZ028"]
+
+
+def test_point_key_matches_points_precision():
+    assert point_key(39.12344, -94.56786) == (391234, -945679)
+
+
+def test_old_lattice_cache_is_dropped(tmp_path):
+    import sqlite3
+    path = str(tmp_path / "points.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE points (qlat INTEGER, qlon INTEGER, grid_id TEXT)")
+    conn.execute("INSERT INTO points VALUES (1, 2, 'EAX')")
+    conn.commit()
+    conn.close()
+    cache = PointsCache(path)
+    cache.put(39.1, -94.5, properties(44))
+    assert cache.get(39.1, -94.5)["gridX"] == 44
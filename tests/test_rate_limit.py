@@ -0,0 +1,74 @@
+import time
+
+from services.rate_limit import MAX_RETRY_AFTER, TokenBucket, retry_after_seconds
+
+
+def _grid_url(server):
+    return f"{server.base_url}/gridpoints/EAX/44,51"
+
+
+def test_transient_errors_are_retried_until_they_succeed(make_stub, make_client):
+    server = make_stub(fault_rate=0.4, retry_after=0, seed=1)
+    client = make_client(server, max_retries=10)
+    statuses = [client.get(_grid_url(server)).status_code for _ in range(10)]
+    assert statuses == [200] * 10
+    assert server.fault_count > 0
+    assert client.stats()["retried"] == server.fault_count
+    assert server.request_count == 10 + server.fault_count
+
+
+def test_the_last_failure_is_returned_after_max_retries(make_stub, make_client):
+    server = make_stub(fault_rate=1.0, fault_status=500, retry_after=0)
+    client = make_client(server, max_retries=2)
+    assert client.get(_grid_url(server)).status_code == 500
+    assert server.request_count == 3
+    # A plain 500 retries without slowing everyone else down
+    assert client.stats()["throttled"] == 0
+    assert client.limiter.rate == client.limiter.max_rate
+
+
+def test_throttling_halves_the_rate_and_successes_win_it_back(make_stub, make_client):
+    server = make_stub(fault_rate=1.0, fault_status=429, retry_after=0)
+    client = make_client(server, rate_limit=20, burst=20, max_retries=0)
+    assert client.get(_grid_url(server)).status_code == 429
+    assert client.stats()["throttled"] == 1
+    assert client.limiter.rate == 10
+
+    server.fault_rate = 0.0
+    for _ in range(5):
+        assert client.get(_grid_url(server)).status_code == 200
+    assert 10 < client.limiter.rate <= 20
+
+
+def test_pacing_stays_under_the_server_limit(make_stub, make_client):
+    server = make_stub(max_rps=20)
+    client = make_client(server, rate_limit=10, burst=1)
+    start = time.monotonic()
+    for _ in range(12):
+        assert client.get(_grid_url(server)).status_code == 200
+    assert server.fault_count == 0
+    assert time.monotonic() - start >= 1.0
+
+
+def test_token_bucket_allows_a_burst_then_paces():
+    bucket = TokenBucket(rate=50, burst=5)
+    start = time.monotonic()
+    for _ in range(5):
+        assert bucket.acquire() == 0.0
+    assert time.monotonic() - start < 0.05
+    waited = sum(bucket.acquire() for _ in range(5))
+    assert waited >= 0.08
+
+
+def test_throttle_pause_holds_every_caller():
+    bucket = TokenBucket(rate=100, burst=10)
+    bucket.throttle(pause=0.2)
+    assert bucket.acquire() >= 0.15
+
+
+def test_retry_after_parsing():
+    assert retry_after_seconds('3') == 3.0
+    assert retry_after_seconds('100000') == MAX_RETRY_AFTER
+    assert retry_after_seconds(None) is None
+    assert retry_after_seconds('soon') is None
+    assert retry_after_seconds('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
@@ -8,6 +8,14 @@ import json
 from typing import Dict, List, Any
 import hashlib
 import time
+import sys
+import os
+
+# Add chatbot_forecast to path to import the shared alert feed
+sys.path.append(os.path.join(os.path.dirname(__file__), 'chatbot_forecast'))
+from services.alert_feed import AlertFeed, get_alert_feed, alert_id, ALERT_POLL_INTERVAL
+from services.alert_index import AlertIndex
+from services.alert_stream import AlertStore, AlertStreamClient, attach_local, ALERT_STREAM_URL
 
 # Page configuration
 st.set_page_config(
@@ -290,86 +298,51 @@ CERTAINTY_COLORS = {
     "Unknown": "#cccccc"
 }
 
+# How often the page checks the state's live alert store for changes (no requests involved)
+STREAM_CHECK_SECONDS = 2
+
+
+@st.cache_resource(show_spinner=False)
+def shared_alert_feed() -> AlertFeed:
+    """The polling alert feed, created and started once per server process (not per rerun)"""
+    return get_alert_feed()
+
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
 def fetch_alert_count() -> Dict[str, Any]:
-    """Fetch active alert count from NWS API"""
-    try:
-        url = "https://api.weather.gov/alerts/active/count"
-        headers = {
-            'User-Agent': '(WeatherAlertDashboard, contact@example.com)',
-            'Accept': 'application/json'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        st.error(f"Error fetching alert count: {str(e)}")
+    """Active alert counts, answered from the national alert feed"""
+    feed = shared_alert_feed()
+    if not feed.wait_ready():
+        st.error(f"Error fetching alert count: {feed.last_error or 'no response from the alert feed'}")
         return {}
+    return feed.count()
 
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
-def fetch_state_alerts(state_code: str) -> Dict[str, Any]:
-    """Fetch alerts for a specific state"""
-    try:
-        url = f"https://api.weather.gov/alerts/active/area/{state_code}"
-        headers = {
-            'User-Agent': '(WeatherAlertDashboard, contact@example.com)',
-            'Accept': 'application/geo+json'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        st.error(f"Error fetching alerts for {state_code}: {str(e)}")
-        return {}
+@st.cache_resource(show_spinner=False)
+def get_alert_store(state_code: str) -> AlertStore:
+    """Live local copy of a state's alerts, shared by every session viewing that state.
 
+    Deltas are pushed into it from the alert stream server at ALERT_STREAM_URL
+    when one is configured, otherwise straight from this process's alert feed.
+    """
+    store = AlertStore(state_code)
+    if ALERT_STREAM_URL:
+        AlertStreamClient(ALERT_STREAM_URL, store).start()
+        store.wait_for_change(0, timeout=10)
+    else:
+        attach_local(store, shared_alert_feed())
+    return store
 
-def categorize_alerts(alerts: List[Dict]) -> Dict[str, Any]:
-    """Categorize alerts by severity, urgency, certainty, and event type"""
-    categorized = {
-        'severity': {'Extreme': [], 'Severe': [], 'Moderate': [], 'Minor': [], 'Unknown': []},
-        'urgency': {'Immediate': [], 'Expected': [], 'Future': [], 'Past': [], 'Unknown': []},
-        'certainty': {'Observed': [], 'Likely': [], 'Possible': [], 'Unlikely': [], 'Unknown': []},
-        'event_type': {}
-    }
-    
-    for alert in alerts:
-        props = alert.get('properties', {})
-        
-        # Categorize by severity
-        severity = props.get('severity', 'Unknown')
-        if severity in categorized['severity']:
-            categorized['severity'][severity].append(alert)
-        else:
-            categorized['severity']['Unknown'].append(alert)
-        
-        # Categorize by urgency
-        urgency = props.get('urgency', 'Unknown')
-        if urgency in categorized['urgency']:
-            categorized['urgency'][urgency].append(alert)
-        else:
-            categorized['urgency']['Unknown'].append(alert)
-        
-        # Categorize by certainty
-        certainty = props.get('certainty', 'Unknown')
-        if certainty in categorized['certainty']:
-            categorized['certainty'][certainty].append(alert)
-        else:
-            categorized['certainty']['Unknown'].append(alert)
-        
-        # Categorize by event type
-        event_type = props.get('event', 'Unknown')
-        if event_type not in categorized['event_type']:
-            categorized['event_type'][event_type] = []
-        categorized['event_type'][event_type].append(alert)
-    
-    return categorized
+
+def build_state_charts(index: AlertIndex, selected) -> List[go.Figure]:
+    """The four distribution charts for the selected alerts (None where a chart has no data)"""
+    categorized = index.categorize(selected)
+    return [create_severity_chart(categorized), create_certainty_chart(categorized),
+            create_urgency_chart(categorized), create_event_type_chart(categorized)]
 
 
 def create_severity_chart(categorized: Dict) -> go.Figure:
     """Create a bar chart for severity distribution"""
-    severity_counts = {k: len(v) for k, v in categorized['severity'].items() if len(v) > 0}
+    severity_counts = categorized['severity']
     
     if not severity_counts:
         return None
@@ -397,7 +370,7 @@ def create_severity_chart(categorized: Dict) -> go.Figure:
 
 def create_urgency_chart(categorized: Dict) -> go.Figure:
     """Create a pie chart for urgency distribution"""
-    urgency_counts = {k: len(v) for k, v in categorized['urgency'].items() if len(v) > 0}
+    urgency_counts = categorized['urgency']
     
     if not urgency_counts:
         return None
@@ -422,7 +395,7 @@ def create_urgency_chart(categorized: Dict) -> go.Figure:
 
 def create_certainty_chart(categorized: Dict) -> go.Figure:
     """Create a horizontal bar chart for certainty distribution"""
-    certainty_counts = {k: len(v) for k, v in categorized['certainty'].items() if len(v) > 0}
+    certainty_counts = categorized['certainty']
     
     if not certainty_counts:
         return None
@@ -451,7 +424,7 @@ def create_certainty_chart(categorized: Dict) -> go.Figure:
 
 def create_event_type_chart(categorized: Dict) -> go.Figure:
     """Create a treemap for event types"""
-    event_counts = {k: len(v) for k, v in categorized['event_type'].items() if len(v) > 0}
+    event_counts = categorized['event_type']
     
     if not event_counts:
         return None
@@ -516,7 +489,7 @@ def create_national_overview_chart(alert_count_data: Dict) -> go.Figure:
 
 
 
-def display_alert_card(alert: Dict, index: int):
+def display_alert_card(alert: Dict, index: int, is_new: bool = False):
     """Display a single alert card"""
     props = alert.get('properties', {})
     
@@ -547,7 +520,8 @@ def display_alert_card(alert: Dict, index: int):
     # Determine severity class
     severity_class = f"severity-{severity.lower()}"
     
-    with st.expander(f"🚨 {event} - {area_desc}", expanded=False):
+    badge = "🆕 " if is_new else ""
+    with st.expander(f"{badge}🚨 {event} - {area_desc}", expanded=False):
         col1, col2, col3 = st.columns(3)
         
         with col1:
@@ -572,6 +546,166 @@ def display_alert_card(alert: Dict, index: int):
             st.info(instruction)
 
 
+def build_state_exports(alerts: List[Dict], filtered_alerts: List[Dict]) -> tuple:
+    """(JSON of every alert, CSV of the filtered alerts) for the export buttons"""
+    json_data = json.dumps({"type": "FeatureCollection", "features": alerts}, indent=2)
+    df_data = []
+    for alert in filtered_alerts:
+        props = alert.get('properties', {})
+        df_data.append({
+            'Event': props.get('event', ''),
+            'Severity': props.get('severity', ''),
+            'Urgency': props.get('urgency', ''),
+            'Certainty': props.get('certainty', ''),
+            'Area': props.get('areaDesc', ''),
+            'Effective': props.get('effective', ''),
+            'Expires': props.get('expires', ''),
+            'Headline': props.get('headline', '')
+        })
+    return json_data, pd.DataFrame(df_data).to_csv(index=False)
+
+
+@st.fragment(run_every=STREAM_CHECK_SECONDS)
+def live_alert_updates(selected_state: str, severity_filter: List[str], urgency_filter: List[str]):
+    """Alerts the store has added or updated since the state section was drawn, and a count
+    of those that expired. Runs alone every STREAM_CHECK_SECONDS; the rest of the page
+    (charts, the full list) is not re-executed, and an unchanged store draws nothing."""
+    store = get_alert_store(selected_state)
+    drawn_version, drawn_ids, drawn_connected = st.session_state[f"drawn_{selected_state}"]
+    if drawn_connected and not store.connected:
+        st.warning("Live alert updates are disconnected; showing the last alerts received.")
+    if store.version == drawn_version:
+        return
+    
+    changed = [store.alerts.get(aid) for aid in store.changed_since(drawn_version)]
+    changed = [alert for alert in changed if alert is not None
+               and alert['properties'].get('severity', 'Unknown') in severity_filter
+               and alert['properties'].get('urgency', 'Unknown') in urgency_filter]
+    expired = len(drawn_ids - store.ids())
+    if not changed and not expired:
+        return
+    
+    st.subheader("📡 Live Updates")
+    st.caption("Arrived since this view was drawn; charts and exports catch up on the next refresh.")
+    if expired:
+        st.info(f"**{expired} alert(s) listed below have expired or been cancelled**")
+    for idx, alert in enumerate(changed):
+        display_alert_card(alert, idx, is_new=True)
+    st.markdown("---")
+
+
+def render_state_alerts(selected_state: str, severity_filter: List[str], urgency_filter: List[str]):
+    """State alert section, drawn on page runs. Charts and exports are rebuilt only when
+    the store's version or the filters move; live_alert_updates shows what changes after."""
+    st.header(f"🗺️ Alerts for {US_STATES[selected_state]}")
+    
+    store = get_alert_store(selected_state)
+    st.session_state[f"drawn_{selected_state}"] = (store.version, store.ids(), store.connected)
+    # Deltas applied from here on appear in this fragment, without rerunning the page
+    live_alert_updates(selected_state, severity_filter, urgency_filter)
+    seen_key = f"seen_version_{selected_state}"
+    if seen_key not in st.session_state:
+        # Alerts that arrive after the state is first opened get a "new" badge
+        st.session_state[seen_key] = store.version
+    if not store.connected and not store.version:
+        st.error(f"Unable to fetch alerts for {US_STATES[selected_state]}")
+        return
+    if not store.connected:
+        st.warning("Live alert updates are disconnected; showing the last alerts received.")
+    elif shared_alert_feed().last_error and not ALERT_STREAM_URL:
+        # The feed keeps the last good poll, so the page still shows it
+        st.warning(f"Couldn't reach NWS on the last poll; showing alerts as of "
+                   f"{shared_alert_feed().last_poll.astimezone().strftime('%H:%M:%S')}.")
+    
+    alerts = store.features()
+    
+    if len(alerts) == 0:
+        st.success(f"✅ No active alerts for {US_STATES[selected_state]}")
+        return
+    
+    # Display alert count
+    st.info(f"**{len(alerts)} active alert(s) found**")
+    
+    # Filter alerts based on user selection; the filter and the chart
+    # counts are vectorized lookups on the store's index
+    index = store.index()
+    selected = index.mask(severity=severity_filter, urgency=urgency_filter)
+    # Most severe first
+    filtered_alerts = index.select(selected)
+    
+    st.info(f"**{len(filtered_alerts)} alert(s) after applying filters**")
+    
+    if len(filtered_alerts) == 0:
+        st.warning("No alerts match the selected filters.")
+        return
+    
+    charts_key = (selected_state, store.version, tuple(severity_filter), tuple(urgency_filter))
+    if st.session_state.get('state_charts', (None,))[0] != charts_key:
+        st.session_state.state_charts = (charts_key, build_state_charts(index, selected))
+        st.session_state.state_exports = (charts_key, build_state_exports(alerts, filtered_alerts))
+    severity_chart, certainty_chart, urgency_chart, event_chart = st.session_state.state_charts[1]
+    json_data, csv_data = st.session_state.state_exports[1]
+    
+    # Display charts
+    st.subheader("📈 Alert Distribution")
+    
+    chart_col1, chart_col2 = st.columns(2)
+    
+    with chart_col1:
+        if severity_chart:
+            st.plotly_chart(severity_chart, use_container_width=True)
+        
+        if certainty_chart:
+            st.plotly_chart(certainty_chart, use_container_width=True)
+    
+    with chart_col2:
+        if urgency_chart:
+            st.plotly_chart(urgency_chart, use_container_width=True)
+    
+    # Event type treemap
+    if event_chart:
+        st.plotly_chart(event_chart, use_container_width=True)
+    
+    st.markdown("---")
+    
+    # Display alerts by severity
+    st.subheader("🚨 Alert Details")
+    
+    # Display alerts (already sorted by severity priority)
+    new_ids = store.changed_since(st.session_state[seen_key])
+    for idx, alert in enumerate(filtered_alerts):
+        display_alert_card(alert, idx, is_new=alert_id(alert) in new_ids)
+    # Badged once; the next draw only marks what arrives after this one
+    st.session_state[seen_key] = store.version
+    
+    st.markdown("---")
+    
+    # Export options
+    st.subheader("💾 Export Data")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Export as JSON
+        st.download_button(
+            label="📥 Download as JSON",
+            data=json_data,
+            file_name=f"alerts_{selected_state}_{datetime.now().strftime('%Y%m%d')}.json",
+            mime="application/json",
+            use_container_width=True
+        )
+    
+    with col2:
+        # Export as CSV
+        st.download_button(
+            label="📥 Download as CSV",
+            data=csv_data,
+            file_name=f"alerts_{selected_state}_{datetime.now().strftime('%Y%m%d')}.csv",
+            mime="text/csv",
+            use_container_width=True
+        )
+
+
 def main():
     # Check authentication first
     check_authentication()
@@ -650,12 +784,20 @@ def main():
         
         # Refresh button
         if st.button("🔄 Refresh Data", use_container_width=True):
-            st.cache_data.clear()
+            # One national poll brings every state view up to date
+            try:
+                shared_alert_feed().poll()
+            except Exception as e:
+                st.error(f"Error refreshing alerts: {str(e)}")
             st.rerun()
         
         st.markdown("---")
-        st.caption("Data updates every 5 minutes")
-        st.caption(f"Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        last_poll = shared_alert_feed().last_poll
+        st.caption(f"Data updates every {int(ALERT_POLL_INTERVAL)} seconds")
+        if last_poll:
+            st.caption(f"Last updated: {last_poll.astimezone().strftime('%Y-%m-%d %H:%M:%S')}")
+        if get_alert_store(selected_state).connected:
+            st.caption("🟢 Live: new alerts appear without refreshing")
     
     # Main content
     with st.spinner("Loading alert data..."):
@@ -692,127 +834,8 @@ def main():
         
         st.markdown("---")
         
-        # Fetch state-specific alerts
-        st.header(f"🗺️ Alerts for {US_STATES[selected_state]}")
-        
-        state_data = fetch_state_alerts(selected_state)
-        
-        if state_data and 'features' in state_data:
-            alerts = state_data['features']
-            
-            if len(alerts) == 0:
-                st.success(f"✅ No active alerts for {US_STATES[selected_state]}")
-            else:
-                # Display alert count
-                st.info(f"**{len(alerts)} active alert(s) found**")
-                
-                # Categorize alerts
-                categorized = categorize_alerts(alerts)
-                
-                # Filter alerts based on user selection
-                filtered_alerts = []
-                for alert in alerts:
-                    props = alert.get('properties', {})
-                    severity = props.get('severity', 'Unknown')
-                    urgency = props.get('urgency', 'Unknown')
-                    
-                    if severity in severity_filter and urgency in urgency_filter:
-                        filtered_alerts.append(alert)
-                
-                st.info(f"**{len(filtered_alerts)} alert(s) after applying filters**")
-                
-                if len(filtered_alerts) > 0:
-                    # Re-categorize filtered alerts
-                    categorized = categorize_alerts(filtered_alerts)
-                    
-                    # Display charts
-                    st.subheader("📈 Alert Distribution")
-                    
-                    chart_col1, chart_col2 = st.columns(2)
-                    
-                    with chart_col1:
-                        severity_chart = create_severity_chart(categorized)
-                        if severity_chart:
-                            st.plotly_chart(severity_chart, use_container_width=True)
-                        
-                        certainty_chart = create_certainty_chart(categorized)
-                        if certainty_chart:
-                            st.plotly_chart(certainty_chart, use_container_width=True)
-                    
-                    with chart_col2:
-                        urgency_chart = create_urgency_chart(categorized)
-                        if urgency_chart:
-                            st.plotly_chart(urgency_chart, use_container_width=True)
-                    
-                    # Event type treemap
-                    event_chart = create_event_type_chart(categorized)
-                    if event_chart:
-                        st.plotly_chart(event_chart, use_container_width=True)
-                    
-                    st.markdown("---")
-                    
-                    # Display alerts by severity
-                    st.subheader("🚨 Alert Details")
-                    
-                    # Sort alerts by severity priority
-                    severity_priority = {"Extreme": 0, "Severe": 1, "Moderate": 2, "Minor": 3, "Unknown": 4}
-                    sorted_alerts = sorted(
-                        filtered_alerts,
-                        key=lambda x: severity_priority.get(x.get('properties', {}).get('severity', 'Unknown'), 4)
-                    )
-                    
-                    # Display alerts
-                    for idx, alert in enumerate(sorted_alerts):
-                        display_alert_card(alert, idx)
-                    
-                    st.markdown("---")
-                    
-                    # Export options
-                    st.subheader("💾 Export Data")
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        # Export as JSON
-                        json_data = json.dumps(state_data, indent=2)
-                        st.download_button(
-                            label="📥 Download as JSON",
-                            data=json_data,
-                            file_name=f"alerts_{selected_state}_{datetime.now().strftime('%Y%m%d')}.json",
-                            mime="application/json",
-                            use_container_width=True
-                        )
-                    
-                    with col2:
-                        # Export as CSV
-                        df_data = []
-                        for alert in filtered_alerts:
-                            props = alert.get('properties', {})
-                            df_data.append({
-                                'Event': props.get('event', ''),
-                                'Severity': props.get('severity', ''),
-                                'Urgency': props.get('urgency', ''),
-                                'Certainty': props.get('certainty', ''),
-                                'Area': props.get('areaDesc', ''),
-                                'Effective': props.get('effective', ''),
-                                'Expires': props.get('expires', ''),
-                                'Headline': props.get('headline', '')
-                            })
-                        
-                        df = pd.DataFrame(df_data)
-                        csv_data = df.to_csv(index=False)
-                        
-                        st.download_button(
-                            label="📥 Download as CSV",
-                            data=csv_data,
-                            file_name=f"alerts_{selected_state}_{datetime.now().strftime('%Y%m%d')}.csv",
-                            mime="text/csv",
-                            use_container_width=True
-                        )
-                else:
-                    st.warning("No alerts match the selected filters.")
-        else:
-            st.error(f"Unable to fetch alerts for {US_STATES[selected_state]}")
+        # State alerts are drawn from the live store; deltas after that appear in its live-updates fragment
+        render_state_alerts(selected_state, severity_filter, urgency_filter)
     
     # Footer
     st.markdown("---")